@@ -1,14 +1,37 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, send_file
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from marshmallow import Schema, fields, ValidationError, EXCLUDE
 import os
 import logging
-from datetime import datetime
-from typing import Dict, Any
+import threading
+import time
+import hmac
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, Any, Optional
 import traceback
 
 # Import our Neo4j service
-from neo4j_service import Neo4jService
+from neo4j_service import Neo4jService, decode_bookmark, default_pool_slices
+from storage import FeedbackStore
+from sqlite_store import SQLiteFeedbackStore
+from traffic_capture import TrafficCapture
+from profiling import RequestProfiler
+from query_log import SlowQueryLog
+from retention import RetentionJob
+from health_monitor import HealthMonitor
+from resilience import ResiliencePolicy, CircuitBreaker, DatabaseUnavailableError
+from singleflight import SingleFlight
+from search import terms as search_terms
+from read_cache import ReadCache
+from rate_limiter import RateLimiter, ConcurrencyLimiter, retry_after_header
+from compression import CompressionCache, negotiate_encoding, compress, COMPRESSIBLE_MIMETYPES
+from serialization import (FeedbackJSONProvider, UnsupportedFormatError, negotiate_format,
+                           encode, decode, is_binary_content_type, JSON as JSON_MEDIA_TYPE)
+from admission import (AdmissionController, AdmissionClass, classify_request,
+                       INGEST, LIGHT_READ, HEAVY_ANALYTICS, HEALTH)
+from tenancy import (TenantRegistry, TenantPathMiddleware, parse_tenant_map, parse_tenant_keys, split_pool,
+                     TENANT_HEADER, TENANT_KEY_HEADER)
 
 # Configure logging with more detailed format
 logging.basicConfig(
@@ -26,37 +49,293 @@ werkzeug_logger = logging.getLogger('werkzeug')
 werkzeug_logger.setLevel(logging.INFO)
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for Flutter web app
+app.json = FeedbackJSONProvider(app)  # ISO 8601 for neo4j/Python dates
+CORS(app, expose_headers=['X-Neo4j-Bookmark', 'Retry-After', 'Age'])  # Enable CORS for Flutter web app
 
-# Initialize Neo4j service
-neo4j_service = None
+# Reverse proxies in front of the API; their X-Forwarded-For then gives request.remote_addr
+TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
+
+# Storage backend (Neo4jService or SQLiteFeedbackStore), chosen by STORAGE_BACKEND
+feedback_store = None
+
+# Statement timings from Neo4j result summaries, shared by the base and tenant services
+query_log = SlowQueryLog(
+    threshold_ms=float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 500)),
+    top_k=int(os.getenv('SLOW_QUERY_TOP_K', 20)),
+    plan_samples=int(os.getenv('SLOW_QUERY_PLAN_SAMPLES', 0)),
+    plan_mode=os.getenv('SLOW_QUERY_PLAN_MODE', 'explain').lower()
+)
+
+# Year/Month/Day time tree: maintained on write, read by trends and overall analytics
+TIME_TREE_ENABLED = os.getenv('TIME_TREE_ENABLED', 'false').lower() == 'true'
+
+# Per-day HyperLogLog sketches behind /api/feedback/unique
+DISTINCT_SKETCHES_ENABLED = os.getenv('DISTINCT_SKETCHES_ENABLED', 'true').lower() == 'true'
+
+# Tenant -> Neo4j database, e.g. TENANTS="unep=unep_feedback,undp=undp_feedback"
+TENANTS = parse_tenant_map(os.getenv('TENANTS', ''))
+TENANT_MAX_ACTIVE = int(os.getenv('TENANT_MAX_ACTIVE', 8))
+tenant_registry = None
+if TENANTS:
+    app.wsgi_app = TenantPathMiddleware(app.wsgi_app)
+
+# Cached health state, refreshed in the background so probes never hit Neo4j
+health_monitor = HealthMonitor(
+    interval=float(os.getenv('HEALTH_PROBE_INTERVAL', 5)),
+    max_in_flight=int(os.getenv('READY_MAX_IN_FLIGHT', 64)),
+    max_pool_utilization=float(os.getenv('READY_MAX_POOL_UTILIZATION', 0.9))
+)
+
+# Per-client token buckets (tokens/second, burst) and a global concurrency cap.
+# Off by default: clients behind one proxy or NAT share an IP, and so a bucket,
+# unless they send X-API-Key or TRUSTED_PROXIES is set
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+rate_limiter = RateLimiter(
+    {
+        'write': (float(os.getenv('RATE_LIMIT_WRITE_RATE', 5)), float(os.getenv('RATE_LIMIT_WRITE_BURST', 20))),
+        'analytics': (float(os.getenv('RATE_LIMIT_ANALYTICS_RATE', 2)), float(os.getenv('RATE_LIMIT_ANALYTICS_BURST', 10))),
+        # Aggregate limits per tenant, across all of its clients
+        'tenant_write': (float(os.getenv('RATE_LIMIT_TENANT_WRITE_RATE', 50)), float(os.getenv('RATE_LIMIT_TENANT_WRITE_BURST', 100))),
+        'tenant_analytics': (float(os.getenv('RATE_LIMIT_TENANT_ANALYTICS_RATE', 20)), float(os.getenv('RATE_LIMIT_TENANT_ANALYTICS_BURST', 50)))
+    },
+    idle_ttl=float(os.getenv('RATE_LIMIT_IDLE_TTL', 600))
+)
+concurrency_limiter = ConcurrencyLimiter(int(os.getenv('MAX_CONCURRENT_REQUESTS', 0)))
+
+def build_admission_controller() -> AdmissionController:
+    """Per-class concurrency limits and wait queues, e.g. ADMISSION_HEAVY_ANALYTICS_CONCURRENCY=4"""
+    defaults = {
+        INGEST: (32, 64, 2.0),
+        LIGHT_READ: (16, 32, 2.0),
+        HEAVY_ANALYTICS: (4, 8, 5.0),
+        HEALTH: (16, 0, 0.0)
+    }
+    classes = {}
+    for name, (concurrency, queue, timeout) in defaults.items():
+        prefix = f"ADMISSION_{name.upper()}"
+        classes[name] = AdmissionClass(
+            name,
+            max_concurrent=int(os.getenv(f"{prefix}_CONCURRENCY", concurrency)),
+            max_queue=int(os.getenv(f"{prefix}_QUEUE", queue)),
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", timeout))
+        )
+    return AdmissionController(classes)
+
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+admission_controller = build_admission_controller()
+
+# Negotiated response compression for JSON bodies above a size threshold
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+compression_cache = CompressionCache(
+    max_entries=int(os.getenv('COMPRESSION_CACHE_ENTRIES', 256)),
+    level=COMPRESSION_LEVEL
+)
+
+def init_storage():
+    """Initialize the storage backend with environment variables
+
+    STORAGE_BACKEND=sqlite uses the embedded store at SQLITE_PATH, and
+    STORAGE_BACKEND=fake runs Neo4jService on the in-memory fake driver
+    (fake_neo4j.py) for load and fault experiments. For Neo4j,
+    STARTUP_MODE=background returns immediately so the server can bind and
+    answer liveness probes while connectivity checks, pool warm-up and the
+    schema bootstrap run on a background thread.
+    """
+    global feedback_store, tenant_registry
+    backend = os.getenv('STORAGE_BACKEND', 'neo4j').lower()
+    if backend == 'sqlite':
+        feedback_store = SQLiteFeedbackStore(os.getenv('SQLITE_PATH', 'feedback.db'),
+                                             search_index_size=int(os.getenv('SQLITE_SEARCH_INDEX_SIZE', 100000)))
+        health_monitor.attach(feedback_store)
+        _bootstrap_storage()
+        logger.info(f"SQLite store initialized at {feedback_store.database}")
+        return
 
-def init_neo4j():
-    """Initialize Neo4j service with environment variables"""
-    global neo4j_service
     try:
         neo4j_uri = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
         neo4j_username = os.getenv('NEO4J_USERNAME', 'neo4j')
         neo4j_password = os.getenv('NEO4J_PASSWORD', 'password')
         neo4j_database = os.getenv('NEO4J_DATABASE', 'neo4j')
-        neo4j_service = Neo4jService(neo4j_uri, neo4j_username, neo4j_password, neo4j_database)
-        logger.info("Neo4j service initialized successfully")
+        neo4j_pool_size = int(os.getenv('NEO4J_MAX_POOL_SIZE', 100))
+        startup_mode = os.getenv('STARTUP_MODE', 'blocking').lower()
+        # With tenants, the default database's slices only get what active tenants leave over
+        base_pool_size, tenant_pool_size = neo4j_pool_size, 0
+        if TENANTS:
+            base_pool_size, tenant_pool_size = split_pool(neo4j_pool_size, TENANT_MAX_ACTIVE,
+                                                          int(os.getenv('TENANT_POOL_SIZE', 20)))
+        driver = None
+        if backend == 'fake':
+            # Imported only here so regular deployments never load the test double
+            from fake_neo4j import FakeDriver
+            driver = FakeDriver.from_env(os.getenv)
+        feedback_store = Neo4jService(neo4j_uri, neo4j_username, neo4j_password, neo4j_database,
+                                      max_connection_pool_size=neo4j_pool_size, lazy=True,
+                                      migration_batch_size=int(os.getenv('MIGRATION_BATCH_SIZE', 1000)),
+                                      policy=build_resilience_policy(),
+                                      pool_slices=(build_pool_slices(base_pool_size)
+                                                   or default_pool_slices(base_pool_size)),
+                                      pool_slice_timeout=float(os.getenv('NEO4J_POOL_SLICE_TIMEOUT', 5.0)),
+                                      driver=driver,
+                                      query_log=query_log, time_tree=TIME_TREE_ENABLED,
+                                      single_flight=build_single_flight(), read_cache=build_read_cache(),
+                                      distinct_sketches=DISTINCT_SKETCHES_ENABLED)
+        health_monitor.attach(feedback_store)
+
+        if TENANTS:
+            tenant_registry = build_tenant_registry(feedback_store, tenant_pool_size)
+
+        if startup_mode == 'background':
+            threading.Thread(target=_bootstrap_in_background, name='neo4j-bootstrap', daemon=True).start()
+            logger.info("Neo4j service created; bootstrap continues in the background")
+        else:
+            _bootstrap_storage()
+            logger.info("Neo4j service initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize Neo4j service: {e}")
         raise
 
+def build_tenant_registry(base_service: Neo4jService, tenant_pool_size: int) -> TenantRegistry:
+    """Tenant services sharing the base service's driver, each with its own slices and breaker"""
+
+    def create_tenant_service(database: str) -> Neo4jService:
+        return Neo4jService(os.getenv('NEO4J_URI', 'bolt://localhost:7687'), '', '', database,
+                            max_connection_pool_size=tenant_pool_size, lazy=True,
+                            migration_batch_size=int(os.getenv('MIGRATION_BATCH_SIZE', 1000)),
+                            policy=build_resilience_policy(),
+                            pool_slice_timeout=float(os.getenv('NEO4J_POOL_SLICE_TIMEOUT', 5.0)),
+                            driver=base_service.driver, query_log=query_log, time_tree=TIME_TREE_ENABLED,
+                            single_flight=build_single_flight(), read_cache=build_read_cache(),
+                            distinct_sketches=DISTINCT_SKETCHES_ENABLED)
+
+    return TenantRegistry(
+        base_service, TENANTS, create_tenant_service,
+        max_active=TENANT_MAX_ACTIVE,
+        warm_connections=int(os.getenv('TENANT_WARMUP_CONNECTIONS', 2)),
+        max_feedback=int(os.getenv('TENANT_MAX_FEEDBACK', 0)),
+        quota_refresh=float(os.getenv('TENANT_QUOTA_REFRESH', 60)),
+        keys=parse_tenant_keys(os.getenv('TENANT_KEYS', ''))
+    )
+
+def build_pool_slices(pool_size: int) -> Optional[Dict[str, int]]:
+    """Connections per workload from NEO4J_POOL_SLICES, e.g. "ingest=40,heavy_analytics=20"
+
+    Returns None (the service's default shares) when the variable is unset.
+    Raises ValueError when the slices add up to more than `pool_size`.
+    """
+    value = os.getenv('NEO4J_POOL_SLICES', '')
+    if not value:
+        return None
+    slices = {}
+    for item in value.split(','):
+        if '=' in item:
+            workload, size = item.split('=', 1)
+            slices[workload.strip()] = int(size)
+    if sum(slices.values()) > pool_size:
+        raise ValueError(f"NEO4J_POOL_SLICES add up to {sum(slices.values())} connections, "
+                         f"more than the {pool_size} available to the default database")
+    return slices
+
+def build_single_flight() -> SingleFlight:
+    """Coalescing of identical concurrent reads; waiters default to the operation deadline"""
+    timeout = os.getenv('SINGLE_FLIGHT_TIMEOUT')
+    return SingleFlight(enabled=os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true',
+                        timeout=float(timeout) if timeout else None)
+
+def build_read_cache() -> ReadCache:
+    """Analytics result cache: fresh for ANALYTICS_CACHE_TTL, then served stale for ANALYTICS_STALE_GRACE"""
+    return ReadCache(ttl=float(os.getenv('ANALYTICS_CACHE_TTL', 0)),
+                     grace=float(os.getenv('ANALYTICS_STALE_GRACE', 0)),
+                     refresh_workers=int(os.getenv('ANALYTICS_REFRESH_WORKERS', 1)))
+
+def build_resilience_policy() -> ResiliencePolicy:
+    """Retry/circuit-breaker policy from the environment
+
+    NEO4J_DEADLINES overrides the default deadline per operation, e.g.
+    "store_feedback=3,get_feedback_trends=20".
+    """
+    deadlines = {}
+    for item in os.getenv('NEO4J_DEADLINES', '').split(','):
+        if '=' in item:
+            operation, seconds = item.split('=', 1)
+            deadlines[operation.strip()] = float(seconds)
+
+    return ResiliencePolicy(
+        max_attempts=int(os.getenv('NEO4J_RETRY_ATTEMPTS', 4)),
+        base_delay=float(os.getenv('NEO4J_RETRY_BASE_DELAY', 0.05)),
+        max_delay=float(os.getenv('NEO4J_RETRY_MAX_DELAY', 2.0)),
+        default_deadline=float(os.getenv('NEO4J_OPERATION_DEADLINE', 10.0)),
+        deadlines=deadlines,
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('NEO4J_BREAKER_FAILURES', 5)),
+            reset_timeout=float(os.getenv('NEO4J_BREAKER_RESET', 30.0))
+        )
+    )
+
+def _bootstrap_storage():
+    """Verify, warm up and migrate the storage backend, then start health probing"""
+    warm_connections = int(os.getenv('NEO4J_WARMUP_CONNECTIONS', 0))
+    stats = feedback_store.bootstrap(warm_connections=warm_connections)
+    if tenant_registry is not None:
+        tenant_registry.prewarm()
+    health_monitor.start()
+    time_to_ready = health_monitor.mark_ready(stats)
+    logger.info(f"⏱️ TIME TO READY: {time_to_ready}s")
+    if os.getenv('RETENTION_ENABLED', 'false').lower() == 'true' and isinstance(feedback_store, Neo4jService):
+        threading.Thread(target=_run_retention, args=(feedback_store,), name='feedback-retention',
+                         daemon=True).start()
+
+def _run_retention(service: Neo4jService):
+    """Archive months past RETENTION_DAYS every RETENTION_INTERVAL_HOURS"""
+    job = RetentionJob(service, int(os.getenv('RETENTION_DAYS', 365)),
+                       os.getenv('RETENTION_ARCHIVE_DIR', 'archives'),
+                       batch_size=int(os.getenv('RETENTION_BATCH_SIZE', 1000)),
+                       throttle=float(os.getenv('RETENTION_THROTTLE', 0.5)))
+    interval = float(os.getenv('RETENTION_INTERVAL_HOURS', 24)) * 3600
+    while True:
+        try:
+            job.run()
+        except Exception as e:
+            logger.error(f"Retention run failed, retrying next interval: {e}")
+        time.sleep(interval)
+
+def _bootstrap_in_background():
+    """Retry the bootstrap with capped backoff until the database is reachable"""
+    delay = 1.0
+    while True:
+        try:
+            _bootstrap_storage()
+            return
+        except Exception as e:
+            logger.warning(f"Background Neo4j bootstrap failed, retrying in {delay:.0f}s: {e}")
+            health_monitor.mark_startup_failed(str(e))
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+def is_reloader_parent(debug: bool) -> bool:
+    """True in the debug reloader's watcher process, which never serves requests"""
+    return debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
 # Validation schemas
 class FeedbackSchema(Schema):
     # Core feedback data only - no IDs needed
     user_query = fields.Str(required=True)  # What user asked
     bot_response = fields.Str(required=True)  # What bot replied
     feedback_type = fields.Str(required=True, validate=lambda x: x in ['positive', 'negative'])
-    user_comment = fields.Str(missing='')  # User's detailed feedback/comment - can be empty string
+    user_comment = fields.Str(load_default='')  # User's detailed feedback/comment - can be empty string
     rating_stars = fields.Int(required=True, validate=lambda x: 1 <= x <= 5)  # Star rating 1-5 (required)
 
     # Optional fields that Flutter might send
-    message_id = fields.Str(missing='')  # Optional message ID
-    categories = fields.List(fields.Str(), missing=[])  # Optional categories list
+    message_id = fields.Str(load_default='')  # Optional message ID
+    user_id = fields.Str(load_default='', validate=lambda x: len(x) <= 128)  # Optional user or device identifier
+    # Rasa NLU result for the query, sent as `intent` and `confidence`
+    detected_intent = fields.Str(data_key='intent', load_default='', validate=lambda x: len(x) <= 100)
+    confidence_score = fields.Float(data_key='confidence', load_default=None, allow_none=True,
+                                    validate=lambda x: 0.0 <= x <= 1.0)
+    categories = fields.List(fields.Str(), load_default=list)  # Optional categories list
 
     # Simple metadata - allow flexible timestamp formats
     timestamp = fields.Str(required=True)
@@ -67,7 +346,8 @@ class FeedbackSchema(Schema):
 
 feedback_schema = FeedbackSchema()
 
-def create_error_response(message: str, status_code: int = 400, details: Dict = None) -> tuple:
+def create_error_response(message: str, status_code: int = 400, details: Dict = None,
+                          headers: Dict = None) -> tuple:
     """Create standardized error response"""
     error_response = {
         'success': False,
@@ -77,28 +357,379 @@ def create_error_response(message: str, status_code: int = 400, details: Dict =
     if details:
         error_response['details'] = details
     
-    return jsonify(error_response), status_code
+    media_type = negotiate_format(request.headers.get('Accept')) if request else JSON_MEDIA_TYPE
+    if media_type != JSON_MEDIA_TYPE:
+        body = app.response_class(encode(error_response, media_type), mimetype=media_type)
+    else:
+        body = jsonify(error_response)
+    body.vary.add('Accept')
+
+    if headers:
+        return body, status_code, headers
+    return body, status_code
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO 8601 timestamp as sent by the Flutter client; a trailing Z means UTC"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def read_request_payload() -> Any:
+    """Request body decoded according to its Content-Type (JSON, MessagePack or CBOR)"""
+    if is_binary_content_type(request.content_type):
+        try:
+            return decode(request.get_data(), request.content_type)
+        except UnsupportedFormatError:
+            raise
+        except Exception as e:
+            raise UnsupportedFormatError(f"Malformed {request.content_type} body: {e}")
+    return request.json
 
-def create_success_response(data: Any = None, message: str = "Success") -> Dict:
-    """Create standardized success response"""
+def request_bookmark() -> Optional[str]:
+    """Bookmark from ?bookmark= or X-Neo4j-Bookmark; raises ValueError if malformed"""
+    token = request.args.get('bookmark') or request.headers.get('X-Neo4j-Bookmark')
+    if token:
+        decode_bookmark(token)
+    return token or None
+
+def current_service() -> Optional[FeedbackStore]:
+    """Store for the request's tenant, or the default store without one"""
+    tenant = g.get('tenant')
+    if tenant is None:
+        return feedback_store
+    return tenant_registry.service_for(tenant)
+
+def create_unavailable_response(error: DatabaseUnavailableError) -> tuple:
+    """503 with a Retry-After hint when the database is unavailable or the circuit is open"""
+    retry_after = max(1, int(round(error.retry_after)))
+    return create_error_response(
+        "Database temporarily unavailable", 503,
+        {'error': str(error), 'retry_after_seconds': retry_after},
+        headers={'Retry-After': str(retry_after)}
+    )
+
+# Shared secret for /api/admin/* routes; they stay closed while it is unset
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+def admin_token_matches(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+def require_admin() -> Optional[tuple]:
+    """403 unless the request carries X-Admin-Token matching ADMIN_TOKEN, otherwise None"""
+    if admin_token_matches(request.headers.get('X-Admin-Token')):
+        return None
+    logger.warning(f"🔒 Admin request to {request.path} rejected")
+    return create_error_response("Admin token required", 403)
+
+def create_success_response(data: Any = None, message: str = "Success",
+                            meta: Optional[Dict[str, Any]] = None) -> Dict:
+    """Create standardized success response; `meta` adds fields to the envelope"""
     response = {
         'success': True,
         'message': message,
         'timestamp': datetime.now().isoformat()
     }
-    if data is not None:
-        response['data'] = data
-    
-    return jsonify(response)
+    if meta:
+        response.update(meta)
+    media_type = negotiate_format(request.headers.get('Accept'))
+    if media_type != JSON_MEDIA_TYPE:
+        if data is not None:
+            response['data'] = data
+        result = app.response_class(encode(response, media_type), mimetype=media_type)
+        result.vary.add('Accept')
+        return result
+    if data is None:
+        result = jsonify(response)
+        result.vary.add('Accept')
+        return result
+
+    # Serialise `data` on its own so the compression layer can reuse its
+    # compressed form while only the envelope (and its timestamp) changes
+    data_json = app.json.dumps(data, separators=(',', ':'))
+    envelope_json = app.json.dumps(response, separators=(',', ':'))
+    prefix = '{"data":'
+    body = f"{prefix}{data_json},{envelope_json[1:]}\n"
+
+    result = app.response_class(body, mimetype=app.json.mimetype)
+    result.vary.add('Accept')
+    result.compression_segment = (len(prefix), len(prefix) + len(data_json.encode('utf-8')))
+    return result
+
+def create_analytics_response(service: FeedbackStore, data: Any, message: str):
+    """Success response for an analytics read; a result served from cache past its TTL
+    (or during an outage) carries `stale: true` and `age_seconds`, plus an Age header"""
+    freshness = service.last_read_freshness()
+    if not freshness or not freshness['stale']:
+        return create_success_response(data, message)
+    response = create_success_response(data, message, meta=freshness)
+    response.headers['Age'] = str(int(freshness['age_seconds']))
+    return response
+
+# Opt-in request capture for replay_traffic.py; no hooks are registered when disabled
+CAPTURE_ENABLED = os.getenv('CAPTURE_ENABLED', 'false').lower() == 'true'
+traffic_capture = None
+if CAPTURE_ENABLED:
+    traffic_capture = TrafficCapture(
+        os.getenv('CAPTURE_PATH', 'captures/requests.jsonl'),
+        max_bytes=int(os.getenv('CAPTURE_MAX_BYTES', 50 * 1024 * 1024)),
+        backups=int(os.getenv('CAPTURE_BACKUPS', 5)),
+        sample_rate=float(os.getenv('CAPTURE_SAMPLE_RATE', 1.0)),
+        keep_fields=[f.strip() for f in os.getenv('CAPTURE_KEEP_FIELDS', '').split(',') if f.strip()]
+    )
+    traffic_capture.start()
+
+    @app.before_request
+    def capture_arrival():
+        """Note arrival time; registered first so rejected requests are captured too"""
+        if request.path.startswith('/api/') and not request.path.startswith('/api/health') \
+                and traffic_capture.sampled():
+            g.capture_arrival = (time.time(), traffic_capture.offset(), time.perf_counter())
+
+    @app.after_request
+    def capture_request(response):
+        """Queue the sanitised request with its outcome for the capture file"""
+        arrival = g.pop('capture_arrival', None)
+        if arrival is not None:
+            arrived_at, offset, started = arrival
+            body = None
+            if request.method in ('POST', 'PUT', 'PATCH'):
+                try:
+                    body = read_request_payload()
+                except Exception:
+                    body = None
+            path = request.full_path.rstrip('?') if request.query_string else request.path
+            traffic_capture.record(arrived_at, offset, request.method, request.endpoint, path,
+                                   dict(request.headers), body, client_key(), response.status_code,
+                                   (time.perf_counter() - started) * 1000)
+        return response
+
+# Opt-in request profiling; no hooks or routes are registered when disabled
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+request_profiler = None
+if PROFILING_ENABLED:
+    request_profiler = RequestProfiler(
+        os.getenv('PROFILING_DIR', 'profiles'),
+        max_profiles=int(os.getenv('PROFILING_MAX_PROFILES', 50)),
+        sample_rate=float(os.getenv('PROFILING_SAMPLE_RATE', 0)),
+        endpoints=[e.strip() for e in os.getenv('PROFILING_ENDPOINTS', '').split(',') if e.strip()],
+        sample_interval=float(os.getenv('PROFILING_SAMPLE_INTERVAL_MS', 5)) / 1000
+    )
+
+    @app.before_request
+    def start_profile():
+        """Profile requests sent with X-Profile: <ADMIN_TOKEN>, or a sampled share of them"""
+        if not request.path.startswith('/api/') or request.path.startswith(('/api/health', '/api/admin')):
+            return None
+        forced = admin_token_matches(request.headers.get('X-Profile'))
+        if request_profiler.wants(request.endpoint, forced):
+            g.active_profile = request_profiler.start()
+        return None
+
+    def finish_profile(status: Optional[int]) -> Optional[str]:
+        active = g.pop('active_profile', None)
+        if active is None:
+            return None
+        return request_profiler.finish(active, {
+            'method': request.method, 'endpoint': request.endpoint,
+            'path': request.full_path.rstrip('?') if request.query_string else request.path,
+            'status': status
+        })
+
+    @app.after_request
+    def stop_profile(response):
+        """Runs after the other after_request hooks, so compression is included"""
+        profile_id = finish_profile(response.status_code)
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    @app.teardown_request
+    def discard_profile(exc):
+        """Finish a profile whose request never produced a response"""
+        finish_profile(None)
+
+    @app.route('/api/admin/profiles', methods=['GET'])
+    def list_profiles():
+        """Stored profiles, newest first"""
+        denied = require_admin()
+        if denied:
+            return denied
+        return create_success_response({'profiles': request_profiler.list_profiles(),
+                                        'stats': request_profiler.stats()},
+                                       "Profiles retrieved successfully")
+
+    @app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+    def download_profile(profile_id: str):
+        """?format=prof (pstats, default), folded (collapsed stacks), json or text (top functions)"""
+        denied = require_admin()
+        if denied:
+            return denied
+        fmt = request.args.get('format', 'prof')
+        if fmt == 'text':
+            try:
+                summary = request_profiler.summary(profile_id, sort=request.args.get('sort', 'cumulative'),
+                                                   limit=request.args.get('limit', 40, type=int))
+            except KeyError:
+                return create_error_response("Unknown sort key", 400, {'sort': request.args.get('sort')})
+            if summary is None:
+                return create_error_response("Profile not found", 404, {'id': profile_id})
+            return app.response_class(summary, mimetype='text/plain')
+        path = request_profiler.path(profile_id, fmt)
+        if path is None:
+            return create_error_response("Profile not found", 404, {'id': profile_id, 'format': fmt})
+        return send_file(os.path.abspath(path), as_attachment=fmt != 'json',
+                         download_name=os.path.basename(path))
+
+@app.before_request
+def track_request_started():
+    """Count in-flight requests for readiness; health probes are not counted"""
+    if not request.path.startswith('/api/health'):
+        health_monitor.request_started()
+        g.in_flight_counted = True
+
+@app.teardown_request
+def track_request_finished(exc):
+    """Release the in-flight slot taken in track_request_started"""
+    if g.pop('in_flight_counted', False):
+        health_monitor.request_finished()
+
+@app.before_request
+def resolve_tenant():
+    """Pick the tenant from X-Tenant (or a /t/<tenant> prefix); unknown tenants get 404"""
+    tenant = request.headers.get(TENANT_HEADER)
+    if not tenant or request.path.startswith('/api/health'):
+        return None
+    if tenant_registry is None or tenant not in tenant_registry:
+        return create_error_response("Unknown tenant", 404, {'tenant': tenant})
+    if not tenant_registry.authorized(tenant, request.headers.get(TENANT_KEY_HEADER)):
+        return create_error_response("Invalid or missing tenant key", 403, {'tenant': tenant})
+    g.tenant = tenant
+    g.tenant_started = time.perf_counter()
+    return None
+
+@app.after_request
+def record_tenant_metrics(response):
+    """Per-tenant request count and latency"""
+    tenant = g.get('tenant')
+    if tenant is not None:
+        elapsed_ms = (time.perf_counter() - g.tenant_started) * 1000
+        tenant_registry.record_request(tenant, elapsed_ms, response.status_code >= 500)
+    return response
+
+def rate_limit_bucket() -> Optional[str]:
+    """Token bucket that applies to the current request, if any"""
+    if request.path == '/api/feedback' and request.method == 'POST':
+        return 'write'
+    if request.path.startswith('/api/feedback/') and request.method == 'GET':
+        return 'analytics'
+    return None
+
+def client_key() -> str:
+    """Rate-limit identity: the API key when one is sent, otherwise the client IP"""
+    api_key = request.headers.get('X-API-Key')
+    return f"key:{api_key}" if api_key else f"ip:{request.remote_addr}"
+
+@app.before_request
+def enforce_rate_limits():
+    """Reject over-limit clients before any schema validation or database work"""
+    bucket = rate_limit_bucket()
+    if bucket is None:
+        return None
+
+    if RATE_LIMIT_ENABLED:
+        allowed, retry_after = rate_limiter.consume(bucket, client_key())
+        if not allowed:
+            logger.warning(f"🚦 Rate limit '{bucket}' exceeded for {client_key()}")
+            return create_error_response(
+                "Rate limit exceeded", 429,
+                {'limit': bucket, 'retry_after_seconds': round(retry_after, 3)},
+                headers={'Retry-After': retry_after_header(retry_after)}
+            )
+        tenant = g.get('tenant')
+        if tenant is not None:
+            allowed, retry_after = rate_limiter.consume(f"tenant_{bucket}", tenant)
+            if not allowed:
+                logger.warning(f"🚦 Tenant rate limit '{bucket}' exceeded for {tenant}")
+                return create_error_response(
+                    "Tenant rate limit exceeded", 429,
+                    {'limit': f"tenant_{bucket}", 'tenant': tenant, 'retry_after_seconds': round(retry_after, 3)},
+                    headers={'Retry-After': retry_after_header(retry_after)}
+                )
+
+    if not concurrency_limiter.try_acquire():
+        logger.warning("🚦 Concurrency cap reached, shedding request")
+        return create_error_response(
+            "Server is busy", 503,
+            {'max_concurrent_requests': concurrency_limiter.max_concurrent},
+            headers={'Retry-After': retry_after_header(1)}
+        )
+    g.concurrency_slot = True
+    return None
+
+@app.teardown_request
+def release_concurrency_slot(exc):
+    """Give back the slot taken in enforce_rate_limits"""
+    if g.pop('concurrency_slot', False):
+        concurrency_limiter.release()
+
+@app.before_request
+def admit_request():
+    """Queue or shed the request according to its class's concurrency limit"""
+    if not ADMISSION_ENABLED:
+        return None
+    request_class = classify_request(request.method, request.path)
+    if request_class is None:
+        return None
+
+    if not admission_controller.acquire(request_class):
+        logger.warning(f"🚦 Admission queue for '{request_class}' is full, shedding request")
+        retry_after = admission_controller.retry_after(request_class)
+        return create_error_response(
+            "Server is busy", 503,
+            {'request_class': request_class, 'retry_after_seconds': retry_after},
+            headers={'Retry-After': retry_after_header(retry_after)}
+        )
+    g.admission_class = request_class
+    return None
+
+@app.teardown_request
+def release_admission_slot(exc):
+    """Give back the slot taken in admit_request"""
+    request_class = g.pop('admission_class', None)
+    if request_class is not None:
+        admission_controller.release(request_class)
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON responses when the client accepts gzip, deflate or br"""
+    if (not COMPRESSION_ENABLED or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.is_streamed):
+        return response
+    response.vary.add('Accept-Encoding')
+    if ('Content-Encoding' in response.headers or response.status_code < 200
+            or response.status_code in (204, 304)):
+        return response
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    segment = getattr(response, 'compression_segment', None)
+    if segment:
+        response.set_data(compression_cache.compress_segmented(body, segment[0], segment[1], encoding))
+    else:
+        response.set_data(compress(body, encoding, COMPRESSION_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    return response
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Service health check endpoint"""
+    """Service health check endpoint, served from the cached probe state"""
     try:
-        if neo4j_service is None:
-            return create_error_response("Neo4j service not initialized", 503)
+        if feedback_store is None:
+            return create_error_response("Storage backend not initialized", 503)
         
-        health_status = neo4j_service.health_check()
+        health_status = health_monitor.cached_health()
         
         if health_status['status'] == 'healthy':
             return create_success_response(health_status, "Service is healthy")
@@ -109,6 +740,25 @@ def health_check():
         logger.error(f"Health check error: {e}")
         return create_error_response("Health check failed", 500, {'error': str(e)})
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe; never touches the database"""
+    return create_success_response(health_monitor.liveness(), "Service is alive")
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe from cached health, pool saturation and request backlog"""
+    ready, details = health_monitor.readiness()
+    details['admission'] = admission_controller.stats()
+    if isinstance(feedback_store, Neo4jService):
+        details['single_flight'] = feedback_store.single_flight.stats()
+        details['read_cache'] = feedback_store.read_cache.stats()
+    if tenant_registry is not None:
+        details['tenants'] = tenant_registry.stats()
+    if ready:
+        return create_success_response(details, "Service is ready")
+    return create_error_response("Service is not ready", 503, details)
+
 @app.route('/api/feedback', methods=['POST'])
 def store_feedback():
     """Store user feedback endpoint with detailed logging"""
@@ -130,18 +780,24 @@ def store_feedback():
         for header, value in request.headers:
             logger.info(f"   {header}: {value}")
 
-        # Validate request data
-        if not request.json:
+        # Decode the body (JSON, MessagePack or CBOR) and validate request data
+        try:
+            payload = read_request_payload()
+        except UnsupportedFormatError as e:
+            logger.error(f"❌ VALIDATION FAILED: {e}")
+            return create_error_response(str(e), 415)
+
+        if not payload:
             logger.error("❌ VALIDATION FAILED: No JSON data provided")
             return create_error_response("No JSON data provided")
         
-        logger.info("✅ JSON data received successfully")
+        logger.info("✅ Request data received successfully")
         logger.info(f"📝 RAW REQUEST DATA:")
-        logger.info(f"   {request.json}")
+        logger.info(f"   {payload}")
 
         # Validate against schema
         try:
-            validated_data = feedback_schema.load(request.json)
+            validated_data = feedback_schema.load(payload)
             logger.info("✅ SCHEMA VALIDATION: Passed")
             logger.info(f"📊 VALIDATED FEEDBACK DATA:")
             logger.info(f"   User Query: {validated_data.get('user_query', '')[:100]}...")
@@ -157,49 +813,68 @@ def store_feedback():
         
         # Validate timestamp format
         try:
-            parsed_timestamp = datetime.fromisoformat(validated_data['timestamp'].replace('Z', '+00:00'))
+            parsed_timestamp = parse_timestamp(validated_data['timestamp'])
             logger.info(f"✅ TIMESTAMP VALIDATION: Passed - {parsed_timestamp}")
         except ValueError as e:
             logger.error(f"❌ TIMESTAMP VALIDATION FAILED: {e}")
             return create_error_response("Invalid timestamp format. Use ISO 8601 format.")
         
         # Check Neo4j service availability
-        if neo4j_service is None:
+        service = current_service()
+        if service is None:
             logger.error("❌ NEO4J SERVICE: Not available")
             return create_error_response("Neo4j service not available", 503)
         
         logger.info("✅ NEO4J SERVICE: Available and ready")
 
+        tenant = g.get('tenant')
+        if tenant is not None and tenant_registry.over_storage_quota(tenant, service):
+            logger.error(f"❌ STORAGE QUOTA: tenant '{tenant}' is full")
+            return create_error_response("Tenant storage quota exceeded", 507,
+                                         {'tenant': tenant, 'max_feedback': tenant_registry.max_feedback})
+
         # Store in Neo4j
         logger.info("🚀 ATTEMPTING TO STORE FEEDBACK IN NEO4J...")
-        logger.info(f"   Database: {neo4j_service.database}")
+        logger.info(f"   Database: {service.database}")
         logger.info(f"   URI: {os.getenv('NEO4J_URI')}")
 
-        success = neo4j_service.store_feedback(validated_data)
+        success = service.store_feedback(validated_data)
         
         if success:
+            if tenant is not None:
+                tenant_registry.record_write(tenant)
             logger.info("✅ FEEDBACK STORAGE: SUCCESS!")
-            logger.info(f"   Stored in database: {neo4j_service.database}")
+            logger.info(f"   Stored in database: {service.database}")
             logger.info(f"   Feedback Type: {validated_data['feedback_type']}")
             logger.info(f"   Rating: {validated_data.get('rating_stars', 0)}/5 stars")
             logger.info("🎉 FEEDBACK SUCCESSFULLY TRANSFERRED FROM FLUTTER TO NEO4J!")
             logger.info("=" * 80)
 
-            return create_success_response(
+            # Clients that want read-your-writes pass this bookmark to the read endpoints
+            bookmark = service.last_bookmark()
+            response = create_success_response(
                 data={
-                    'database': neo4j_service.database,
+                    'database': service.database,
                     'stored_at': datetime.now().isoformat(),
                     'feedback_type': validated_data['feedback_type'],
-                    'rating_stars': validated_data.get('rating_stars', 0)
+                    'rating_stars': validated_data.get('rating_stars', 0),
+                    'bookmark': bookmark
                 },
                 message="Feedback stored successfully in Neo4j database"
             )
+            if bookmark:
+                response.headers['X-Neo4j-Bookmark'] = bookmark
+            return response
         else:
             logger.error("❌ FEEDBACK STORAGE: FAILED!")
             logger.error("   Neo4j storage operation returned False")
             logger.error("=" * 80)
             return create_error_response("Failed to store feedback in Neo4j", 500)
 
+    except DatabaseUnavailableError as e:
+        logger.error(f"❌ FEEDBACK STORAGE: DATABASE UNAVAILABLE - {e}")
+        logger.error("=" * 80)
+        return create_unavailable_response(e)
     except Exception as e:
         logger.error("💥 CRITICAL ERROR IN FEEDBACK PROCESSING:")
         logger.error(f"   Error Type: {type(e).__name__}")
@@ -214,13 +889,19 @@ def store_feedback():
 def get_analytics():
     """Get overall feedback analytics"""
     try:
-        if neo4j_service is None:
+        service = current_service()
+        if service is None:
             return create_error_response("Neo4j service not available", 503)
         
-        analytics = neo4j_service.get_overall_analytics()
+        try:
+            bookmark = request_bookmark()
+        except ValueError as e:
+            return create_error_response(str(e))
+        
+        analytics = service.get_overall_analytics(bookmark=bookmark)
         
         if analytics:
-            return create_success_response(analytics, "Analytics retrieved successfully")
+            return create_analytics_response(service, analytics, "Analytics retrieved successfully")
         else:
             return create_success_response({
                 'total_feedback': 0,
@@ -229,6 +910,8 @@ def get_analytics():
                 'satisfaction_rate': 0
             }, "No feedback data available")
             
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
     except Exception as e:
         logger.error(f"Get analytics error: {e}")
         return create_error_response("Failed to get analytics", 500, {'error': str(e)})
@@ -237,7 +920,8 @@ def get_analytics():
 def get_trends():
     """Get feedback trends over time"""
     try:
-        if neo4j_service is None:
+        service = current_service()
+        if service is None:
             return create_error_response("Neo4j service not available", 503)
         
         # Get days parameter, default to 30
@@ -246,10 +930,17 @@ def get_trends():
         if days <= 0 or days > 365:
             return create_error_response("Days parameter must be between 1 and 365")
         
-        trends = neo4j_service.get_feedback_trends(days)
+        try:
+            bookmark = request_bookmark()
+        except ValueError as e:
+            return create_error_response(str(e))
+        
+        trends = service.get_feedback_trends(days, bookmark=bookmark)
         
-        return create_success_response(trends, f"Trends for last {days} days retrieved successfully")
+        return create_analytics_response(service, trends, f"Trends for last {days} days retrieved successfully")
         
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
     except Exception as e:
         logger.error(f"Get trends error: {e}")
         return create_error_response("Failed to get trends", 500, {'error': str(e)})
@@ -258,13 +949,21 @@ def get_trends():
 def get_intent_performance():
     """Get intent performance analytics"""
     try:
-        if neo4j_service is None:
+        service = current_service()
+        if service is None:
             return create_error_response("Neo4j service not available", 503)
         
-        intents = neo4j_service.get_intent_performance()
+        try:
+            bookmark = request_bookmark()
+        except ValueError as e:
+            return create_error_response(str(e))
         
-        return create_success_response(intents, "Intent performance retrieved successfully")
+        intents = service.get_intent_performance(bookmark=bookmark)
         
+        return create_analytics_response(service, intents, "Intent performance retrieved successfully")
+        
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
     except Exception as e:
         logger.error(f"Get intent performance error: {e}")
         return create_error_response("Failed to get intent performance", 500, {'error': str(e)})
@@ -273,7 +972,8 @@ def get_intent_performance():
 def get_user_engagement():
     """Get user engagement metrics"""
     try:
-        if neo4j_service is None:
+        service = current_service()
+        if service is None:
             return create_error_response("Neo4j service not available", 503)
         
         # Get limit parameter, default to 20
@@ -282,29 +982,147 @@ def get_user_engagement():
         if limit <= 0 or limit > 100:
             return create_error_response("Limit parameter must be between 1 and 100")
         
-        engagement = neo4j_service.get_user_engagement(limit)
+        try:
+            bookmark = request_bookmark()
+        except ValueError as e:
+            return create_error_response(str(e))
+        
+        engagement = service.get_user_engagement(limit, bookmark=bookmark)
         
-        return create_success_response(engagement, f"Top {limit} user engagement metrics retrieved successfully")
+        return create_analytics_response(service, engagement,
+                                         f"Top {limit} user engagement metrics retrieved successfully")
         
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
     except Exception as e:
         logger.error(f"Get user engagement error: {e}")
         return create_error_response("Failed to get user engagement", 500, {'error': str(e)})
 
+@app.route('/api/feedback/unique', methods=['GET'])
+def get_distinct_counts():
+    """Approximate unique users and questions, per day and over a date range"""
+    try:
+        service = current_service()
+        if service is None:
+            return create_error_response("Neo4j service not available", 503)
+
+        # Either ?start=YYYY-MM-DD&end=YYYY-MM-DD or the last ?days= days (default 30)
+        today = datetime.now(timezone.utc).date()
+        try:
+            end = date.fromisoformat(request.args['end']) if 'end' in request.args else today
+            if 'start' in request.args:
+                start = date.fromisoformat(request.args['start'])
+            else:
+                days = request.args.get('days', 30, type=int)
+                if days <= 0 or days > 365:
+                    return create_error_response("Days parameter must be between 1 and 365")
+                start = end - timedelta(days=days - 1)
+        except ValueError:
+            return create_error_response("start and end must be ISO dates (YYYY-MM-DD)")
+        if start > end or (end - start).days > 366:
+            return create_error_response("start must not be after end, and the range is limited to 366 days")
+
+        try:
+            bookmark = request_bookmark()
+        except ValueError as e:
+            return create_error_response(str(e))
+
+        counts = service.get_distinct_counts(start.isoformat(), end.isoformat(), bookmark=bookmark)
+
+        return create_analytics_response(service, counts,
+                                         f"Unique users and questions from {start} to {end} retrieved successfully")
+
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Get distinct counts error: {e}")
+        return create_error_response("Failed to get distinct counts", 500, {'error': str(e)})
+
+@app.route('/api/feedback/search', methods=['GET'])
+def search_feedback():
+    """Full-text search over queries, responses and comments, ranked and cursor-paged"""
+    # Results carry raw user text, so search is limited to staff holding the admin token
+    denied = require_admin()
+    if denied:
+        return denied
+    try:
+        service = current_service()
+        if service is None:
+            return create_error_response("Neo4j service not available", 503)
+
+        terms = search_terms(request.args.get('q', ''))
+        if not terms or len(request.args['q']) > 200:
+            return create_error_response("q must contain at least one word and at most 200 characters")
+
+        feedback_type = request.args.get('type')
+        if feedback_type is not None and feedback_type not in ('positive', 'negative'):
+            return create_error_response("type must be 'positive' or 'negative'")
+        min_rating = request.args.get('min_rating', type=int)
+        max_rating = request.args.get('max_rating', type=int)
+        if any(rating is not None and not 1 <= rating <= 5 for rating in (min_rating, max_rating)):
+            return create_error_response("min_rating and max_rating must be between 1 and 5")
+        limit = request.args.get('limit', 20, type=int)
+        if limit <= 0 or limit > 100:
+            return create_error_response("Limit parameter must be between 1 and 100")
+
+        # Dates are whole UTC days; end is inclusive
+        try:
+            start = date.fromisoformat(request.args['start']) if 'start' in request.args else None
+            end = date.fromisoformat(request.args['end']) if 'end' in request.args else None
+        except ValueError:
+            return create_error_response("start and end must be ISO dates (YYYY-MM-DD)")
+        start_at = f"{start.isoformat()}T00:00:00Z" if start else None
+        end_before = f"{(end + timedelta(days=1)).isoformat()}T00:00:00Z" if end else None
+
+        try:
+            bookmark = request_bookmark()
+            results = service.search_feedback(terms, feedback_type, min_rating, max_rating, start_at, end_before,
+                                              limit, request.args.get('cursor'), bookmark=bookmark)
+        except ValueError as e:
+            return create_error_response(str(e))
+
+        return create_analytics_response(service, results,
+                                         f"{len(results['results'])} result(s) for '{' '.join(terms)}'")
+
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Search feedback error: {e}")
+        return create_error_response("Failed to search feedback", 500, {'error': str(e)})
+
 @app.route('/api/feedback/categories', methods=['GET'])
 def get_category_insights():
     """Get feedback category insights"""
     try:
-        if neo4j_service is None:
+        service = current_service()
+        if service is None:
             return create_error_response("Neo4j service not available", 503)
         
-        categories = neo4j_service.get_category_insights()
+        try:
+            bookmark = request_bookmark()
+        except ValueError as e:
+            return create_error_response(str(e))
+        
+        categories = service.get_category_insights(bookmark=bookmark)
         
-        return create_success_response(categories, "Category insights retrieved successfully")
+        return create_analytics_response(service, categories, "Category insights retrieved successfully")
         
+    except DatabaseUnavailableError as e:
+        return create_unavailable_response(e)
     except Exception as e:
         logger.error(f"Get category insights error: {e}")
         return create_error_response("Failed to get category insights", 500, {'error': str(e)})
 
+@app.route('/api/admin/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """Slowest Neo4j statements with summary timings, redacted parameters and any captured plans"""
+    denied = require_admin()
+    if denied:
+        return denied
+    limit = request.args.get('limit', type=int)
+    return create_success_response({'slow_queries': query_log.slow_queries(limit), 'stats': query_log.stats()},
+                                   "Slow queries retrieved successfully")
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
@@ -323,21 +1141,28 @@ def internal_error(error):
 
 def cleanup():
     """Cleanup resources on app shutdown"""
-    global neo4j_service
-    if neo4j_service:
-        neo4j_service.close()
-        logger.info("Neo4j service connection closed")
+    global feedback_store
+    health_monitor.stop()
+    if traffic_capture:
+        traffic_capture.stop()
+    query_log.close()
+    if tenant_registry:
+        tenant_registry.close()
+    if feedback_store:
+        feedback_store.close()
+        logger.info("Storage backend connection closed")
 
 if __name__ == '__main__':
     try:
-        # Initialize Neo4j service
-        init_neo4j()
-        
         # Get configuration from environment
         port = int(os.getenv('FLASK_PORT', 8000))
         debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
         host = os.getenv('FLASK_HOST', '0.0.0.0')
         
+        # Initialize Neo4j service (only in the process that serves requests)
+        if not is_reloader_parent(debug):
+            init_storage()
+        
         logger.info(f"Starting Flask API server on {host}:{port}")
         
         # Register cleanup function
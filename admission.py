@@ -0,0 +1,118 @@
+"""
+Priority-aware admission control
+
+Requests are sorted into classes (ingest, light reads, heavy analytics,
+health). Each class has its own concurrency limit and a bounded wait queue,
+so a burst of heavy analytics queues or is shed without taking worker threads
+away from feedback ingest.
+"""
+
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+INGEST = 'ingest'
+LIGHT_READ = 'light_read'
+HEAVY_ANALYTICS = 'heavy_analytics'
+HEALTH = 'health'
+
+REQUEST_CLASSES = (INGEST, LIGHT_READ, HEAVY_ANALYTICS, HEALTH)
+
+# Analytics routes whose queries aggregate over many rows
+HEAVY_ROUTES = ('/api/feedback/trends', '/api/feedback/engagement', '/api/feedback/categories',
+                '/api/feedback/unique')
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    """Request class for a route, or None for routes outside admission control"""
+    if path.startswith('/api/health'):
+        return HEALTH
+    if path == '/api/feedback' and method == 'POST':
+        return INGEST
+    if path.startswith('/api/feedback/') and method == 'GET':
+        return HEAVY_ANALYTICS if path in HEAVY_ROUTES else LIGHT_READ
+    return None
+
+
+class AdmissionClass:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        """
+        Concurrency limit with a bounded wait queue
+
+        Args:
+            name: Request class name
+            max_concurrent: Requests of this class processed at once
+            max_queue: Requests allowed to wait for a slot; further ones are rejected
+            queue_timeout: Seconds a queued request waits before it is rejected
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting in the bounded queue if needed; False when rejected"""
+        if self._semaphore.acquire(blocking=False):
+            with self._lock:
+                self._active += 1
+            return True
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            self._waiting += 1
+        try:
+            admitted = self._semaphore.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            if admitted:
+                self._active += 1
+            else:
+                self.rejected += 1
+        return admitted
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'active': self._active,
+            'waiting': self._waiting,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'rejected': self.rejected
+        }
+
+
+class AdmissionController:
+    def __init__(self, classes: Dict[str, AdmissionClass]):
+        """Admission classes keyed by request class name"""
+        self.classes = classes
+
+    def acquire(self, request_class: str) -> bool:
+        admission = self.classes.get(request_class)
+        return admission.acquire() if admission else True
+
+    def release(self, request_class: str):
+        admission = self.classes.get(request_class)
+        if admission:
+            admission.release()
+
+    def retry_after(self, request_class: str) -> float:
+        admission = self.classes.get(request_class)
+        return admission.queue_timeout if admission else 1.0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: admission.stats() for name, admission in self.classes.items()}
@@ -13,6 +13,10 @@ Environment Variables:
     FLASK_HOST - Flask host (default: 0.0.0.0)
     FLASK_PORT - Flask port (default: 8000)
     FLASK_DEBUG - Enable debug mode (default: True)
+    STARTUP_MODE - blocking or background Neo4j bootstrap (default: blocking)
+    NEO4J_WARMUP_CONNECTIONS - Connections to pre-open at startup (default: 0)
+    STORAGE_BACKEND - neo4j or sqlite (default: neo4j)
+    SQLITE_PATH - SQLite database file when STORAGE_BACKEND=sqlite (default: feedback.db)
 """
 
 import os
@@ -29,7 +33,7 @@ sys.path.append(str(Path(__file__).parent))
 
 # Import Flask app
 try:
-    from Flask_api import app, init_neo4j, cleanup
+    from Flask_api import app, init_storage, cleanup, is_reloader_parent
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Make sure all required packages are installed:")
@@ -109,6 +113,8 @@ def print_startup_info():
     
     print("\n📡 Available Endpoints:")
     print("   GET  /api/health              - Service health check")
+    print("   GET  /api/health/live         - Liveness probe")
+    print("   GET  /api/health/ready        - Readiness probe")
     print("   POST /api/feedback            - Store user feedback")
     print("   GET  /api/feedback/analytics  - Overall analytics")
     print("   GET  /api/feedback/trends     - Feedback trends")
@@ -134,16 +140,18 @@ def main():
         # Print startup information
         print_startup_info()
         
-        # Initialize Neo4j service
-        logger.info("Initializing Neo4j service...")
-        init_neo4j()
-        logger.info("Neo4j service initialized successfully")
-        
         # Get Flask configuration
         host = os.getenv('FLASK_HOST', '0.0.0.0')
         port = int(os.getenv('FLASK_PORT', 8000))
         debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
         
+        # Initialize Neo4j service; the debug reloader's watcher process skips
+        # this so the connection check and schema bootstrap only run once
+        if not is_reloader_parent(debug):
+            logger.info("Initializing storage backend...")
+            init_storage()
+            logger.info("Storage backend initialized successfully")
+        
         # Register cleanup function
         import atexit
         atexit.register(cleanup)
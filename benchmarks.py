@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the in-process hot paths, with a regression gate
+
+Covers request validation, timestamp parsing, response serialisation, the
+row-to-dict conversions of the trends and engagement queries, and the full
+POST /api/feedback view on the Flask test client with a stubbed store.
+Nothing here needs Neo4j or a running server.
+
+Each benchmark is timed in several rounds of an auto-calibrated number of
+loops; the fastest round (per operation) is the gated metric because it is
+the least sensitive to scheduler noise. Results are compared with a JSON
+baseline and the run fails when any benchmark is still slower than the
+baseline by more than the threshold after being re-measured.
+
+Usage:
+    python benchmarks.py                      # compare with benchmark_baseline.json
+    python benchmarks.py --save               # record a new baseline
+    python benchmarks.py --threshold 0.1 --filter schema
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from neo4j import Record
+from neo4j.time import Date, DateTime
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_THRESHOLD = float(os.getenv('BENCHMARK_THRESHOLD', 0.25))
+
+# name -> setup(); setup returns the zero-argument operation to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def flask_api():
+    """Flask_api with its log handlers swapped for a NullHandler
+
+    Log records are still created (that cost is part of the request path), but
+    nothing is written to the console or feedback_api.log while timing.
+    """
+    import Flask_api
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.NullHandler())
+    return Flask_api
+
+
+def sample_payload() -> Dict[str, Any]:
+    return {
+        'user_query': 'How can I reduce plastic waste at home?',
+        'bot_response': 'Start by replacing single-use bags and bottles with reusable ones...',
+        'feedback_type': 'positive',
+        'user_comment': 'Clear and practical',
+        'rating_stars': 5,
+        'message_id': 'msg_1a2b3c4d5e6f',
+        'categories': ['helpful', 'accurate'],
+        'timestamp': '2024-01-15T10:30:00.123456Z'
+    }
+
+
+def trend_rows(days: int = 30) -> List[Dict[str, Any]]:
+    today = datetime.now(timezone.utc).date()
+    return [
+        {'feedback_date': Date.from_native(today - timedelta(days=offset)),
+         'feedback_type': feedback_type, 'count': 10 + offset}
+        for offset in range(days) for feedback_type in ('negative', 'positive')
+    ]
+
+
+def engagement_rows(limit: int = 20) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {'user_id': f'user_{index}', 'total_feedback': 100 - index, 'positive_feedback': 60 - index,
+         'first_feedback': DateTime.from_native(now - timedelta(days=90)),
+         'last_feedback': DateTime.from_native(now - timedelta(hours=index))}
+        for index in range(limit)
+    ]
+
+
+class RecordsTx:
+    """Transaction stand-in whose run() returns fixed neo4j Records (and no MonthlyArchive nodes)"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.records = [Record(row) for row in rows]
+
+    def run(self, query, parameters=None, **kwargs):
+        if 'MonthlyArchive' in query:
+            return iter(())
+        return iter(self.records)
+
+
+class StubStore:
+    """Store that accepts every write without I/O, isolating the view's own cost"""
+    database = 'benchmark'
+
+    def store_feedback(self, feedback_data: Dict[str, Any]) -> bool:
+        return True
+
+    def last_bookmark(self) -> Optional[str]:
+        return None
+
+
+def offline_service():
+    from fake_neo4j import FakeDriver
+    from neo4j_service import Neo4jService
+    return Neo4jService('fake://', '', '', driver=FakeDriver(), lazy=True)
+
+
+@benchmark('schema_load')
+def bench_schema_load():
+    api = flask_api()
+    payload = sample_payload()
+    return lambda: api.feedback_schema.load(payload)
+
+
+@benchmark('parse_timestamp')
+def bench_parse_timestamp():
+    api = flask_api()
+    return lambda: api.parse_timestamp('2024-01-15T10:30:00.123456Z')
+
+
+@benchmark('success_response_small')
+def bench_success_response_small():
+    api = flask_api()
+    context = api.app.test_request_context('/api/feedback/analytics')
+    context.push()
+    data = {'total_feedback': 1234, 'positive_count': 1000, 'negative_count': 234, 'satisfaction_rate': 81.04}
+    return lambda: api.create_success_response(data)
+
+
+@benchmark('success_response_trends')
+def bench_success_response_trends():
+    api = flask_api()
+    context = api.app.test_request_context('/api/feedback/trends?days=30')
+    context.push()
+    data = trend_rows(30)
+    return lambda: api.create_success_response(data, "Trends for last 30 days")
+
+
+@benchmark('trends_rows')
+def bench_trends_rows():
+    service = offline_service()
+    tx = RecordsTx(trend_rows(30))
+    return lambda: service._get_feedback_trends_query(tx, 30)
+
+
+@benchmark('engagement_rows')
+def bench_engagement_rows():
+    service = offline_service()
+    tx = RecordsTx(engagement_rows(20))
+    return lambda: service._get_user_engagement_query(tx, 20)
+
+
+@benchmark('store_feedback_view')
+def bench_store_feedback_view():
+    api = flask_api()
+    api.feedback_store = StubStore()
+    api.RATE_LIMIT_ENABLED = False
+    client = api.app.test_client()
+    payload = sample_payload()
+
+    def post():
+        response = client.post('/api/feedback', json=payload)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return post
+
+
+def measure(operation: Callable[[], Any], rounds: int = 7, min_round_time: float = 0.05) -> Dict[str, Any]:
+    """Per-operation timings in microseconds over `rounds` calibrated rounds"""
+    timer = timeit.Timer(operation)
+    loops, _ = timer.autorange()
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_round_time:
+            break
+        loops *= 2
+    samples = [elapsed] + timer.repeat(repeat=rounds - 1, number=loops)
+    per_op = sorted(sample / loops * 1e6 for sample in samples)
+    return {
+        'min_us': round(per_op[0], 3),
+        'median_us': round(statistics.median(per_op), 3),
+        'loops': loops,
+        'rounds': rounds
+    }
+
+
+def run_benchmarks(names: List[str], rounds: int = 7) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name in names:
+        operation = BENCHMARKS[name]()
+        operation()  # warm caches and imports outside the timed rounds
+        results[name] = measure(operation, rounds=rounds)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine()
+    }
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]]):
+    """Write results into the baseline, keeping entries for benchmarks that were not run"""
+    baseline = load_baseline(path)
+    benchmarks = baseline.get('benchmarks', {})
+    benchmarks.update(results)
+    baseline = {
+        'environment': environment(),
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'benchmarks': dict(sorted(benchmarks.items()))
+    }
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(baseline, handle, indent=2)
+        handle.write('\n')
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+            threshold: float) -> List[Dict[str, Any]]:
+    """One row per benchmark with its change against the baseline and a status"""
+    rows = []
+    recorded = baseline.get('benchmarks', {})
+    for name, result in results.items():
+        before = recorded.get(name, {}).get('min_us')
+        row = {'name': name, 'baseline_us': before, 'current_us': result['min_us'], 'change': None}
+        if not before:
+            row['status'] = 'new'
+        else:
+            row['change'] = result['min_us'] / before - 1
+            if row['change'] > threshold:
+                row['status'] = 'REGRESSED'
+            elif row['change'] < -threshold:
+                row['status'] = 'faster'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return rows
+
+
+def format_rows(rows: List[Dict[str, Any]], threshold: float) -> str:
+    header = f"{'benchmark':<26}{'baseline us':>13}{'current us':>13}{'change':>10}  status"
+    lines = [header, '-' * (len(header) + 4)]
+    for row in rows:
+        before = f"{row['baseline_us']:.2f}" if row['baseline_us'] else '-'
+        change = f"{row['change'] * 100:+.1f}%" if row['change'] is not None else '-'
+        lines.append(f"{row['name']:<26}{before:>13}{row['current_us']:>13.2f}{change:>10}  {row['status']}")
+    lines.append(f"threshold: +{threshold * 100:.0f}% on the fastest round per operation")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks with a regression gate")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action='store_true', help="Record results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction, e.g. 0.25 for 25%% (env BENCHMARK_THRESHOLD)")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per benchmark")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="Re-measure a regressed benchmark this many times before failing it")
+    parser.add_argument("--list", action='store_true', help="List benchmarks and exit")
+    parser.add_argument("--json-out", default=None, help="Write results as JSON to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+    if not names:
+        print(f"No benchmarks match '{args.filter}'", file=sys.stderr)
+        return 2
+
+    results = run_benchmarks(names, rounds=args.rounds)
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline, args.threshold)
+    # A single slow run on a busy machine is not a regression; keep the best of the re-runs
+    for _ in range(args.confirm):
+        suspects = [row['name'] for row in rows if row['status'] == 'REGRESSED']
+        if not suspects:
+            break
+        for name, result in run_benchmarks(suspects, rounds=args.rounds).items():
+            if result['min_us'] < results[name]['min_us']:
+                results[name] = result
+        rows = compare(results, baseline, args.threshold)
+    print(format_rows(rows, args.threshold))
+
+    if args.json_out == '-':
+        print(json.dumps({'environment': environment(), 'benchmarks': results}, indent=2))
+    elif args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as handle:
+            json.dump({'environment': environment(), 'benchmarks': results}, handle, indent=2)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"📄 Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if baseline and baseline.get('environment') != environment():
+        print(f"⚠️ Baseline was recorded on {baseline.get('environment')}; timings may not be comparable",
+              file=sys.stderr)
+    regressed = [row['name'] for row in rows if row['status'] == 'REGRESSED']
+    if regressed:
+        print(f"❌ Regressed beyond +{args.threshold * 100:.0f}%: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
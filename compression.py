@@ -0,0 +1,115 @@
+"""
+Negotiated HTTP response compression (gzip, deflate and brotli when installed)
+
+Success envelopes differ per request only by their timestamp, so the `data`
+segment of a body is compressed once per data version and cached as raw
+deflate blocks. Each response compresses just its small envelope prefix and
+suffix and splices them around the cached blocks; sync-flushed deflate blocks
+concatenate into one valid stream, the same technique pigz uses.
+"""
+
+import hashlib
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json',)
+
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+ZLIB_HEADER = b'\x78\x9c'
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this process can produce, in order of preference for equal q-values"""
+    return ('gzip', 'br', 'deflate') if brotli else ('gzip', 'deflate')
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _raw_deflate(data: bytes, level: int, final: bool) -> bytes:
+    """Raw deflate blocks; non-final blocks end byte-aligned so they can be concatenated"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _wrap(raw: bytes, body: bytes, encoding: str) -> bytes:
+    """Add the gzip or zlib container around a raw deflate stream of `body`"""
+    if encoding == 'gzip':
+        return GZIP_HEADER + raw + struct.pack('<II', zlib.crc32(body) & 0xffffffff, len(body) & 0xffffffff)
+    return ZLIB_HEADER + raw + struct.pack('>I', zlib.adler32(body) & 0xffffffff)
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a whole body with the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=min(level, 11))
+    return _wrap(_raw_deflate(body, level, final=True), body, encoding)
+
+
+class CompressionCache:
+    def __init__(self, max_entries: int = 256, level: int = 6):
+        """LRU of pre-compressed data segments keyed by a digest of their bytes"""
+        self.max_entries = max_entries
+        self.level = level
+        self._entries: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _segment(self, data: bytes) -> bytes:
+        key = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return raw
+            self.misses += 1
+        raw = _raw_deflate(data, self.level, final=False)
+        with self._lock:
+            self._entries[key] = raw
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return raw
+
+    def compress_segmented(self, body: bytes, start: int, end: int, encoding: str) -> bytes:
+        """Compress `body` reusing the cached blocks for body[start:end]"""
+        if encoding == 'br':
+            return compress(body, encoding, self.level)
+        raw = (
+            _raw_deflate(body[:start], self.level, final=False)
+            + self._segment(body[start:end])
+            + _raw_deflate(body[end:], self.level, final=True)
+        )
+        return _wrap(raw, body, encoding)
+
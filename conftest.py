@@ -0,0 +1,67 @@
+"""
+Shared pytest fixtures: Neo4jService on the in-process fake driver, sample
+feedback payloads and the Flask API wired to a fake-backed store
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fake_neo4j import FakeDriver
+from neo4j_service import Neo4jService
+from resilience import ResiliencePolicy, CircuitBreaker
+
+
+def build_service(driver=None, failure_threshold=5, **policy_kwargs):
+    policy = ResiliencePolicy(base_delay=0.001, max_delay=0.002,
+                              breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=60),
+                              **policy_kwargs)
+    service = Neo4jService('fake://', '', '', driver=driver or FakeDriver(), lazy=True, policy=policy)
+    service.bootstrap()
+    return service
+
+
+def build_feedback(feedback_type='positive', days_ago=0, categories=None):
+    timestamp = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {
+        'user_query': 'How can I reduce my carbon footprint?',
+        'bot_response': 'Here are some ways...',
+        'feedback_type': feedback_type,
+        'user_comment': '',
+        'rating_stars': 5 if feedback_type == 'positive' else 2,
+        'categories': categories or [],
+        'timestamp': timestamp.isoformat()
+    }
+
+
+@pytest.fixture(scope='session')
+def make_service():
+    """make_service(driver=None, failure_threshold=5, **policy_kwargs): a bootstrapped
+    Neo4jService on a fake driver, with millisecond retry backoff"""
+    return build_service
+
+
+@pytest.fixture(scope='session')
+def sample_feedback():
+    """sample_feedback(feedback_type='positive', days_ago=0, categories=None): a valid payload"""
+    return build_feedback
+
+
+@pytest.fixture
+def service():
+    return build_service()
+
+
+@pytest.fixture
+def api(monkeypatch, service):
+    """Flask_api serving `service` with rate limiting off; monkeypatch its attributes to change that"""
+    import Flask_api
+
+    monkeypatch.setattr(Flask_api, 'feedback_store', service)
+    monkeypatch.setattr(Flask_api, 'RATE_LIMIT_ENABLED', False)
+    return Flask_api
+
+
+@pytest.fixture
+def api_client(api):
+    return api.app.test_client()
@@ -0,0 +1,898 @@
+"""
+In-process stand-in for the Neo4j driver
+
+Implements the driver / session / transaction / result surface used by
+Neo4jService and MigrationRunner, backed by an in-memory graph that answers
+the project's own Cypher statements. Latency can be drawn from a configurable
+distribution and errors injected at a given rate or on demand, so retry,
+breaker, load and tail-latency experiments run without a database:
+
+    driver = FakeDriver(latency=LatencyModel.lognormal(5, 0.6),
+                        faults=FaultInjector({TransientError: 0.01}, seed=7))
+    service = Neo4jService('fake://', '', '', driver=driver, lazy=True)
+
+Statements the fake does not know raise a ClientError naming the query, so a
+new query in the service fails loudly here until it is taught to the fake.
+"""
+
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from neo4j import Bookmarks, READ_ACCESS, WRITE_ACCESS
+from neo4j.exceptions import Neo4jError, ServiceUnavailable, TransientError
+from neo4j.time import DateTime as Neo4jDateTime, Date as Neo4jDate
+
+from search import InvertedIndex
+
+# Server status codes used when injecting Neo4jError subclasses
+ERROR_CODES = {
+    TransientError: 'Neo.TransientError.Transaction.DeadlockDetected',
+}
+
+
+def make_error(error_type: type, message: str) -> Exception:
+    """An exception of `error_type` shaped like the one the real driver raises"""
+    if error_type in ERROR_CODES:
+        return Neo4jError.hydrate(message=message, code=ERROR_CODES[error_type])
+    return error_type(message)
+
+
+def client_error(code: str, message: str) -> Exception:
+    return Neo4jError.hydrate(message=message, code=f"Neo.ClientError.{code}")
+
+
+class LatencyModel:
+    def __init__(self, sampler: Callable[[random.Random], float], seed: Optional[int] = None):
+        """Per-statement latency in seconds drawn by `sampler`; build with the class methods"""
+        self._sampler = sampler
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._spike_probability = 0.0
+        self._spike_seconds = 0.0
+
+    @classmethod
+    def constant(cls, ms: float) -> 'LatencyModel':
+        return cls(lambda rng: ms / 1000.0)
+
+    @classmethod
+    def uniform(cls, low_ms: float, high_ms: float, seed: Optional[int] = None) -> 'LatencyModel':
+        return cls(lambda rng: rng.uniform(low_ms, high_ms) / 1000.0, seed)
+
+    @classmethod
+    def exponential(cls, mean_ms: float, seed: Optional[int] = None) -> 'LatencyModel':
+        return cls(lambda rng: rng.expovariate(1.0 / mean_ms) / 1000.0 if mean_ms > 0 else 0.0, seed)
+
+    @classmethod
+    def lognormal(cls, median_ms: float, sigma: float = 0.5, seed: Optional[int] = None) -> 'LatencyModel':
+        """Long-tailed latency; `median_ms` is the p50 and `sigma` widens the tail"""
+        mu = math.log(median_ms) if median_ms > 0 else 0.0
+        return cls(lambda rng: rng.lognormvariate(mu, sigma) / 1000.0 if median_ms > 0 else 0.0, seed)
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> 'LatencyModel':
+        """From "constant:2", "uniform:1:5", "exponential:3" or "lognormal:5:0.6", with an
+        optional ",spike:0.01:250" suffix (1% of statements take an extra 250ms)"""
+        spec, _, spike = spec.partition(',')
+        kind, *args = spec.split(':')
+        values = [float(arg) for arg in args]
+        builders = {'constant': cls.constant, 'uniform': cls.uniform,
+                    'exponential': cls.exponential, 'lognormal': cls.lognormal}
+        if kind not in builders:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        model = builders[kind](*values) if kind == 'constant' else builders[kind](*values, seed=seed)
+        if spike:
+            _, probability, ms = spike.split(':')
+            model.with_spikes(float(probability), float(ms))
+        return model
+
+    def with_spikes(self, probability: float, ms: float) -> 'LatencyModel':
+        """Add a rare extra delay, e.g. a GC pause or a page-cache miss"""
+        self._spike_probability = probability
+        self._spike_seconds = ms / 1000.0
+        return self
+
+    def sample(self) -> float:
+        with self._lock:
+            seconds = self._sampler(self._random)
+            if self._spike_probability and self._random.random() < self._spike_probability:
+                seconds += self._spike_seconds
+        return seconds
+
+
+class FaultInjector:
+    def __init__(self, rates: Optional[Dict[type, float]] = None, seed: Optional[int] = None):
+        """
+        Errors raised by statements, at random or on demand
+
+        Args:
+            rates: Error type -> probability per auto-commit statement or transaction,
+                e.g. {TransientError: 0.02}; see FakeTransaction.run
+            seed: Seed for reproducible fault sequences
+        """
+        self.rates = dict(rates or {})
+        self._random = random.Random(seed)
+        self._scheduled: List[type] = []
+        self._lock = threading.Lock()
+        self.injected = 0
+
+    def fail_next(self, error_type: type = TransientError, count: int = 1):
+        """Make the next `count` auto-commit statements or transactions raise `error_type`"""
+        with self._lock:
+            self._scheduled.extend([error_type] * count)
+
+    def check(self, query: str):
+        with self._lock:
+            error_type = self._scheduled.pop(0) if self._scheduled else None
+            if error_type is None:
+                for candidate, rate in self.rates.items():
+                    if rate and self._random.random() < rate:
+                        error_type = candidate
+                        break
+            if error_type is None:
+                return
+            self.injected += 1
+        raise make_error(error_type, f"Injected {error_type.__name__} for: {' '.join(query.split())[:80]}")
+
+
+class FakeSummary:
+    def __init__(self, query: str, parameters: Dict[str, Any], available_ms: int, consumed_ms: int,
+                 database: str):
+        """The parts of neo4j.ResultSummary the project reads"""
+        self.query = query
+        self.parameters = parameters
+        self.result_available_after = available_ms
+        self.result_consumed_after = consumed_ms
+        self.database = database
+        self.plan = None
+        self.profile = None
+        self.notifications = None
+
+
+class FakeRecord(dict):
+    """Record supporting record['key'], dict(record), keys() and values()"""
+
+    def data(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+class FakeResult:
+    def __init__(self, records: List[Dict[str, Any]], summary: FakeSummary):
+        self._records = [FakeRecord(record) for record in records]
+        self._summary = summary
+        self._position = 0
+
+    def __iter__(self) -> Iterator[FakeRecord]:
+        while self._position < len(self._records):
+            record = self._records[self._position]
+            self._position += 1
+            yield record
+
+    def keys(self) -> List[str]:
+        return list(self._records[0].keys()) if self._records else []
+
+    def single(self, strict: bool = False) -> Optional[FakeRecord]:
+        remaining = self._records[self._position:]
+        self._position = len(self._records)
+        if strict and len(remaining) != 1:
+            raise ValueError(f"Expected exactly one record, found {len(remaining)}")
+        return remaining[0] if remaining else None
+
+    def data(self) -> List[Dict[str, Any]]:
+        return [record.data() for record in self]
+
+    def consume(self) -> FakeSummary:
+        self._position = len(self._records)
+        return self._summary
+
+
+def _to_native(value: Any) -> Any:
+    return value.to_native() if isinstance(value, (Neo4jDateTime, Neo4jDate)) else value
+
+
+def _utc_date(value: Any) -> date:
+    """Cypher date(datetime({datetime: value, timezone: 'UTC'}))"""
+    return _to_native(value).astimezone(timezone.utc).date()
+
+
+def parse_datetime(value: str) -> Neo4jDateTime:
+    """Cypher datetime($value): ISO 8601, naive values are UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return Neo4jDateTime.from_native(parsed)
+
+
+class FakeGraph:
+    def __init__(self):
+        """In-memory Feedback graph answering the statements used by this project"""
+        self.feedback: List[Dict[str, Any]] = []
+        self.schema_version: Optional[Dict[str, Any]] = None
+        self.indexes: Dict[str, str] = {}
+        self.constraints: Dict[str, str] = {}
+        self.archives: Dict[str, Dict[str, Any]] = {}
+        self.days: Dict[str, Dict[str, Any]] = {}  # time tree: ISO date -> Day node
+        self.users: Dict[str, Dict[str, Any]] = {}  # user_id -> User node
+        self.sketches: Dict[str, Dict[str, Any]] = {}  # ISO date -> DaySketch node
+        self.intents: Dict[str, Dict[str, Any]] = {}  # intent name -> Intent node
+        self._next_id = 0
+        self._lock = threading.RLock()
+        # (pattern on the whitespace-normalised query, handler); first match wins
+        self._handlers = [
+            (r"^RETURN 1 as status$", lambda p: [{'status': 1}]),
+            (r"^RETURN 1$", lambda p: [{'1': 1}]),
+            (r"^CREATE INDEX (\w+) IF NOT EXISTS", self._create_index),
+            (r"^CREATE CONSTRAINT (\w+) IF NOT EXISTS", self._create_constraint),
+            (r"^CREATE FULLTEXT INDEX (\w+) IF NOT EXISTS", self._create_index),
+            (r"^CALL db\.index\.fulltext\.queryNodes\('(\w+)', \$search\)", self._fulltext_search),
+            (r"^MATCH \(a:MonthlyArchive\) RETURN a \{\.\*\} AS archive ORDER BY a\.month$", self._archives),
+            (r"^MATCH \(a:MonthlyArchive\) RETURN a\.month AS month", self._archive_status),
+            (r"^MERGE \(a:MonthlyArchive \{month: \$month\}\) SET a \+= \$aggregate", self._save_archive),
+            (r"RETURN min\(f\.timestamp\) AS oldest$", self._oldest),
+            (r"RETURN elementId\(f\) AS id, f \{\.\*\} AS feedback$", self._export_month),
+            (r"CALL \{ WITH f OPTIONAL MATCH \(f\)-\[:ON_DAY\]->\(d:Day\)", self._delete_month),
+            (r"d\.total <= 0 AND NOT \(d\)<-\[:ON_DAY\]-\(\)", self._prune_days),
+            (r"RETURN min\(d\.date\) AS oldest$", self._oldest_day),
+            (r"^MATCH \(d:Day\) RETURN sum\(d\.total\) AS linked$", self._linked),
+            (r"NOT \(f\)-\[:ON_DAY\]->\(:Day\) RETURN count\(f\) AS remaining$", self._unlinked_remaining),
+            (r"NOT \(f\)-\[:ON_DAY\]->\(:Day\) WITH f LIMIT \$chunk_size CALL", self._link_backfill),
+            (r"^MATCH \(f:Feedback\)-\[:ON_DAY\]->\(d:Day\) WHERE d\.date <> .* RETURN count\(f\) AS remaining$",
+             self._misplaced_remaining),
+            (r"^MATCH \(f:Feedback\)-\[:ON_DAY\]->\(d:Day\) WHERE d\.date <> .* WITH f LIMIT \$chunk_size CALL",
+             self._relink_backfill),
+            (r"sum\(d\.total\) as total_feedback", self._day_overall),
+            (r"RETURN d\.date AS feedback_date", self._day_trends),
+            (r"NOT \(f\)<-\[:GAVE\]-\(:User\) RETURN count\(f\) AS remaining$", self._users_remaining),
+            (r"NOT \(f\)<-\[:GAVE\]-\(:User\) WITH f LIMIT \$chunk_size CALL", self._user_backfill),
+            (r"NOT \(f\)-\[:HAS_INTENT\]->\(:Intent\) RETURN count\(f\) AS remaining$", self._intents_remaining),
+            (r"NOT \(f\)-\[:HAS_INTENT\]->\(:Intent\) WITH f LIMIT \$chunk_size CALL", self._intent_backfill),
+            (r"WHERE a\.intents_counted IS NULL RETURN count\(a\) AS remaining$", self._archive_intents_remaining),
+            (r"WHERE a\.intents_counted IS NULL WITH a LIMIT \$chunk_size CALL", self._archive_intent_backfill),
+            (r"^CREATE \(f:Feedback \{(.*)$", self._create_feedback),
+            (r"^MATCH \(s:DaySketch \{date: date\(\$day\)\}\) RETURN s\.users", self._read_sketch),
+            (r"^MERGE \(s:DaySketch \{date: date\(\$day\)\}\) SET s\.updated_at", self._lock_sketch),
+            (r"^MATCH \(s:DaySketch \{date: date\(\$day\)\}\) SET s\.users", self._save_sketch),
+            (r"^MATCH \(s:DaySketch\) WHERE s\.date >= date\(\$start\)", self._sketch_range),
+            (r"f\.sketched IS NULL RETURN count\(f\) AS remaining$", self._unsketched_remaining),
+            (r"f\.sketched IS NULL WITH f LIMIT \$chunk_size RETURN elementId\(f\) AS id", self._sketch_source),
+            (r"^MATCH \(f:Feedback\) WHERE elementId\(f\) IN \$ids SET f\.sketched = true$", self._mark_sketched),
+            (r"f\.sketched IS NOT NULL RETURN count\(f\) AS remaining$", self._sketched_remaining),
+            (r"f\.sketched IS NOT NULL WITH f LIMIT \$chunk_size CALL", self._sketch_reset),
+            (r"^MATCH \(f:Feedback\) RETURN count\(f\) as total$", self._count),
+            (r"i\.name as intent_name", self._intent_performance),
+            (r"timezone: 'UTC'\}\)\) as feedback_date", self._trends),
+            (r"u\.user_id as user_id", self._engagement),
+            (r"UNWIND f\.categories as category", self._categories),
+            (r"count\(f\) as total_feedback", self._overall),
+            (r"WHERE f\.categories IS NULL RETURN count\(f\) = 0 AS ok$", self._categories_verified),
+            (r"WHERE f\.categories IS NULL RETURN count\(f\) AS remaining$", self._categories_remaining),
+            (r"WHERE f\.categories IS NULL WITH f LIMIT \$chunk_size CALL", self._categories_backfill),
+            (r"^MATCH \(v:SchemaVersion \{name: 'feedback'\}\) RETURN v\.version as version$", self._schema_version),
+            (r"^MATCH \(v:SchemaVersion \{name: 'feedback'\}\) RETURN v \{\.\*\} as v$", self._schema_node),
+            (r"RETURN v\.backfill_name as name, v\.backfill_processed as processed$", self._backfill_progress),
+            (r"^MERGE \(v:SchemaVersion \{name: 'feedback'\}\) SET v\.version", self._record_version),
+            (r"^MERGE \(v:SchemaVersion \{name: 'feedback'\}\) SET v\.backfill_name", self._record_backfill),
+            (r"WHERE v\.backfill_name = \$name REMOVE v\.backfill_name", self._clear_backfill),
+        ]
+        self._handlers = [(re.compile(pattern), handler) for pattern, handler in self._handlers]
+
+    def run(self, query: str, parameters: Dict[str, Any], in_transaction: bool) -> List[Dict[str, Any]]:
+        normalized = ' '.join(query.split())
+        if in_transaction and 'IN TRANSACTIONS' in normalized:
+            raise client_error('Transaction.TransactionStartFailed',
+                               "CALL { ... } IN TRANSACTIONS can only be executed in an implicit transaction")
+        for pattern, handler in self._handlers:
+            match = pattern.search(normalized)
+            if match:
+                with self._lock:
+                    if pattern.groups:
+                        return handler(parameters, *match.groups())
+                    return handler(parameters)
+        raise client_error('Statement.SyntaxError', f"Fake driver does not understand: {normalized[:200]}")
+
+    def plan(self, query: str, rows: Optional[int]) -> Dict[str, Any]:
+        """Two-operator plan over the Feedback label; `rows` (PROFILE only) adds rows and DB hits"""
+        scanned = len(self.feedback)
+        scan = {'operatorType': 'NodeByLabelScan@neo4j', 'identifiers': ['f'],
+                'args': {'EstimatedRows': float(scanned), 'Details': 'f:Feedback'}, 'children': []}
+        root = {'operatorType': 'ProduceResults@neo4j', 'identifiers': ['f'],
+                'args': {'EstimatedRows': float(scanned)}, 'children': [scan]}
+        if rows is not None:
+            scan.update(rows=scanned, dbHits=scanned + 1)
+            root.update(rows=rows, dbHits=0)
+        return root
+
+    def seed(self, records: List[Dict[str, Any]]):
+        """Insert Feedback nodes directly; `timestamp` may be an ISO string or a datetime"""
+        with self._lock:
+            for record in records:
+                node = dict(record)
+                timestamp = node.get('timestamp')
+                if isinstance(timestamp, str):
+                    node['timestamp'] = parse_datetime(timestamp)
+                elif isinstance(timestamp, datetime):
+                    node['timestamp'] = Neo4jDateTime.from_native(
+                        timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc))
+                node.setdefault('created_at', Neo4jDateTime.from_native(datetime.now(timezone.utc)))
+                node['_id'] = self._next_id
+                self._next_id += 1
+                self.feedback.append(node)
+
+    def _create_index(self, params, name):
+        self.indexes[name] = name
+        return []
+
+    def _create_constraint(self, params, name):
+        self.constraints[name] = name
+        return []
+
+    def _live(self, params) -> List[Dict[str, Any]]:
+        """Feedback at or after $horizon, the part analytics read from nodes"""
+        if 'horizon' not in params:
+            return self.feedback
+        horizon = parse_datetime(params['horizon']).to_native()
+        return [f for f in self.feedback if f.get('timestamp') is not None
+                and _to_native(f['timestamp']) >= horizon]
+
+    def _in_month(self, params) -> List[Dict[str, Any]]:
+        start, end = parse_datetime(params['start']).to_native(), parse_datetime(params['end']).to_native()
+        snapshot = parse_datetime(params['snapshot']).to_native()
+        return [f for f in self.feedback
+                if f.get('timestamp') is not None and start <= _to_native(f['timestamp']) < end
+                and (f.get('created_at') is None or _to_native(f['created_at']) < snapshot)]
+
+    def _archives(self, params):
+        return [{'archive': dict(self.archives[month])} for month in sorted(self.archives)]
+
+    def _archive_status(self, params):
+        return [{'month': a['month'], 'total': a.get('total'), 'file': a.get('file'),
+                 'archived_at': a.get('archived_at')} for _, a in sorted(self.archives.items())]
+
+    def _save_archive(self, params):
+        archive = self.archives.setdefault(params['month'], {'month': params['month']})
+        archive.update(params['aggregate'])
+        archive['start'] = parse_datetime(params['start'])
+        archive['end'] = parse_datetime(params['end'])
+        archive['archived_at'] = Neo4jDateTime.from_native(datetime.now(timezone.utc))
+        return []
+
+    def _oldest(self, params):
+        cutoff = parse_datetime(params['cutoff']).to_native()
+        old = [f['timestamp'] for f in self.feedback
+               if f.get('timestamp') is not None and _to_native(f['timestamp']) < cutoff]
+        return [{'oldest': min(old, key=_to_native) if old else None}]
+
+    def _export_month(self, params):
+        return [{'id': f"4:fake:{f['_id']}", 'feedback': {k: v for k, v in f.items() if not k.startswith('_')}}
+                for f in self._in_month(params)]
+
+    def _delete_month(self, params):
+        doomed = self._in_month(params)[:params['chunk_size']]
+        for f in doomed:
+            day = self.days.get(f.get('_day'))
+            if day is not None:
+                day['total'] -= 1
+                if f.get('feedback_type') in ('positive', 'negative'):
+                    day[f['feedback_type']] -= 1
+        doomed_ids = {id(f) for f in doomed}
+        self.feedback = [f for f in self.feedback if id(f) not in doomed_ids]
+        return [{'deleted': len(doomed)}]
+
+    def _link_day(self, node: Dict[str, Any]):
+        """Attach a Feedback node to the UTC Day of its timestamp"""
+        day = _utc_date(node['timestamp'])
+        key = day.isoformat()
+        entry = self.days.setdefault(key, {'date': Neo4jDate.from_native(day), 'month': key[:7],
+                                           'total': 0, 'positive': 0, 'negative': 0})
+        entry['total'] += 1
+        if node.get('feedback_type') in ('positive', 'negative'):
+            entry[node['feedback_type']] += 1
+        node['_day'] = key
+
+    def _horizon_day(self, params):
+        return parse_datetime(params['horizon']).to_native().date()
+
+    def _prune_days(self, params):
+        low = parse_datetime(params['start']).to_native().date()
+        high = parse_datetime(params['end']).to_native().date()
+        linked = {f.get('_day') for f in self.feedback}
+        for key, day in list(self.days.items()):
+            if low <= day['date'].to_native() < high and day['total'] <= 0 and key not in linked:
+                del self.days[key]
+        return []
+
+    def _oldest_day(self, params):
+        cutoff = parse_datetime(params['cutoff']).to_native().date()
+        old = [day['date'] for day in self.days.values() if day['date'].to_native() < cutoff and day['total'] > 0]
+        return [{'oldest': min(old, key=_to_native) if old else None}]
+
+    def _linked(self, params):
+        return [{'linked': sum(day['total'] for day in self.days.values())}]
+
+    def _unlinked(self) -> List[Dict[str, Any]]:
+        return [f for f in self.feedback if f.get('timestamp') is not None and '_day' not in f]
+
+    def _unlinked_remaining(self, params):
+        return [{'remaining': len(self._unlinked())}]
+
+    def _link_backfill(self, params):
+        pending = self._unlinked()[:params['chunk_size']]
+        for f in pending:
+            self._link_day(f)
+        return [{'processed': len(pending)}]
+
+    def _misplaced(self) -> List[Dict[str, Any]]:
+        return [f for f in self.feedback if '_day' in f and f['_day'] != _utc_date(f['timestamp']).isoformat()]
+
+    def _misplaced_remaining(self, params):
+        return [{'remaining': len(self._misplaced())}]
+
+    def _relink_backfill(self, params):
+        pending = self._misplaced()[:params['chunk_size']]
+        for f in pending:
+            old = self.days[f.pop('_day')]
+            old['total'] -= 1
+            if f.get('feedback_type') in ('positive', 'negative'):
+                old[f['feedback_type']] -= 1
+            self._link_day(f)
+        return [{'processed': len(pending)}]
+
+    def _day_overall(self, params):
+        since = self._horizon_day(params)
+        days = [day for day in self.days.values() if day['date'].to_native() >= since]
+        total = sum(day['total'] for day in days)
+        positive = sum(day['positive'] for day in days)
+        return [{
+            'total_feedback': total,
+            'positive_count': positive,
+            'negative_count': sum(day['negative'] for day in days),
+            'satisfaction_rate': round(positive * 100.0 / total, 2) if total else 0
+        }]
+
+    def _day_trends(self, params):
+        since = max(datetime.now(timezone.utc).date() - timedelta(days=params['days']), self._horizon_day(params))
+        days = sorted((day for day in self.days.values() if day['date'].to_native() >= since),
+                      key=lambda day: day['date'].to_native(), reverse=True)
+        return [{'feedback_date': day['date'], 'negative': day['negative'], 'positive': day['positive']}
+                for day in days]
+
+    def _link_user(self, node: Dict[str, Any]):
+        """Attach a Feedback node to its User and update the User counters"""
+        user = self.users.setdefault(node['user_id'], {
+            'user_id': node['user_id'], 'total_feedback': 0, 'positive_feedback': 0,
+            'first_feedback': node['timestamp'], 'last_feedback': node['timestamp']})
+        user['total_feedback'] += 1
+        if node.get('feedback_type') == 'positive':
+            user['positive_feedback'] += 1
+        user['first_feedback'] = min(user['first_feedback'], node['timestamp'], key=_to_native)
+        user['last_feedback'] = max(user['last_feedback'], node['timestamp'], key=_to_native)
+        node['_user'] = node['user_id']
+
+    def _unlinked_users(self) -> List[Dict[str, Any]]:
+        return [f for f in self.feedback if f.get('user_id') is not None and '_user' not in f]
+
+    def _users_remaining(self, params):
+        return [{'remaining': len(self._unlinked_users())}]
+
+    def _user_backfill(self, params):
+        pending = self._unlinked_users()[:params['chunk_size']]
+        for f in pending:
+            self._link_user(f)
+        return [{'processed': len(pending)}]
+
+    def _intent(self, name: str) -> Dict[str, Any]:
+        return self.intents.setdefault(name, {'name': name, 'total': 0, 'positive': 0, 'negative': 0,
+                                              'confidence_sum': 0.0, 'confidence_count': 0})
+
+    def _link_intent(self, node: Dict[str, Any]):
+        """Attach a Feedback node to its Intent and update the running totals"""
+        intent = self._intent(node['detected_intent'])
+        intent['total'] += 1
+        if node.get('feedback_type') in ('positive', 'negative'):
+            intent[node['feedback_type']] += 1
+        if node.get('confidence_score') is not None:
+            intent['confidence_sum'] += node['confidence_score']
+            intent['confidence_count'] += 1
+        node['_intent'] = node['detected_intent']
+
+    def _unlinked_intents(self) -> List[Dict[str, Any]]:
+        return [f for f in self.feedback if f.get('detected_intent') and '_intent' not in f]
+
+    def _intents_remaining(self, params):
+        return [{'remaining': len(self._unlinked_intents())}]
+
+    def _intent_backfill(self, params):
+        pending = self._unlinked_intents()[:params['chunk_size']]
+        for f in pending:
+            self._link_intent(f)
+        return [{'processed': len(pending)}]
+
+    def _archive_intents_remaining(self, params):
+        return [{'remaining': sum(1 for a in self.archives.values() if a.get('intents_counted') is None)}]
+
+    def _archive_intent_backfill(self, params):
+        pending = [a for a in self.archives.values() if a.get('intents_counted') is None][:params['chunk_size']]
+        for archive in pending:
+            archive['intents_counted'] = True
+            for index, name in enumerate(archive.get('intents') or []):
+                intent = self._intent(name)
+                intent['positive'] += archive['intents_positive'][index]
+                intent['negative'] += archive['intents_negative'][index]
+                intent['total'] += archive['intents_positive'][index] + archive['intents_negative'][index]
+                intent['confidence_sum'] += archive['intents_confidence_sum'][index]
+                intent['confidence_count'] += archive['intents_confidence_count'][index]
+        return [{'processed': len(pending)}]
+
+    def _create_feedback(self, params, rest):
+        node = {key: params[key] for key in ('user_query', 'bot_response', 'feedback_type',
+                                             'user_comment', 'rating_stars', 'categories')}
+        for key in ('user_id', 'detected_intent', 'confidence_score'):
+            if params.get(key) is not None:
+                node[key] = params[key]
+        node['timestamp'] = parse_datetime(params['timestamp'])
+        node['created_at'] = Neo4jDateTime.from_native(datetime.now(timezone.utc))
+        node['_id'] = self._next_id
+        self._next_id += 1
+        self.feedback.append(node)
+        if 'CREATE (f)-[:ON_DAY]->(d)' in rest:
+            self._link_day(node)
+        if 'CREATE (u)-[:GAVE]->(f)' in rest:
+            self._link_user(node)
+        if 'CREATE (f)-[:HAS_INTENT]->(i)' in rest:
+            self._link_intent(node)
+        return [{'node_id': node['_id']}]
+
+    def _read_sketch(self, params):
+        sketch = self.sketches.get(params['day'])
+        return [{'users': sketch.get('users'), 'queries': sketch.get('queries')}] if sketch else []
+
+    def _lock_sketch(self, params):
+        sketch = self.sketches.setdefault(params['day'], {'date': Neo4jDate.from_native(
+            datetime.fromisoformat(params['day']).date())})
+        sketch['updated_at'] = Neo4jDateTime.from_native(datetime.now(timezone.utc))
+        return self._read_sketch(params)
+
+    def _save_sketch(self, params):
+        sketch = self.sketches.get(params['day'])
+        if sketch is not None:
+            sketch.update(users=bytes(params['users']), queries=bytes(params['queries']))
+        return []
+
+    def _sketch_range(self, params):
+        return [{'date': self.sketches[day]['date'], 'users': self.sketches[day].get('users'),
+                 'queries': self.sketches[day].get('queries')}
+                for day in sorted(self.sketches) if params['start'] <= day <= params['end']]
+
+    def _unsketched(self) -> List[Dict[str, Any]]:
+        return [f for f in self.feedback if f.get('timestamp') is not None and f.get('sketched') is None]
+
+    def _unsketched_remaining(self, params):
+        return [{'remaining': len(self._unsketched())}]
+
+    def _sketch_source(self, params):
+        return [{'id': f"4:fake:{f['_id']}", 'day': _utc_date(f['timestamp']).isoformat(),
+                 'user_id': f.get('user_id'), 'user_query': f.get('user_query')}
+                for f in self._unsketched()[:params['chunk_size']]]
+
+    def _mark_sketched(self, params):
+        ids = set(params['ids'])
+        for f in self.feedback:
+            if f"4:fake:{f['_id']}" in ids:
+                f['sketched'] = True
+        return []
+
+    def _sketched_remaining(self, params):
+        return [{'remaining': sum(1 for f in self.feedback if f.get('sketched') is not None)}]
+
+    def _sketch_reset(self, params):
+        marked = [f for f in self.feedback if f.get('sketched') is not None][:params['chunk_size']]
+        for f in marked:
+            del f['sketched']
+        return [{'processed': len(marked)}]
+
+    def _fulltext_search(self, params, index_name):
+        """queryNodes plus the filters and keyset cursor of the search statement, scored like InvertedIndex"""
+        if index_name not in self.indexes:
+            raise client_error('Procedure.ProcedureCallFailed', f"There is no such fulltext schema index: {index_name}")
+        index = InvertedIndex()
+        nodes = {}
+        for f in self.feedback:
+            nodes[f"4:fake:{f['_id']}"] = f
+            index.add(f"4:fake:{f['_id']}", f)
+        start = parse_datetime(params['start']).to_native() if params.get('start') else None
+        end = parse_datetime(params['end']).to_native() if params.get('end') else None
+        rows = []
+        for score, node_id in index.search([term for term in params['search'].split(' AND ')]):
+            f = nodes[node_id]
+            timestamp = _to_native(f.get('timestamp'))
+            if (params.get('feedback_type') is not None and f.get('feedback_type') != params['feedback_type']) \
+                    or (params.get('min_rating') is not None and f.get('rating_stars', 0) < params['min_rating']) \
+                    or (params.get('max_rating') is not None and f.get('rating_stars', 0) > params['max_rating']) \
+                    or (start is not None and (timestamp is None or timestamp < start)) \
+                    or (end is not None and (timestamp is None or timestamp >= end)):
+                continue
+            after = params.get('after_score')
+            if after is not None and (score > after or (score == after and node_id <= params['after_id'])):
+                continue
+            rows.append({'id': node_id, 'score': score, 'feedback': {
+                key: f.get(key) for key in ('user_query', 'bot_response', 'user_comment', 'feedback_type',
+                                            'rating_stars', 'timestamp')}})
+        return rows[:params['limit']]
+
+    def _count(self, params):
+        return [{'total': len(self.feedback)}]
+
+    def _overall(self, params):
+        live = self._live(params)
+        total = len(live)
+        positive = sum(1 for f in live if f.get('feedback_type') == 'positive')
+        negative = sum(1 for f in live if f.get('feedback_type') == 'negative')
+        return [{
+            'total_feedback': total,
+            'positive_count': positive,
+            'negative_count': negative,
+            'satisfaction_rate': round(positive * 100.0 / total, 2) if total else 0
+        }]
+
+    def _intent_performance(self, params):
+        rows = [
+            {
+                'intent_name': intent['name'],
+                'total_feedback': intent['total'],
+                'positive_count': intent['positive'],
+                'negative_count': intent['negative'],
+                'satisfaction_rate': round(intent['positive'] * 100.0 / intent['total'], 2),
+                'avg_confidence': round(intent['confidence_sum'] / intent['confidence_count'], 3)
+                if intent['confidence_count'] else None
+            }
+            for intent in self.intents.values() if intent['total'] > 0
+        ]
+        rows.sort(key=lambda row: (row['satisfaction_rate'], -row['total_feedback']))
+        return rows
+
+    def _trends(self, params):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=params['days'])
+        counts: Dict[tuple, int] = {}
+        for f in self._live(params):
+            timestamp = _to_native(f.get('timestamp'))
+            if timestamp is None or timestamp < cutoff:
+                continue
+            key = (_utc_date(timestamp), f.get('feedback_type'))
+            counts[key] = counts.get(key, 0) + 1
+        rows = [
+            {'feedback_date': Neo4jDate.from_native(day), 'feedback_type': feedback_type, 'count': count}
+            for (day, feedback_type), count in counts.items()
+        ]
+        rows.sort(key=lambda row: row['feedback_type'])
+        rows.sort(key=lambda row: row['feedback_date'].to_native(), reverse=True)
+        return rows
+
+    def _engagement(self, params):
+        users = sorted(self.users.values(), key=lambda user: user['total_feedback'], reverse=True)
+        return [dict(user) for user in users[:params['limit']]]
+
+    def _categories(self, params):
+        counts: Dict[tuple, int] = {}
+        for f in self._live(params):
+            for category in f.get('categories') or []:
+                key = (category, f.get('feedback_type'))
+                counts[key] = counts.get(key, 0) + 1
+        return [
+            {'category': category, 'feedback_type': feedback_type, 'count': count}
+            for (category, feedback_type), count in sorted(counts.items())
+        ]
+
+    def _categories_verified(self, params):
+        return [{'ok': all(f.get('categories') is not None for f in self.feedback)}]
+
+    def _categories_remaining(self, params):
+        return [{'remaining': sum(1 for f in self.feedback if f.get('categories') is None)}]
+
+    def _categories_backfill(self, params):
+        pending = [f for f in self.feedback if f.get('categories') is None][:params['chunk_size']]
+        for f in pending:
+            f['categories'] = []
+        return [{'processed': len(pending)}]
+
+    def _schema_version(self, params):
+        if self.schema_version is None:
+            return []
+        return [{'version': self.schema_version.get('version')}]
+
+    def _schema_node(self, params):
+        return [{'v': dict(self.schema_version)}] if self.schema_version is not None else []
+
+    def _backfill_progress(self, params):
+        if self.schema_version is None:
+            return []
+        return [{'name': self.schema_version.get('backfill_name'),
+                 'processed': self.schema_version.get('backfill_processed')}]
+
+    def _record_version(self, params):
+        node = self.schema_version = self.schema_version or {'name': 'feedback'}
+        node['version'] = params['version']
+        node['migration_name'] = params['name']
+        node['applied_versions'] = (node.get('applied_versions') or []) + [params['version']]
+        node['updated_at'] = Neo4jDateTime.from_native(datetime.now(timezone.utc))
+        node.pop('backfill_name', None)
+        node.pop('backfill_processed', None)
+        return []
+
+    def _clear_backfill(self, params):
+        if self.schema_version is not None and self.schema_version.get('backfill_name') == params['name']:
+            self.schema_version.pop('backfill_name', None)
+            self.schema_version.pop('backfill_processed', None)
+        return []
+
+    def _record_backfill(self, params):
+        node = self.schema_version = self.schema_version or {'name': 'feedback'}
+        node['backfill_name'] = params['name']
+        node['backfill_processed'] = params['processed']
+        return []
+
+
+class FakeTransaction:
+    def __init__(self, session: 'FakeSession', timeout: Optional[float]):
+        self._session = session
+        self._deadline = time.monotonic() + timeout if timeout else None
+        self._statements = 0
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs) -> FakeResult:
+        # The graph has no rollback, so faults and timeouts only hit the first statement,
+        # before anything is written; a retried transaction never repeats earlier writes
+        first = self._statements == 0
+        self._statements += 1
+        return self._session._run(query, {**(parameters or {}), **kwargs}, True, self._deadline, first)
+
+
+class FakeSession:
+    def __init__(self, driver: 'FakeDriver', database: str, access_mode: str,
+                 bookmarks: Optional[Bookmarks]):
+        self._driver = driver
+        self.database = database
+        self.access_mode = access_mode
+        self.bookmarks = bookmarks
+        self._last_bookmarks = bookmarks or Bookmarks()
+        self._closed = False
+
+    def __enter__(self) -> 'FakeSession':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._driver._release()
+
+    def _run(self, query: str, parameters: Dict[str, Any], in_transaction: bool,
+             deadline: Optional[float] = None, can_fail: bool = True) -> FakeResult:
+        driver = self._driver
+        latency = driver.latency.sample() if driver.latency else 0.0
+        if can_fail and deadline is not None and time.monotonic() + latency > deadline:
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            raise client_error('Transaction.TransactionTimedOut',
+                               "The transaction has been terminated because it timed out")
+        if latency:
+            time.sleep(latency)
+        if can_fail and driver.faults:
+            driver.faults.check(query)
+        graph = driver.graph(self.database)
+        mode, _, statement = query.lstrip().partition(' ')
+        mode = mode.upper()
+        if mode == 'EXPLAIN':
+            records = []
+        else:
+            records = graph.run(statement if mode == 'PROFILE' else query, parameters, in_transaction)
+        available_ms = int(latency * 1000)
+        summary = FakeSummary(query, parameters, available_ms, 0, self.database)
+        if mode == 'EXPLAIN':
+            summary.plan = graph.plan(statement, None)
+        elif mode == 'PROFILE':
+            summary.plan = summary.profile = graph.plan(statement, len(records))
+        driver.statements += 1
+        return FakeResult(records, summary)
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs) -> FakeResult:
+        """Auto-commit statement"""
+        result = self._run(query, {**(parameters or {}), **kwargs}, False)
+        if self.access_mode == WRITE_ACCESS:
+            self._last_bookmarks = self._driver._next_bookmark()
+        return result
+
+    def _execute(self, work: Callable, args, kwargs, write: bool) -> Any:
+        transaction = FakeTransaction(self, getattr(work, 'timeout', None))
+        result = work(transaction, *args, **kwargs)
+        if write:
+            self._last_bookmarks = self._driver._next_bookmark()
+        return result
+
+    def execute_read(self, work: Callable, *args, **kwargs) -> Any:
+        return self._execute(work, args, kwargs, write=False)
+
+    def execute_write(self, work: Callable, *args, **kwargs) -> Any:
+        return self._execute(work, args, kwargs, write=True)
+
+    def last_bookmarks(self) -> Bookmarks:
+        return self._last_bookmarks
+
+
+class FakeDriver:
+    def __init__(self, latency: Optional[LatencyModel] = None, faults: Optional[FaultInjector] = None,
+                 max_connection_pool_size: Optional[int] = None, connection_acquisition_timeout: float = 60.0):
+        """
+        Stand-in for neo4j.Driver
+
+        Args:
+            latency: Delay applied to every statement
+            faults: Errors injected into statements
+            max_connection_pool_size: Sessions open at once before session() blocks, like the pool
+            connection_acquisition_timeout: Seconds session() waits for a free connection
+        """
+        self.latency = latency
+        self.faults = faults
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self._pool = threading.BoundedSemaphore(max_connection_pool_size) if max_connection_pool_size else None
+        self._graphs: Dict[str, FakeGraph] = {}
+        self._lock = threading.Lock()
+        self._bookmark = 0
+        self.sessions_opened = 0
+        self.read_sessions = 0
+        self.statements = 0
+        self.last_session: Optional[Dict[str, Any]] = None
+        self.closed = False
+
+    @classmethod
+    def from_env(cls, getenv: Callable[[str, Optional[str]], Optional[str]]) -> 'FakeDriver':
+        """Driver configured by FAKE_NEO4J_LATENCY, FAKE_NEO4J_ERROR_RATE and FAKE_NEO4J_SEED"""
+        seed = getenv('FAKE_NEO4J_SEED', None)
+        seed = int(seed) if seed else None
+        latency = getenv('FAKE_NEO4J_LATENCY', None)
+        error_rate = float(getenv('FAKE_NEO4J_ERROR_RATE', 0) or 0)
+        return cls(
+            latency=LatencyModel.parse(latency, seed) if latency else None,
+            faults=FaultInjector({TransientError: error_rate}, seed) if error_rate else None
+        )
+
+    def graph(self, database: str = 'neo4j') -> FakeGraph:
+        """In-memory graph backing one database"""
+        with self._lock:
+            if database not in self._graphs:
+                self._graphs[database] = FakeGraph()
+            return self._graphs[database]
+
+    def session(self, database: Optional[str] = None, default_access_mode: str = WRITE_ACCESS,
+                bookmarks: Optional[Bookmarks] = None, **kwargs) -> FakeSession:
+        if self.closed:
+            raise ServiceUnavailable("Driver is closed")
+        if self._pool is not None and not self._pool.acquire(timeout=self.connection_acquisition_timeout):
+            raise client_error('Transaction.TransactionStartFailed', "Failed to obtain a connection from the pool")
+        with self._lock:
+            self.sessions_opened += 1
+            if default_access_mode == READ_ACCESS:
+                self.read_sessions += 1
+            self.last_session = {'database': database or 'neo4j', 'access_mode': default_access_mode,
+                                 'bookmarks': bookmarks}
+        return FakeSession(self, database or 'neo4j', default_access_mode, bookmarks)
+
+    def _release(self):
+        if self._pool is not None:
+            self._pool.release()
+
+    def _next_bookmark(self) -> Bookmarks:
+        with self._lock:
+            self._bookmark += 1
+            return Bookmarks.from_raw_values([f"FB:fake:{self._bookmark}"])
+
+    def verify_connectivity(self):
+        if self.closed:
+            raise ServiceUnavailable("Driver is closed")
+
+    def close(self):
+        self.closed = True
+
@@ -0,0 +1,168 @@
+"""
+Cached health state for the Feedback API
+A background prober refreshes the database health on an interval so that
+load balancer probes never have to touch Neo4j themselves.
+"""
+
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    def __init__(self, interval: float = 5.0, max_in_flight: int = 64,
+                 max_pool_utilization: float = 0.9, stale_after: Optional[float] = None):
+        """Create a monitor; call attach() and start() once the service exists"""
+        self.interval = interval
+        self.max_in_flight = max_in_flight
+        self.max_pool_utilization = max_pool_utilization
+        self.stale_after = stale_after if stale_after is not None else interval * 3
+
+        self.service = None
+        self.started_at = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._state: Dict[str, Any] = {
+            'status': 'unknown',
+            'database': 'unknown',
+            'timestamp': datetime.now().isoformat()
+        }
+        self._last_probe: Optional[float] = None
+        self.startup: Dict[str, Any] = {'status': 'starting'}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, service):
+        """Attach the database service whose health should be probed"""
+        self.service = service
+
+    def start(self, probe_immediately: bool = True):
+        """Start the background prober, optionally probing once synchronously first"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        if probe_immediately:
+            self.probe_now()
+        self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+        self._thread.start()
+        logger.info(f"Health prober started (interval={self.interval}s)")
+
+    def stop(self):
+        """Stop the background prober"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self):
+        """Prober loop"""
+        while not self._stop.wait(self.interval):
+            self.probe_now()
+
+    def probe_now(self) -> Dict[str, Any]:
+        """Probe the database once and refresh the cached state"""
+        if self.service is None:
+            state = {
+                'status': 'unhealthy',
+                'database': 'not_initialized',
+                'timestamp': datetime.now().isoformat()
+            }
+        else:
+            started = time.perf_counter()
+            try:
+                state = self.service.health_check()
+            except Exception as e:
+                logger.error(f"Health probe failed: {e}")
+                state = {
+                    'status': 'unhealthy',
+                    'database': 'error',
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                }
+            state['probe_latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        with self._lock:
+            self._state = state
+            self._last_probe = time.monotonic()
+        return state
+
+    def mark_ready(self, bootstrap_stats: Optional[Dict[str, Any]] = None) -> float:
+        """Record that startup finished and return the time-to-ready in seconds"""
+        time_to_ready = round(time.monotonic() - self.started_at, 3)
+        self.startup = {
+            'status': 'complete',
+            'time_to_ready_seconds': time_to_ready,
+            'bootstrap': bootstrap_stats or {}
+        }
+        logger.info(f"Service ready {time_to_ready}s after start")
+        return time_to_ready
+
+    def mark_startup_failed(self, error: str):
+        """Record a failed bootstrap attempt; readiness stays false"""
+        self.startup = {'status': 'retrying', 'last_error': error}
+
+    def request_started(self):
+        """Count a request entering the application"""
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self):
+        """Count a request leaving the application"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def cached_health(self) -> Dict[str, Any]:
+        """Last probed database health plus the age of that probe"""
+        with self._lock:
+            state = dict(self._state)
+            last_probe = self._last_probe
+        state['probe_age_seconds'] = round(time.monotonic() - last_probe, 3) if last_probe is not None else None
+        return state
+
+    def liveness(self) -> Dict[str, Any]:
+        """Process liveness; never touches the database"""
+        return {
+            'status': 'alive',
+            'uptime_seconds': round(time.monotonic() - self.started_at, 3),
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Readiness from the cached probe, pool saturation and request backlog"""
+        health = self.cached_health()
+        pool = self.service.pool_stats() if self.service is not None else None
+        in_flight = self.in_flight
+
+        reasons = []
+        age = health.get('probe_age_seconds')
+        if self.startup.get('status') != 'complete':
+            reasons.append('starting')
+        elif health.get('status') != 'healthy':
+            reasons.append('database_unhealthy')
+        elif age is None or age > self.stale_after:
+            reasons.append('health_probe_stale')
+        if pool and pool['utilization'] >= self.max_pool_utilization:
+            reasons.append('connection_pool_saturated')
+        if in_flight >= self.max_in_flight:
+            reasons.append('request_backlog')
+
+        ready = not reasons
+        return ready, {
+            'status': 'ready' if ready else 'not_ready',
+            'reasons': reasons,
+            'database': health,
+            'pool': pool,
+            'in_flight_requests': in_flight,
+            'max_in_flight_requests': self.max_in_flight,
+            'startup': self.startup,
+            'timestamp': datetime.now().isoformat()
+        }
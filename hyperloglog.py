@@ -0,0 +1,101 @@
+"""
+HyperLogLog sketches for approximate distinct counts
+
+A sketch is 2**PRECISION one-byte registers (4 KiB, about 1.6% standard
+error). Adding a value raises at most one register, so a sketch that has
+seen many values rarely changes; merging is a register-wise max, so day
+sketches combine into any date range without revisiting the Feedback they
+came from. Sketches are stored as plain bytes on the database side.
+"""
+
+import hashlib
+import math
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+_POWERS = [2.0 ** -rank for rank in range(HASH_BITS - PRECISION + 2)]
+
+
+def normalize_query(text: str) -> str:
+    """Form of a user query counted as one distinct question: case and spacing are ignored"""
+    return ' '.join(text.lower().split())
+
+
+def register_for(value: str) -> Tuple[int, int]:
+    """(register index, rank) that `value` updates"""
+    digest = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+    index = digest >> (HASH_BITS - PRECISION)
+    rest = digest & ((1 << (HASH_BITS - PRECISION)) - 1)
+    return index, HASH_BITS - PRECISION - rest.bit_length() + 1
+
+
+class HyperLogLog:
+    __slots__ = ('registers',)
+
+    def __init__(self, registers: Optional[bytes] = None):
+        """
+        Mergeable distinct-count sketch
+
+        Args:
+            registers: Stored sketch bytes; None starts an empty sketch
+        """
+        if registers is not None and len(registers) != REGISTERS:
+            raise ValueError(f"Expected a {REGISTERS}-register sketch, got {len(registers)} bytes")
+        self.registers = bytearray(registers) if registers is not None else bytearray(REGISTERS)
+
+    def add(self, value: str) -> bool:
+        """Count `value`; True when a register changed and the sketch needs saving"""
+        index, rank = register_for(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, values: Iterable[str]) -> bool:
+        changed = False
+        for value in values:
+            changed = self.add(value) or changed
+        return changed
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Fold `other` into this sketch (register-wise max)"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self) -> int:
+        total = 0.0
+        zeros = 0
+        for rank in self.registers:
+            total += _POWERS[rank]
+            if rank == 0:
+                zeros += 1
+        estimate = _ALPHA * REGISTERS * REGISTERS / total
+        # Linear counting is more accurate while many registers are still empty
+        if estimate <= 2.5 * REGISTERS and zeros:
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+def add_feedback(users: HyperLogLog, queries: HyperLogLog, user_id: Optional[str], user_query: str) -> bool:
+    """Count one feedback's user (when it has one) and question; True when either sketch changed"""
+    changed = users.add(user_id) if user_id else False
+    return queries.add(normalize_query(user_query)) or changed
+
+
+def summarize_days(days: Iterable[Tuple[Any, Optional[bytes], Optional[bytes]]]) -> Dict[str, Any]:
+    """Estimates per (date, users sketch, queries sketch) and for the whole range, merged in memory"""
+    users, queries = HyperLogLog(), HyperLogLog()
+    rows = []
+    for day, day_users, day_queries in days:
+        day_users, day_queries = HyperLogLog(day_users), HyperLogLog(day_queries)
+        rows.append({'date': day, 'unique_users': day_users.estimate(),
+                     'unique_queries': day_queries.estimate()})
+        users.merge(day_users)
+        queries.merge(day_queries)
+    return {'unique_users': users.estimate(), 'unique_queries': queries.estimate(), 'days': rows}
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator and latency report for the Feedback API
+
+Requests are issued at a fixed arrival rate (constant or Poisson), whether or
+not earlier ones have finished, so a slow server shows up as growing latency
+rather than as a quietly reduced request rate. Latency is measured from each
+request's scheduled start, which includes any time it waited for a free client
+worker. Each worker thread keeps its own keep-alive connection.
+
+Usage:
+    python load_test.py --rate 50 --duration 30
+    python load_test.py --rate 200 --duration 60 --mix write=1 --json-out report.json
+    python load_test.py --rate 20 --requests 500 --traffic captures/requests.jsonl
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Endpoint name -> (method, path relative to the API base URL)
+ENDPOINTS = {
+    'write': ('POST', '/feedback'),
+    'analytics': ('GET', '/feedback/analytics'),
+    'trends': ('GET', '/feedback/trends?days=30'),
+    'intents': ('GET', '/feedback/intents'),
+    'engagement': ('GET', '/feedback/engagement?limit=20'),
+    'categories': ('GET', '/feedback/categories'),
+}
+
+DEFAULT_MIX = 'write=0.5,analytics=0.2,trends=0.1,intents=0.05,engagement=0.1,categories=0.05'
+
+
+def generate_sample_feedback(rng: Optional[random.Random] = None, users: int = 50) -> Dict[str, Any]:
+    """Random feedback payload matching the API's FeedbackSchema, drawn from `rng` (the module RNG
+    by default); user ids repeat across `users` devices so engagement counters build up"""
+    rng = rng or random  # the module-level functions share the Random interface
+    sample_categories = [
+        ["helpful", "accurate"],
+        ["informative", "clear"],
+        ["confusing", "incomplete"],
+        ["detailed", "relevant"],
+        ["unclear", "outdated"]
+    ]
+
+    sample_messages = [
+        "How to reduce carbon emissions in urban areas?",
+        "What are the waste management policies for small businesses?",
+        "Can you explain renewable energy incentives?",
+        "What environmental regulations apply to manufacturing?",
+        "How can I report air quality issues in my area?"
+    ]
+
+    sample_responses = [
+        "Urban emissions can be cut through public transport, efficient buildings and green spaces...",
+        "Small businesses must separate recyclables and use licensed waste carriers...",
+        "Incentives include feed-in tariffs, tax credits and grants for solar installations...",
+        "Manufacturers need emission permits and must report pollutant releases annually...",
+        "You can report air quality issues to your local environmental protection agency..."
+    ]
+
+    sample_intents = [
+        "ask_emissions_reduction",
+        "ask_waste_policy",
+        "ask_energy_incentives",
+        "ask_industry_regulations",
+        "report_air_quality"
+    ]
+
+    feedback_type = rng.choice(["positive", "negative"])
+    question = rng.randrange(len(sample_messages))
+
+    return {
+        "user_query": sample_messages[question],
+        "bot_response": sample_responses[question],
+        "feedback_type": feedback_type,
+        "user_comment": "This response was helpful for understanding the policy." if rng.choice([True, False]) else "",
+        "rating_stars": rng.randint(4, 5) if feedback_type == "positive" else rng.randint(1, 3),
+        "message_id": f"msg_{rng.getrandbits(48):012x}",
+        "user_id": f"device_{rng.randrange(users):04d}",
+        "intent": sample_intents[question],
+        "confidence": round(rng.uniform(0.4, 1.0), 3),
+        "categories": rng.choice(sample_categories),
+        "timestamp": (datetime.utcnow() - timedelta(days=rng.randint(0, 30))).isoformat() + "Z"
+    }
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Endpoint weights from "write=0.5,analytics=0.5"; weights are normalised"""
+    mix = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("The mix needs at least one positive weight")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+def load_traffic(path: str) -> List[Dict[str, Any]]:
+    """Recorded requests from a JSONL file with `method`, `path` and optional `body`,
+    `route` and `headers` per line, as written by traffic_capture.py"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    if not entries:
+        raise ValueError(f"No requests recorded in {path}")
+    return entries
+
+
+def replay_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+    """Captured headers worth re-sending; bodies are re-sent as JSON, so Content-Type is dropped"""
+    return {name: value for name, value in (entry.get('headers') or {}).items()
+            if name.lower() not in ('content-type', 'content-length')}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        'p50': round(percentile(values, 50) * 1000, 2),
+        'p95': round(percentile(values, 95) * 1000, 2),
+        'p99': round(percentile(values, 99) * 1000, 2),
+        'max': round(values[-1] * 1000, 2) if values else 0.0,
+        'mean': round(sum(values) / len(values) * 1000, 2) if values else 0.0
+    }
+
+
+class LatencyRecorder:
+    def __init__(self):
+        """Thread-safe latency and status collection per endpoint"""
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = {}
+        self._statuses: Dict[str, Dict[str, int]] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(self, name: str, latency: float, status: Optional[int]):
+        """Record one request; `status` is None when no response arrived
+
+        429s are counted apart from errors, so a run against a rate-limited
+        server reports how much was limited rather than a high error rate.
+        """
+        with self._lock:
+            self._latencies.setdefault(name, []).append(latency)
+            statuses = self._statuses.setdefault(name, {})
+            key = str(status) if status is not None else 'error'
+            statuses[key] = statuses.get(key, 0) + 1
+            if status is None or (status >= 400 and status != 429):
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def _section(self, latencies: List[float], statuses: Dict[str, int], errors: int,
+                 elapsed: float) -> Dict[str, Any]:
+        count = len(latencies)
+        rate_limited = statuses.get('429', 0)
+        return {
+            'requests': count,
+            'throughput_rps': round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            'error_rate': round(errors / count, 4) if count else 0.0,
+            'rate_limited': rate_limited,
+            'rate_limited_rate': round(rate_limited / count, 4) if count else 0.0,
+            'status_codes': dict(sorted(statuses.items())),
+            'latency_ms': latency_summary(latencies)
+        }
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                name: self._section(self._latencies[name], self._statuses[name],
+                                    self._errors.get(name, 0), elapsed)
+                for name in sorted(self._latencies)
+            }
+            all_latencies = [value for values in self._latencies.values() for value in values]
+            all_statuses: Dict[str, int] = {}
+            for statuses in self._statuses.values():
+                for key, count in statuses.items():
+                    all_statuses[key] = all_statuses.get(key, 0) + count
+            total_errors = sum(self._errors.values())
+        overall = self._section(all_latencies, all_statuses, total_errors, elapsed)
+        overall['endpoints'] = endpoints
+        return overall
+
+
+class LoadGenerator:
+    def __init__(self, base_url: str, rate: float, mix: Optional[Dict[str, float]] = None,
+                 workers: int = 64, timeout: float = 10.0, arrival: str = 'poisson',
+                 headers: Optional[Dict[str, str]] = None,
+                 traffic: Optional[List[Dict[str, Any]]] = None, seed: Optional[int] = None):
+        """
+        Open-loop HTTP load against the Feedback API
+
+        Args:
+            base_url: API base URL, e.g. http://localhost:8000/api
+            rate: Requests started per second
+            mix: Endpoint name -> share of requests (ignored when `traffic` is given)
+            workers: Client threads, each with its own keep-alive connection
+            timeout: Per-request timeout in seconds
+            arrival: 'poisson' (exponential gaps) or 'constant' spacing
+            headers: Extra headers on every request, e.g. X-API-Key or X-Tenant
+            traffic: Recorded requests to cycle through instead of generated ones
+            seed: Seed for the arrival process, endpoint choice and payloads
+        """
+        self.base_url = base_url.rstrip('/')
+        self.rate = rate
+        self.mix = mix or parse_mix(DEFAULT_MIX)
+        self.workers = workers
+        self.timeout = timeout
+        self.arrival = arrival
+        self.headers = headers or {}
+        self.traffic = traffic
+        self._random = random.Random(seed)
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        self.recorder = LatencyRecorder()
+
+    def _session(self) -> requests.Session:
+        """This worker's session, holding one keep-alive connection"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def next_request(self, index: int) -> Tuple[str, str, str, Optional[Dict[str, Any]], Dict[str, str]]:
+        """(endpoint name, method, path, JSON body, headers) for the index-th request"""
+        if self.traffic:
+            entry = self.traffic[index % len(self.traffic)]
+            return (entry.get('route') or entry['path'], entry['method'], entry['path'], entry.get('body'),
+                    replay_headers(entry))
+        name = self._random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        method, path = ENDPOINTS[name]
+        return name, method, path, generate_sample_feedback(self._random) if method == 'POST' else None, {}
+
+    def _fire(self, name: str, method: str, path: str, body: Optional[Dict[str, Any]],
+              headers: Dict[str, str], scheduled: float):
+        status = None
+        try:
+            response = self._session().request(method, self.base_url + path, json=body, headers=headers,
+                                               timeout=self.timeout)
+            response.content  # read the whole body so the connection is reusable
+            status = response.status_code
+        except requests.RequestException:
+            pass
+        self.recorder.record(name, time.perf_counter() - scheduled, status)
+
+    def _gap(self) -> float:
+        if self.arrival == 'constant':
+            return 1.0 / self.rate
+        return self._random.expovariate(self.rate)
+
+    def _arrivals(self, duration: Optional[float], total: Optional[int]) -> Iterator[tuple]:
+        offset = 0.0
+        index = 0
+        while (total is None or index < total) and (duration is None or offset < duration):
+            yield (offset,) + self.next_request(index)
+            index += 1
+            offset += self._gap()
+
+    def run_schedule(self, schedule: Iterable[tuple]) -> Dict[str, Any]:
+        """Issue (offset seconds, name, method, path, body, headers) requests at their offsets"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='load') as pool:
+            for offset, name, method, path, body, headers in schedule:
+                scheduled = started + offset
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._fire, name, method, path, body, headers, scheduled)
+        elapsed = time.perf_counter() - started
+        for session in self._sessions:
+            session.close()
+        report = self.recorder.report(elapsed)
+        report['duration_s'] = round(elapsed, 3)
+        return report
+
+    def run(self, duration: Optional[float] = None, total: Optional[int] = None) -> Dict[str, Any]:
+        """Issue requests until `duration` seconds or `total` requests, then report"""
+        if duration is None and total is None:
+            raise ValueError("Give a duration, a request count or both")
+        report = self.run_schedule(self._arrivals(duration, total))
+        report['config'] = {
+            'base_url': self.base_url,
+            'target_rate_rps': self.rate,
+            'arrival': self.arrival,
+            'workers': self.workers,
+            'mix': None if self.traffic else {name: round(share, 4) for name, share in self.mix.items()},
+            'recorded_requests': len(self.traffic) if self.traffic else None
+        }
+        return report
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """Plain-text latency table, one row per endpoint plus a total"""
+    header = (f"{'endpoint':<14}{'requests':>9}{'rps':>9}{'errors':>8}{'429s':>8}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    lines = [header, '-' * len(header)]
+    rows = list(report['endpoints'].items()) + [('TOTAL', report)]
+    for name, section in rows:
+        latency = section['latency_ms']
+        lines.append(
+            f"{name:<14}{section['requests']:>9}{section['throughput_rps']:>9.1f}"
+            f"{section['error_rate'] * 100:>7.1f}%{section['rate_limited_rate'] * 100:>7.1f}%"
+            f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}"
+            f"{latency['p99']:>10.1f}{latency['max']:>10.1f}"
+        )
+    lines.append(f"status codes: {report['status_codes']}  duration: {report['duration_s']}s")
+    return '\n'.join(lines)
+
+
+def run_load_test(base_url: str, rate: float, duration: Optional[float] = None, total: Optional[int] = None,
+                  **kwargs) -> Dict[str, Any]:
+    """Convenience wrapper: build a LoadGenerator and run it"""
+    return LoadGenerator(base_url, rate, **kwargs).run(duration=duration, total=total)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load test for the Feedback API")
+    parser.add_argument("--base-url", default="http://localhost:8000/api", help="Base URL for the API")
+    parser.add_argument("--rate", type=float, default=20, help="Requests started per second")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to generate load (default 30)")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. write=0.7,trends=0.3")
+    parser.add_argument("--traffic", default=None, help="JSONL of recorded requests to replay instead of --mix")
+    parser.add_argument("--workers", type=int, default=64, help="Client threads / keep-alive connections")
+    parser.add_argument("--arrival", choices=['poisson', 'constant'], default='poisson', help="Arrival process")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--header", action='append', default=[], help="Extra header 'Name: value' (repeatable)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+    parser.add_argument("--json-out", default=None, help="Write the JSON report to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    headers = {}
+    for header in args.header:
+        name, _, value = header.partition(':')
+        headers[name.strip()] = value.strip()
+    duration = args.duration if args.duration is not None or args.requests is not None else 30.0
+
+    generator = LoadGenerator(
+        args.base_url, args.rate, mix=parse_mix(args.mix), workers=args.workers, timeout=args.timeout,
+        arrival=args.arrival, headers=headers,
+        traffic=load_traffic(args.traffic) if args.traffic else None, seed=args.seed
+    )
+    target = f"{args.requests} requests" if duration is None else f"{duration}s"
+    print(f"🚀 {args.rate} req/s ({args.arrival}) against {args.base_url} for {target}", file=sys.stderr)
+    report = generator.run(duration=duration, total=args.requests)
+
+    print(format_table(report))
+    if args.json_out == '-':
+        print(json.dumps(report, indent=2))
+    elif args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"📄 JSON report written to {args.json_out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
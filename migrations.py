@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the Feedback graph
+
+The applied version is tracked on a single (:SchemaVersion {name: 'feedback'})
+node. Each migration runs its schema statements, then its batched data
+backfills, then its verify query, and only then bumps the stored version.
+Backfills select pending rows with an idempotent predicate and update them
+with CALL { ... } IN TRANSACTIONS, so a crashed run simply resumes where it
+stopped the next time migrations are applied. The day-sketch backfill computes
+its registers in Python but is chunked, marked and resumed the same way.
+
+Usage:
+    python migrations.py --status
+    python migrations.py --migrate [--batch-size 5000]
+"""
+
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
+
+from hyperloglog import HyperLogLog, add_feedback
+
+logger = logging.getLogger(__name__)
+
+
+class Backfill:
+    def __init__(self, name: str, match: str, update: str, variable: str = 'f'):
+        """
+        Batched data backfill
+
+        Args:
+            name: Identifier used for progress tracking
+            match: Cypher selecting rows that still need the backfill; it must
+                stop matching a row once `update` has run on it
+            update: Cypher run for each row inside CALL { ... } IN TRANSACTIONS
+            variable: Variable bound by `match` and passed into `update`
+        """
+        self.name = name
+        self.match = match
+        self.update = update
+        self.variable = variable
+
+    def count_query(self) -> str:
+        return f"{self.match}\nRETURN count({self.variable}) AS remaining"
+
+    def chunk_query(self, batch_size: int) -> str:
+        # CALL { ... } IN TRANSACTIONS only accepts a literal batch size
+        return (
+            f"{self.match}\n"
+            f"WITH {self.variable} LIMIT $chunk_size\n"
+            f"CALL {{ WITH {self.variable} {self.update} }} IN TRANSACTIONS OF {int(batch_size)} ROWS\n"
+            f"RETURN count(*) AS processed"
+        )
+
+    def run_chunk(self, session, chunk_size: int, batch_size: int) -> int:
+        """Process up to `chunk_size` pending rows; returns how many were processed"""
+        return session.run(self.chunk_query(batch_size), chunk_size=chunk_size).single()['processed']
+
+
+class Migration:
+    def __init__(self, version: int, name: str, statements: Optional[List[str]] = None,
+                 backfills: Optional[List[Backfill]] = None, verify: Optional[str] = None):
+        """
+        One schema version step
+
+        Args:
+            version: Monotonically increasing schema version
+            name: Short description stored alongside the version
+            statements: Idempotent schema statements (CREATE ... IF NOT EXISTS)
+            backfills: Batched data backfills run after the statements
+            verify: Query returning a single `ok` boolean once the migration holds
+        """
+        self.version = version
+        self.name = name
+        self.statements = statements or []
+        self.backfills = backfills or []
+        self.verify = verify
+
+
+# Links a bound Feedback `f` that has a user_id to its (:User), keeping the
+# per-user counters that /engagement reads through user_total_feedback_idx
+USER_LINK = """
+WITH f
+MERGE (u:User {user_id: f.user_id})
+  ON CREATE SET u.total_feedback = 0, u.positive_feedback = 0,
+                u.first_feedback = f.timestamp, u.last_feedback = f.timestamp
+CREATE (u)-[:GAVE]->(f)
+SET u.total_feedback = u.total_feedback + 1,
+    u.positive_feedback = u.positive_feedback + CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END,
+    u.first_feedback = CASE WHEN f.timestamp < u.first_feedback THEN f.timestamp ELSE u.first_feedback END,
+    u.last_feedback = CASE WHEN f.timestamp > u.last_feedback THEN f.timestamp ELSE u.last_feedback END
+"""
+
+USER_BACKFILL = Backfill(
+    'user_engagement',
+    "MATCH (f:Feedback) WHERE f.user_id IS NOT NULL AND NOT (f)<-[:GAVE]-(:User)",
+    USER_LINK
+)
+
+# Links a bound Feedback `f` that has a detected intent to its (:Intent), keeping the
+# running totals and confidence sum that /intents reads instead of scanning Feedback
+INTENT_LINK = """
+WITH f
+MERGE (i:Intent {name: f.detected_intent})
+  ON CREATE SET i.total = 0, i.positive = 0, i.negative = 0, i.confidence_sum = 0.0, i.confidence_count = 0
+CREATE (f)-[:HAS_INTENT]->(i)
+SET i.total = i.total + 1,
+    i.positive = i.positive + CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END,
+    i.negative = i.negative + CASE WHEN f.feedback_type = 'negative' THEN 1 ELSE 0 END,
+    i.confidence_sum = i.confidence_sum + coalesce(f.confidence_score, 0.0),
+    i.confidence_count = i.confidence_count + CASE WHEN f.confidence_score IS NULL THEN 0 ELSE 1 END
+"""
+
+INTENT_BACKFILL = Backfill(
+    'intent_stats',
+    "MATCH (f:Feedback) WHERE f.detected_intent IS NOT NULL AND f.detected_intent <> '' "
+    "AND NOT (f)-[:HAS_INTENT]->(:Intent)",
+    INTENT_LINK
+)
+
+# Months archived before the Intent counters existed are added from their MonthlyArchive
+# aggregates; later archives cover Feedback that was already counted when it was written
+INTENT_ARCHIVE_BACKFILL = Backfill(
+    'intent_stats_archives',
+    "MATCH (a:MonthlyArchive) WHERE a.intents_counted IS NULL",
+    """
+    SET a.intents_counted = true
+    WITH a, coalesce(a.intents, []) AS intents
+    UNWIND range(0, size(intents) - 1) AS index
+    MERGE (i:Intent {name: intents[index]})
+      ON CREATE SET i.total = 0, i.positive = 0, i.negative = 0, i.confidence_sum = 0.0, i.confidence_count = 0
+    SET i.total = i.total + a.intents_positive[index] + a.intents_negative[index],
+        i.positive = i.positive + a.intents_positive[index],
+        i.negative = i.negative + a.intents_negative[index],
+        i.confidence_sum = i.confidence_sum + a.intents_confidence_sum[index],
+        i.confidence_count = i.confidence_count + a.intents_confidence_count[index]
+    """,
+    variable='a'
+)
+
+
+def utc_day(timestamp: str) -> str:
+    """ISO date of a timestamp in UTC, the day Feedback is counted on; naive values are UTC"""
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        return parsed.date().isoformat()
+    return parsed.astimezone(timezone.utc).date().isoformat()
+
+
+# Links a bound Feedback `f` into (:Year)-[:HAS_MONTH]->(:Month)-[:HAS_DAY]->(:Day) and
+# counts it on the Day. Days are UTC dates, so they line up with the UTC archive months and
+# the live-Feedback filters whatever offset the client sent.
+TIME_TREE_LINK = """
+WITH f, date(datetime({datetime: f.timestamp, timezone: 'UTC'})) AS day
+MERGE (d:Day {date: day})
+  ON CREATE SET d.month = substring(toString(day), 0, 7), d.total = 0, d.positive = 0, d.negative = 0
+MERGE (m:Month {month: d.month})
+  ON CREATE SET m.year = day.year
+MERGE (y:Year {year: day.year})
+MERGE (y)-[:HAS_MONTH]->(m)
+MERGE (m)-[:HAS_DAY]->(d)
+CREATE (f)-[:ON_DAY]->(d)
+SET d.total = d.total + 1,
+    d.positive = d.positive + CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END,
+    d.negative = d.negative + CASE WHEN f.feedback_type = 'negative' THEN 1 ELSE 0 END
+"""
+
+# Attaches existing Feedback to the time tree; run when the layout is switched on
+TIME_TREE_BACKFILL = Backfill(
+    'time_tree',
+    "MATCH (f:Feedback) WHERE f.timestamp IS NOT NULL AND NOT (f)-[:ON_DAY]->(:Day)",
+    TIME_TREE_LINK
+)
+
+# Moves Feedback linked while Days followed the timestamp's own offset to its UTC Day;
+# the old Day keeps a zero count until retention prunes it
+TIME_TREE_UTC_BACKFILL = Backfill(
+    'time_tree_utc_days',
+    "MATCH (f:Feedback)-[:ON_DAY]->(d:Day) "
+    "WHERE d.date <> date(datetime({datetime: f.timestamp, timezone: 'UTC'}))",
+    """
+    MATCH (f)-[r:ON_DAY]->(old:Day)
+    SET old.total = old.total - 1,
+        old.positive = old.positive - CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END,
+        old.negative = old.negative - CASE WHEN f.feedback_type = 'negative' THEN 1 ELSE 0 END
+    DELETE r
+    """ + TIME_TREE_LINK
+)
+
+# Per-day HyperLogLog sketches of users and questions (hyperloglog.py). The MERGE
+# takes the node's write lock, so the registers it returns cannot change before the SET.
+DAY_SKETCH_READ = "MATCH (s:DaySketch {date: date($day)}) RETURN s.users AS users, s.queries AS queries"
+DAY_SKETCH_LOCK = """
+MERGE (s:DaySketch {date: date($day)})
+SET s.updated_at = datetime()
+RETURN s.users AS users, s.queries AS queries
+"""
+DAY_SKETCH_SAVE = "MATCH (s:DaySketch {date: date($day)}) SET s.users = $users, s.queries = $queries"
+
+
+def merge_day_sketch(tx, day: str, users: HyperLogLog, queries: HyperLogLog):
+    """Fold sketches into the stored ones for `day` under the DaySketch node's write lock"""
+    record = tx.run(DAY_SKETCH_LOCK, day=day).single()
+    users.merge(HyperLogLog(record['users']))
+    queries.merge(HyperLogLog(record['queries']))
+    tx.run(DAY_SKETCH_SAVE, day=day, users=users.to_bytes(), queries=queries.to_bytes()).consume()
+
+
+class DaySketchBackfill(Backfill):
+    """Adds Feedback stored before sketches were kept to its UTC day's sketches
+
+    Registers are computed in Python, so each chunk is read, folded into one
+    sketch pair per day, merged under the DaySketch lock and then marked with
+    `f.sketched`. Adding a feedback twice leaves a sketch unchanged, so a
+    chunk repeated after a crash does not over-count.
+    """
+
+    def __init__(self):
+        super().__init__('day_sketches',
+                         "MATCH (f:Feedback) WHERE f.timestamp IS NOT NULL AND f.sketched IS NULL",
+                         "SET f.sketched = true")
+
+    def run_chunk(self, session, chunk_size: int, batch_size: int) -> int:
+        rows = list(session.run(
+            f"{self.match}\n"
+            "WITH f LIMIT $chunk_size\n"
+            "RETURN elementId(f) AS id, toString(date(datetime({datetime: f.timestamp, timezone: 'UTC'}))) AS day, "
+            "f.user_id AS user_id, f.user_query AS user_query",
+            chunk_size=chunk_size
+        ))
+        days: Dict[str, tuple] = {}
+        for record in rows:
+            users, queries = days.setdefault(record['day'], (HyperLogLog(), HyperLogLog()))
+            add_feedback(users, queries, record['user_id'], record['user_query'] or '')
+        for day, (users, queries) in sorted(days.items()):
+            session.execute_write(merge_day_sketch, day, users, queries)
+        ids = [record['id'] for record in rows]
+        for start in range(0, len(ids), batch_size):
+            session.run("MATCH (f:Feedback) WHERE elementId(f) IN $ids " + self.update,
+                        ids=ids[start:start + batch_size]).consume()
+        return len(rows)
+
+
+DAY_SKETCH_BACKFILL = DaySketchBackfill()
+
+# Clears the marks so DAY_SKETCH_BACKFILL sketches every Feedback again (migrations.py --day-sketches)
+DAY_SKETCH_RESET = Backfill(
+    'day_sketches_reset',
+    "MATCH (f:Feedback) WHERE f.sketched IS NOT NULL",
+    "REMOVE f.sketched"
+)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1, 'feedback_indexes',
+        statements=[
+            "CREATE INDEX feedback_timestamp_idx IF NOT EXISTS FOR (f:Feedback) ON (f.timestamp)",
+            "CREATE INDEX feedback_type_idx IF NOT EXISTS FOR (f:Feedback) ON (f.feedback_type)",
+            "CREATE INDEX feedback_rating_idx IF NOT EXISTS FOR (f:Feedback) ON (f.rating_stars)"
+        ]
+    ),
+    Migration(
+        2, 'feedback_categories',
+        backfills=[
+            Backfill(
+                'feedback_categories_default',
+                "MATCH (f:Feedback) WHERE f.categories IS NULL",
+                "SET f.categories = []"
+            )
+        ],
+        verify="MATCH (f:Feedback) WHERE f.categories IS NULL RETURN count(f) = 0 AS ok"
+    ),
+    Migration(
+        3, 'monthly_archives',
+        statements=[
+            "CREATE CONSTRAINT monthly_archive_month IF NOT EXISTS "
+            "FOR (a:MonthlyArchive) REQUIRE a.month IS UNIQUE"
+        ]
+    ),
+    Migration(
+        4, 'time_tree',
+        statements=[
+            "CREATE CONSTRAINT time_tree_year IF NOT EXISTS FOR (y:Year) REQUIRE y.year IS UNIQUE",
+            "CREATE CONSTRAINT time_tree_month IF NOT EXISTS FOR (m:Month) REQUIRE m.month IS UNIQUE",
+            "CREATE CONSTRAINT time_tree_day IF NOT EXISTS FOR (d:Day) REQUIRE d.date IS UNIQUE"
+        ]
+    ),
+    Migration(
+        5, 'user_engagement',
+        statements=[
+            "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.user_id IS UNIQUE",
+            "CREATE INDEX user_total_feedback_idx IF NOT EXISTS FOR (u:User) ON (u.total_feedback)"
+        ],
+        backfills=[USER_BACKFILL]
+    ),
+    Migration(
+        6, 'day_sketches',
+        statements=[
+            "CREATE CONSTRAINT day_sketch_date IF NOT EXISTS FOR (s:DaySketch) REQUIRE s.date IS UNIQUE"
+        ]
+    ),
+    Migration(
+        7, 'intent_stats',
+        statements=[
+            "CREATE INDEX feedback_intent_idx IF NOT EXISTS FOR (f:Feedback) ON (f.detected_intent)",
+            "CREATE CONSTRAINT intent_name_unique IF NOT EXISTS FOR (i:Intent) REQUIRE i.name IS UNIQUE"
+        ],
+        backfills=[INTENT_BACKFILL, INTENT_ARCHIVE_BACKFILL]
+    ),
+    Migration(
+        8, 'feedback_fulltext',
+        statements=[
+            "CREATE FULLTEXT INDEX feedback_text_idx IF NOT EXISTS "
+            "FOR (f:Feedback) ON EACH [f.user_comment, f.user_query, f.bot_response]"
+        ]
+    ),
+    Migration(
+        9, 'time_tree_utc_days',
+        backfills=[TIME_TREE_UTC_BACKFILL]
+    ),
+    Migration(
+        10, 'day_sketch_backfill',
+        backfills=[DAY_SKETCH_BACKFILL]
+    ),
+]
+
+LATEST_VERSION = max(migration.version for migration in MIGRATIONS)
+
+class MigrationRunner:
+    def __init__(self, service, batch_size: int = 1000, chunk_size: Optional[int] = None):
+        """
+        Apply pending migrations through a Neo4jService
+
+        Args:
+            service: Neo4jService whose sessions are used
+            batch_size: Rows per inner transaction in backfills
+            chunk_size: Rows per outer statement; progress is recorded after each chunk
+        """
+        self.service = service
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size or batch_size * 10
+
+    def current_version(self) -> int:
+        """Schema version stored on the SchemaVersion node (0 if none)"""
+        with self.service._session() as session:
+            record = session.run(
+                "MATCH (v:SchemaVersion {name: 'feedback'}) RETURN v.version as version"
+            ).single()
+        return record['version'] if record and record['version'] is not None else 0
+
+    def status(self) -> Dict[str, Any]:
+        """Stored version, latest known version and any interrupted backfill"""
+        with self.service._session() as session:
+            record = session.run(
+                "MATCH (v:SchemaVersion {name: 'feedback'}) RETURN v {.*} as v"
+            ).single()
+        node = dict(record['v']) if record else {}
+        current = node.get('version') or 0
+        return {
+            'current_version': current,
+            'latest_version': LATEST_VERSION,
+            'pending': [m.version for m in MIGRATIONS if m.version > current],
+            'backfill_in_progress': node.get('backfill_name'),
+            'backfill_processed': node.get('backfill_processed'),
+            'updated_at': node.get('updated_at').isoformat() if node.get('updated_at') else None
+        }
+
+    def migrate(self, target: Optional[int] = None) -> List[int]:
+        """Apply every migration above the stored version; returns the versions applied"""
+        target = LATEST_VERSION if target is None else target
+        current = self.current_version()
+        if current >= target:
+            logger.info(f"Neo4j schema version {current} is current, nothing to migrate")
+            return []
+
+        applied = []
+        for migration in MIGRATIONS:
+            if current < migration.version <= target:
+                self._apply(migration)
+                applied.append(migration.version)
+        return applied
+
+    def _apply(self, migration: Migration):
+        """Run one migration's statements, backfills and verification, then record it"""
+        started = time.perf_counter()
+        logger.info(f"🔧 Applying migration {migration.version}: {migration.name}")
+
+        # A failed statement propagates before the version is recorded, so the next
+        # run retries it; IF NOT EXISTS makes the statements that did succeed no-ops
+        with self.service._session() as session:
+            for statement in migration.statements:
+                try:
+                    session.run(statement).consume()
+                except Exception as e:
+                    logger.error(f"❌ Migration {migration.version} ({migration.name}) statement failed: {e}")
+                    raise
+
+        for backfill in migration.backfills:
+            self.run_backfill(backfill)
+
+        if migration.verify:
+            with self.service._session() as session:
+                record = session.run(migration.verify).single()
+            if not record or not record['ok']:
+                raise RuntimeError(f"Migration {migration.version} ({migration.name}) failed verification")
+
+        with self.service._session() as session:
+            session.run(
+                """
+                MERGE (v:SchemaVersion {name: 'feedback'})
+                SET v.version = $version,
+                    v.migration_name = $name,
+                    v.applied_versions = coalesce(v.applied_versions, []) + $version,
+                    v.updated_at = datetime()
+                REMOVE v.backfill_name, v.backfill_processed
+                """,
+                version=migration.version, name=migration.name
+            ).consume()
+
+        logger.info(f"✅ Migration {migration.version} applied in {time.perf_counter() - started:.2f}s")
+
+    def run_backfill(self, backfill: Backfill) -> int:
+        """Process a backfill chunk by chunk, recording progress after each chunk; returns rows processed"""
+        with self.service._session() as session:
+            remaining = session.run(backfill.count_query()).single()['remaining']
+            record = session.run(
+                "MATCH (v:SchemaVersion {name: 'feedback'}) "
+                "RETURN v.backfill_name as name, v.backfill_processed as processed"
+            ).single()
+
+        processed = 0
+        if record and record['name'] == backfill.name and record['processed']:
+            processed = record['processed']
+            logger.info(f"   Resuming backfill {backfill.name} after {processed} rows")
+        total = processed + remaining
+        logger.info(f"   Backfill {backfill.name}: {remaining} rows pending")
+
+        resumed = processed
+        while remaining > 0:
+            with self.service._session() as session:
+                count = backfill.run_chunk(session, self.chunk_size, self.batch_size)
+                if count == 0:
+                    break
+                processed += count
+                remaining = max(0, remaining - count)
+                session.run(
+                    "MERGE (v:SchemaVersion {name: 'feedback'}) "
+                    "SET v.backfill_name = $name, v.backfill_processed = $processed",
+                    name=backfill.name, processed=processed
+                ).consume()
+            percent = round(processed * 100.0 / total, 1) if total else 100.0
+            logger.info(f"   Backfill {backfill.name}: {processed}/{total} rows ({percent}%)")
+
+        with self.service._session() as session:
+            session.run(
+                "MATCH (v:SchemaVersion {name: 'feedback'}) WHERE v.backfill_name = $name "
+                "REMOVE v.backfill_name, v.backfill_processed",
+                name=backfill.name
+            ).consume()
+        return processed - resumed
+
+
+if __name__ == "__main__":
+    import os
+    import json
+    import argparse
+    from dotenv import load_dotenv
+    from neo4j_service import Neo4jService
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Apply Neo4j feedback schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show the stored and latest schema versions")
+    parser.add_argument("--migrate", action="store_true", help="Apply pending migrations")
+    parser.add_argument("--target", type=int, default=None, help="Stop at this schema version")
+    parser.add_argument("--time-tree", action="store_true",
+                        help="Link existing Feedback to the Year/Month/Day time tree")
+    parser.add_argument("--day-sketches", action="store_true",
+                        help="Re-add all existing Feedback to the per-day distinct-count sketches")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv('MIGRATION_BATCH_SIZE', 1000)),
+                        help="Rows per transaction in data backfills")
+    args = parser.parse_args()
+
+    service = Neo4jService(
+        os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
+        os.getenv('NEO4J_USERNAME', 'neo4j'),
+        os.getenv('NEO4J_PASSWORD', 'password'),
+        os.getenv('NEO4J_DATABASE', 'neo4j'),
+        lazy=True
+    )
+    try:
+        runner = MigrationRunner(service, batch_size=args.batch_size)
+        if args.migrate:
+            print(f"Applied migrations: {runner.migrate(args.target)}")
+        if args.time_tree:
+            print(f"Linked to the time tree: {runner.run_backfill(TIME_TREE_BACKFILL)}")
+        if args.day_sketches:
+            print(f"Feedback re-sketched: {service.rebuild_day_sketches(args.batch_size)}")
+        print(json.dumps(runner.status(), indent=2))
+    finally:
+        service.close()
@@ -1,53 +1,323 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, Driver, unit_of_work, Bookmarks, READ_ACCESS, WRITE_ACCESS
+from neo4j.time import Date
 from neo4j.exceptions import ServiceUnavailable, TransientError
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Any
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import logging
 import json
+import time
+import base64
+
+from migrations import (MigrationRunner, TIME_TREE_BACKFILL, TIME_TREE_LINK, USER_LINK, INTENT_LINK, utc_day,
+                        DAY_SKETCH_BACKFILL, DAY_SKETCH_RESET, DAY_SKETCH_READ, merge_day_sketch)
+from query_log import SlowQueryLog, RecordingTransaction
+from storage import FeedbackStore
+from resilience import ResiliencePolicy, DatabaseUnavailableError, PoolSliceExhaustedError
+from singleflight import SingleFlight
+from hyperloglog import HyperLogLog, add_feedback, summarize_days
+from search import lucene_query, highlights, decode_cursor, page
+from read_cache import ReadCache
+from admission import INGEST, LIGHT_READ, HEAVY_ANALYTICS, HEALTH
 
 logger = logging.getLogger(__name__)
 
-class Neo4jService:
-    def __init__(self, uri: str, username: str, password: str, database: str = "neo4j"):
-        """Initialize Neo4j connection"""
-        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+# Request class whose slice of the connection pool each operation draws from
+OPERATION_WORKLOADS = {
+    'store_feedback': INGEST,
+    'count_feedback': LIGHT_READ,
+    'get_overall_analytics': LIGHT_READ,
+    'get_intent_performance': LIGHT_READ,
+    'get_feedback_trends': HEAVY_ANALYTICS,
+    'get_user_engagement': HEAVY_ANALYTICS,
+    'get_category_insights': HEAVY_ANALYTICS,
+    'get_distinct_counts': HEAVY_ANALYTICS,
+    'search_feedback': LIGHT_READ,
+    'health_check': HEALTH,
+}
+
+# Default share of max_connection_pool_size per workload; the remainder is
+# left for bootstrap, warm-up and migrations, which are not sliced
+DEFAULT_POOL_SHARES = {INGEST: 0.4, LIGHT_READ: 0.2, HEAVY_ANALYTICS: 0.3, HEALTH: 0.05}
+
+def default_pool_slices(pool_size: int) -> Dict[str, int]:
+    """Connections per workload for `pool_size` connections, at least one each"""
+    return {workload: max(1, int(pool_size * share)) for workload, share in DEFAULT_POOL_SHARES.items()}
+
+# Feedback older than the newest MonthlyArchive end is served from the archives (retention.py)
+ARCHIVES_QUERY = "MATCH (a:MonthlyArchive) RETURN a {.*} AS archive ORDER BY a.month"
+NO_ARCHIVE_HORIZON = '1970-01-01T00:00:00Z'
+
+def archive_horizon(archives: List[Dict[str, Any]]) -> str:
+    """ISO instant below which Feedback is covered by archives"""
+    if not archives:
+        return NO_ARCHIVE_HORIZON
+    end = max(archive['end'] for archive in archives)
+    return end.iso_format() if hasattr(end, 'iso_format') else str(end)
+
+def encode_bookmark(bookmarks: Bookmarks) -> Optional[str]:
+    """Opaque, URL-safe token for a set of Neo4j bookmarks"""
+    values = sorted(bookmarks.raw_values) if bookmarks else []
+    if not values:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_bookmark(token: str) -> Bookmarks:
+    """Bookmarks from a token made by encode_bookmark; raises ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Malformed bookmark: {e}")
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError("Malformed bookmark: expected a list of strings")
+    return Bookmarks.from_raw_values(values)
+
+class Neo4jService(FeedbackStore):
+    def __init__(self, uri: str, username: str, password: str, database: str = "neo4j",
+                 max_connection_pool_size: int = 100, lazy: bool = False,
+                 migration_batch_size: int = 1000, policy: Optional[ResiliencePolicy] = None,
+                 pool_slices: Optional[Dict[str, int]] = None, pool_slice_timeout: float = 5.0,
+                 driver: Optional[Driver] = None, query_log: Optional[SlowQueryLog] = None,
+                 time_tree: bool = False, single_flight: Optional[SingleFlight] = None,
+                 read_cache: Optional[ReadCache] = None, distinct_sketches: bool = True):
+        """Initialize Neo4j connection; with lazy=True call bootstrap() later
+
+        Passing `driver` shares an existing driver (and its connection pool),
+        e.g. between tenant databases; close() then leaves it open. Statement
+        timings go to `query_log`, which may also be shared. With time_tree=True
+        writes link Feedback to Year/Month/Day nodes and trends and overall
+        analytics read the Day counters instead of scanning Feedback.
+        Identical concurrent reads share one database call through
+        `single_flight`, and results are kept in `read_cache` for serving
+        stale during its grace window or an outage (both one per service, as
+        their keys do not include the database). With distinct_sketches=True
+        writes keep per-day HyperLogLog sketches of users and questions for
+        get_distinct_counts().
+        """
+        # Retries are owned by the resilience policy, so the driver's own
+        # managed-transaction retry loop is switched off
+        self._owns_driver = driver is None
+        self.driver = driver or GraphDatabase.driver(uri, auth=(username, password),
+                                                     max_connection_pool_size=max_connection_pool_size,
+                                                     max_transaction_retry_time=0)
+        self.policy = policy or ResiliencePolicy()
+        self.query_log = query_log or SlowQueryLog()
+        self.single_flight = single_flight or SingleFlight()
+        self.read_cache = read_cache or ReadCache()
+        self._local = threading.local()
         self.database = database
+        self.max_connection_pool_size = max_connection_pool_size
+        self.migration_batch_size = migration_batch_size
+        self.time_tree = time_tree
+        self.distinct_sketches = distinct_sketches
+        self._sessions_lock = threading.Lock()
+        self._sessions_in_use = 0
+        if pool_slices is None:
+            pool_slices = default_pool_slices(max_connection_pool_size)
+        self.pool_slices = pool_slices
+        self.pool_slice_timeout = pool_slice_timeout
+        self._slice_semaphores = {workload: threading.BoundedSemaphore(size)
+                                  for workload, size in pool_slices.items()}
+        self._slice_in_use: Dict[str, int] = {workload: 0 for workload in pool_slices}
+        self.startup_stats: Dict[str, Any] = {}
+        if not lazy:
+            self.bootstrap()
+
+    def bootstrap(self, warm_connections: int = 0) -> Dict[str, Any]:
+        """Verify connectivity, pre-open pool connections and bring the schema up to date"""
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {}
+
         self._verify_connection()
-        self._create_constraints_and_indexes()
+        stats['verify_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        step = time.perf_counter()
+        stats['warmed_connections'] = self.warm_up(warm_connections) if warm_connections > 0 else 0
+        stats['warm_up_ms'] = round((time.perf_counter() - step) * 1000, 2)
+
+        step = time.perf_counter()
+        stats['migrations_applied'] = self._create_constraints_and_indexes()
+        if self.time_tree:
+            stats['time_tree_linked'] = self._link_time_tree()
+        stats['schema_ms'] = round((time.perf_counter() - step) * 1000, 2)
+
+        stats['total_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        self.startup_stats = stats
+        logger.info(f"Neo4j bootstrap finished in {stats['total_ms']}ms: {stats}")
+        return stats
+
+    def warm_up(self, connections: int) -> int:
+        """Open `connections` sessions at once so the pool holds that many live connections"""
+        connections = min(connections, self.max_connection_pool_size)
+        barrier = threading.Barrier(connections)
+
+        def open_connection(_):
+            with self._session() as session:
+                session.run("RETURN 1").consume()
+                # Hold the connection until every worker has one, so they are all distinct
+                barrier.wait(timeout=30)
+            return 1
+
+        try:
+            with ThreadPoolExecutor(max_workers=connections, thread_name_prefix='neo4j-warmup') as pool:
+                warmed = sum(pool.map(open_connection, range(connections)))
+        except Exception as e:
+            logger.warning(f"Connection pool warm-up incomplete: {e}")
+            return 0
+        logger.info(f"Connection pool warmed with {warmed} connections")
+        return warmed
     
     def close(self):
         """Close the Neo4j driver connection"""
-        if self.driver:
+        self.read_cache.close()
+        if self.driver and self._owns_driver:
             self.driver.close()
     
+    @contextmanager
+    def _session(self, workload: Optional[str] = None, access_mode: str = WRITE_ACCESS,
+                 bookmarks: Optional[Bookmarks] = None):
+        """Open a session inside the workload's slice of the connection pool
+
+        With a neo4j:// URI, READ_ACCESS sessions are routed to cluster followers.
+        """
+        pool_slice = self._slice_semaphores.get(workload)
+        if pool_slice is not None and not pool_slice.acquire(timeout=self.pool_slice_timeout):
+            raise PoolSliceExhaustedError(f"No free '{workload}' connections in the pool", retry_after=1.0)
+        with self._sessions_lock:
+            self._sessions_in_use += 1
+            if pool_slice is not None:
+                self._slice_in_use[workload] += 1
+        try:
+            with self.driver.session(database=self.database, default_access_mode=access_mode,
+                                     bookmarks=bookmarks) as session:
+                yield session
+        finally:
+            with self._sessions_lock:
+                self._sessions_in_use -= 1
+                if pool_slice is not None:
+                    self._slice_in_use[workload] -= 1
+            if pool_slice is not None:
+                pool_slice.release()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage as seen by this service, overall and per workload slice"""
+        in_use = self._sessions_in_use
+        return {
+            'in_use': in_use,
+            'max_size': self.max_connection_pool_size,
+            'utilization': round(in_use / self.max_connection_pool_size, 3) if self.max_connection_pool_size else 0,
+            'slices': {
+                workload: {'in_use': self._slice_in_use[workload], 'size': size}
+                for workload, size in self.pool_slices.items()
+            }
+        }
+
+    def _execute(self, operation: str, work: Callable, *args, write: bool = False,
+                 bookmark: Optional[str] = None) -> Any:
+        """Run a transaction function under the retry, deadline and circuit-breaker policy
+
+        Reads run in READ_ACCESS mode and, given a bookmark, wait until the
+        serving member has caught up with it. Writes record their resulting
+        bookmark for last_bookmark().
+        """
+        bookmarks = decode_bookmark(bookmark) if bookmark else None
+
+        def attempt(remaining: float):
+            # The transaction timeout tracks what is left of the operation deadline
+            access_mode = WRITE_ACCESS if write else READ_ACCESS
+            with self._session(OPERATION_WORKLOADS.get(operation), access_mode, bookmarks) as session:
+                run = session.execute_write if write else session.execute_read
+                result = run(unit_of_work(timeout=remaining)(self._timed(operation, work, write)), *args)
+                if write:
+                    self._local.bookmark = encode_bookmark(session.last_bookmarks())
+                return result
+
+        return self.policy.execute(operation, attempt)
+
+    def _timed(self, operation: str, work: Callable, write: bool) -> Callable:
+        """Transaction function that reports each statement's summary timings to the query log"""
+        def timed(tx, *args):
+            recording = RecordingTransaction(tx)
+            result = work(recording, *args)
+            for query, parameters, summary, client_ms in recording.summaries():
+                self.query_log.record(operation, query, parameters, summary, client_ms, write=write,
+                                      database=self.database, plan_fetcher=self._fetch_plan)
+            return result
+        return timed
+
+    def _fetch_plan(self, mode: str, query: str, parameters: Dict[str, Any], write: bool):
+        """Summary of EXPLAIN/PROFILE for a statement, run outside the pool slices"""
+        with self._session(access_mode=WRITE_ACCESS if write else READ_ACCESS) as session:
+            return session.run(f"{mode.upper()} {query}", parameters).consume()
+
+    def last_bookmark(self) -> Optional[str]:
+        """Bookmark of the last write made by the calling thread"""
+        return getattr(self._local, 'bookmark', None)
+
+    def _read(self, operation: str, work: Callable, *args, bookmark: Optional[str] = None) -> Any:
+        """Run a read through the read cache, which serves stale results in its grace
+        window and falls back to the last good result when the read fails
+
+        Concurrent reads of the same operation and arguments are coalesced into
+        one call; waiters give up after the operation deadline plus the pool
+        slice wait. Reads with a bookmark ask for read-your-writes, so they are
+        neither cached, coalesced nor allowed to fall back. How fresh the result
+        is can be read back with last_read_freshness().
+        """
+        # Cleared first, so a read that raises never reports the previous read's freshness
+        self._local.freshness = None
+        if bookmark:
+            return self._execute(operation, work, *args, bookmark=bookmark)
+
+        key = (operation,) + args
+        timeout = self.policy.deadline_for(operation) + self.pool_slice_timeout
+
+        def load():
+            return self.single_flight.do(key, lambda: self._execute(operation, work, *args), timeout=timeout)
+
+        result, self._local.freshness = self.read_cache.get(key, load)
+        return result
+
+    def last_read_freshness(self) -> Optional[Dict[str, Any]]:
+        """`stale` flag and age in seconds of the calling thread's last analytics read"""
+        return getattr(self._local, 'freshness', None)
+
     def _verify_connection(self):
         """Verify Neo4j connection is working"""
         try:
-            with self.driver.session(database=self.database) as session:
+            with self._session() as session:
                 session.run("RETURN 1")
             logger.info("Neo4j connection verified successfully")
         except ServiceUnavailable as e:
             logger.error(f"Neo4j connection failed: {e}")
             raise
     
-    def _create_constraints_and_indexes(self):
-        """Create necessary constraints and indexes for performance"""
-        constraints_and_indexes = [
-            # Indexes for performance - no unique constraints needed since we removed IDs
-            "CREATE INDEX feedback_timestamp_idx IF NOT EXISTS FOR (f:Feedback) ON (f.timestamp)",
-            "CREATE INDEX feedback_type_idx IF NOT EXISTS FOR (f:Feedback) ON (f.feedback_type)",
-            "CREATE INDEX feedback_rating_idx IF NOT EXISTS FOR (f:Feedback) ON (f.rating_stars)"
-        ]
-        
-        with self.driver.session(database=self.database) as session:
-            for constraint_or_index in constraints_and_indexes:
-                try:
-                    session.run(constraint_or_index)
-                except Exception as e:
-                    logger.warning(f"Constraint/Index creation warning: {e}")
-        
-        logger.info("Neo4j constraints and indexes created/verified")
+    def _create_constraints_and_indexes(self) -> List[int]:
+        """Apply pending schema migrations; a no-op when the stored version is current"""
+        applied = MigrationRunner(self, batch_size=self.migration_batch_size).migrate()
+        logger.info(f"Neo4j constraints and indexes created/verified (migrations applied: {applied})")
+        return applied
     
+    def _link_time_tree(self) -> int:
+        """Attach Feedback stored while the time tree was off; skipped when the Day counters add up"""
+        with self._session() as session:
+            total = session.run("MATCH (f:Feedback) RETURN count(f) as total").single()['total']
+            linked = session.run("MATCH (d:Day) RETURN sum(d.total) AS linked").single()['linked'] or 0
+        if linked >= total:
+            return 0
+        logger.info(f"🌳 Linking {total - linked} Feedback node(s) to the time tree")
+        return MigrationRunner(self, batch_size=self.migration_batch_size).run_backfill(TIME_TREE_BACKFILL)
+
+    def rebuild_day_sketches(self, batch_size: Optional[int] = None) -> int:
+        """Add every stored Feedback to its day's sketches again, in migration-sized chunks; safe to
+        repeat. Existing Feedback is sketched once by migration 10. Returns the Feedback processed"""
+        runner = MigrationRunner(self, batch_size=batch_size or self.migration_batch_size)
+        runner.run_backfill(DAY_SKETCH_RESET)
+        return runner.run_backfill(DAY_SKETCH_BACKFILL)
+
     def store_feedback(self, feedback_data: Dict[str, Any]) -> bool:
         """
         Store simplified feedback data in Neo4j with comprehensive logging
@@ -57,6 +327,9 @@ class Neo4jService:
             
         Returns:
             bool: True if successful, False otherwise
+
+        Raises:
+            DatabaseUnavailableError: retries were exhausted or the circuit breaker is open
         """
         try:
             logger.info("🗄️ NEO4J STORAGE PROCESS STARTED")
@@ -64,19 +337,20 @@ class Neo4jService:
             logger.info(f"   Feedback Type: {feedback_data.get('feedback_type')}")
             logger.info(f"   Rating: {feedback_data.get('rating_stars', 0)}/5 stars")
 
-            with self.driver.session(database=self.database) as session:
-                logger.info("✅ Neo4j session established successfully")
-                result = session.execute_write(self._create_feedback_transaction, feedback_data)
+            result = self._execute('store_feedback', self._create_feedback_transaction, feedback_data, write=True)
 
-                if result:
-                    logger.info("✅ FEEDBACK SUCCESSFULLY WRITTEN TO NEO4J!")
-                    logger.info(f"   Database: {self.database}")
-                    logger.info("🎯 DATA TRANSFER COMPLETE: Flutter → Neo4j")
-                else:
-                    logger.error("❌ Neo4j write transaction returned False")
+            if result:
+                logger.info("✅ FEEDBACK SUCCESSFULLY WRITTEN TO NEO4J!")
+                logger.info(f"   Database: {self.database}")
+                logger.info("🎯 DATA TRANSFER COMPLETE: Flutter → Neo4j")
+            else:
+                logger.error("❌ Neo4j write transaction returned False")
 
-                return result
+            return result
 
+        except DatabaseUnavailableError:
+            logger.error(f"💥 NEO4J UNAVAILABLE: feedback not stored in {self.database}")
+            raise
         except Exception as e:
             logger.error("💥 NEO4J STORAGE ERROR:")
             logger.error(f"   Database: {self.database}")
@@ -92,6 +366,10 @@ class Neo4jService:
             feedback_type = feedback_data['feedback_type']
             user_comment = feedback_data.get('user_comment', '')
             rating_stars = feedback_data.get('rating_stars', 0)
+            categories = feedback_data.get('categories') or []
+            user_id = feedback_data.get('user_id') or None
+            detected_intent = feedback_data.get('detected_intent') or None
+            confidence_score = feedback_data.get('confidence_score')
             timestamp = feedback_data['timestamp']
 
             logger.info("🔄 CREATING SIMPLE FEEDBACK RECORD:")
@@ -110,11 +388,17 @@ class Neo4jService:
                 feedback_type: $feedback_type,
                 user_comment: $user_comment,
                 rating_stars: $rating_stars,
+                categories: $categories,
+                user_id: $user_id,
+                detected_intent: $detected_intent,
+                confidence_score: $confidence_score,
                 
                 // Essential metadata
                 timestamp: datetime($timestamp),
                 created_at: datetime()
             })
+            """ + (TIME_TREE_LINK if self.time_tree else "") + (USER_LINK if user_id else "") + \
+                (INTENT_LINK if detected_intent else "") + """
             RETURN id(f) as node_id
             """
 
@@ -124,10 +408,16 @@ class Neo4jService:
                 'feedback_type': feedback_type,
                 'user_comment': user_comment,
                 'rating_stars': rating_stars,
+                'categories': categories,
+                'user_id': user_id,
+                'detected_intent': detected_intent,
+                'confidence_score': confidence_score,
                 'timestamp': timestamp
             })
 
             stored_record = result.single()
+            if stored_record and self.distinct_sketches:
+                self._add_to_day_sketch(tx, utc_day(timestamp), user_id, user_query)
             if stored_record:
                 logger.info("✅ SIMPLE FEEDBACK RECORD CREATED SUCCESSFULLY!")
                 logger.info(f"   Node ID: {stored_record['node_id']}")
@@ -140,24 +430,49 @@ class Neo4jService:
             logger.error(f"❌ Transaction error while creating feedback: {e}")
             raise
     
-    def get_overall_analytics(self) -> Dict[str, Any]:
+    def _add_to_day_sketch(self, tx, day: str, user_id: Optional[str], user_query: str):
+        """Count a feedback in its day's sketches; the node is only locked and rewritten when a register rises"""
+        record = tx.run(DAY_SKETCH_READ, day=day).single()
+        users = HyperLogLog(record['users'] if record else None)
+        queries = HyperLogLog(record['queries'] if record else None)
+        if add_feedback(users, queries, user_id, user_query):
+            merge_day_sketch(tx, day, users, queries)
+
+    def get_overall_analytics(self, bookmark: Optional[str] = None) -> Dict[str, Any]:
         """Get overall feedback analytics"""
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.execute_read(self._get_overall_analytics_query)
-                return result
+            return self._read('get_overall_analytics', self._get_overall_analytics_query, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting overall analytics: {e}")
             return {}
     
+    def _archives(self, tx) -> List[Dict[str, Any]]:
+        """MonthlyArchive aggregates, oldest first (a handful of small nodes)"""
+        return [dict(record['archive']) for record in tx.run(ARCHIVES_QUERY)]
+
     def _get_overall_analytics_query(self, tx) -> Dict[str, Any]:
-        """Query for overall analytics"""
-        query = """
+        """Query for overall analytics: live Feedback above the archive horizon plus archived months"""
+        archives = self._archives(tx)
+        # With the time tree the counts come from a few Day nodes instead of a Feedback scan;
+        # Days are UTC dates, so they split at the (UTC month) horizon exactly like the timestamps
+        source = """
+        MATCH (d:Day)
+        WHERE d.date >= date(datetime($horizon))
+        WITH 
+            sum(d.total) as total_feedback,
+            sum(d.positive) as positive_count,
+            sum(d.negative) as negative_count
+        """ if self.time_tree else """
         MATCH (f:Feedback)
+        WHERE f.timestamp >= datetime($horizon)
         WITH 
             count(f) as total_feedback,
             sum(CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END) as positive_count,
             sum(CASE WHEN f.feedback_type = 'negative' THEN 1 ELSE 0 END) as negative_count
+        """
+        query = source + """
         RETURN 
             total_feedback,
             positive_count,
@@ -167,148 +482,186 @@ class Neo4jService:
                  ELSE 0 END as satisfaction_rate
         """
         
-        result = tx.run(query)
+        result = tx.run(query, horizon=archive_horizon(archives))
         record = result.single()
         
         if record:
-            return {
+            analytics = {
                 'total_feedback': record['total_feedback'],
                 'positive_count': record['positive_count'],
                 'negative_count': record['negative_count'],
                 'satisfaction_rate': record['satisfaction_rate']
             }
+            if archives:
+                for key, field in (('total_feedback', 'total'), ('positive_count', 'positive'),
+                                   ('negative_count', 'negative')):
+                    analytics[key] += sum(archive.get(field) or 0 for archive in archives)
+                total = analytics['total_feedback']
+                analytics['satisfaction_rate'] = \
+                    round(analytics['positive_count'] * 100.0 / total, 2) if total > 0 else 0
+            return analytics
         return {}
     
-    def get_intent_performance(self) -> List[Dict[str, Any]]:
+    def get_intent_performance(self, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get intent performance analytics"""
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.execute_read(self._get_intent_performance_query)
-                return result
+            return self._read('get_intent_performance', self._get_intent_performance_query, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting intent performance: {e}")
             return []
     
     def _get_intent_performance_query(self, tx) -> List[Dict[str, Any]]:
-        """Query for intent performance using the comprehensive feedback model"""
+        """Intent performance from the running totals on Intent nodes (one row per intent, no Feedback scan)"""
         query = """
-        MATCH (f:Feedback)
-        WHERE f.detected_intent IS NOT NULL AND f.detected_intent <> ''
-        WITH 
-            f.detected_intent as intent_name,
-            count(f) as total_feedback,
-            sum(CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END) as positive_count,
-            sum(CASE WHEN f.feedback_type = 'negative' THEN 1 ELSE 0 END) as negative_count,
-            avg(f.confidence_score) as avg_confidence
-        WHERE total_feedback > 0
+        MATCH (i:Intent)
+        WHERE i.total > 0
         RETURN 
-            intent_name,
-            total_feedback,
-            positive_count,
-            negative_count,
-            round((positive_count * 100.0) / total_feedback, 2) as satisfaction_rate,
-            round(avg_confidence, 3) as avg_confidence
+            i.name as intent_name,
+            i.total as total_feedback,
+            i.positive as positive_count,
+            i.negative as negative_count,
+            round((i.positive * 100.0) / i.total, 2) as satisfaction_rate,
+            CASE WHEN i.confidence_count > 0 THEN round(i.confidence_sum / i.confidence_count, 3) END as avg_confidence
         ORDER BY satisfaction_rate ASC, total_feedback DESC
         """
         
         result = tx.run(query)
         return [dict(record) for record in result]
     
-    def get_feedback_trends(self, days: int = 30) -> List[Dict[str, Any]]:
+    def get_feedback_trends(self, days: int = 30, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get feedback trends over time"""
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.execute_read(self._get_feedback_trends_query, days)
-                return result
+            return self._read('get_feedback_trends', self._get_feedback_trends_query, days, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting feedback trends: {e}")
             return []
     
     def _get_feedback_trends_query(self, tx, days: int) -> List[Dict[str, Any]]:
         """Query for feedback trends"""
+        archives = self._archives(tx)
+        if self.time_tree:
+            rows = self._day_trend_rows(tx, days, archive_horizon(archives))
+        else:
+            query = """
+            MATCH (f:Feedback)
+            WHERE f.timestamp >= datetime() - duration({days: $days})
+              AND f.timestamp >= datetime($horizon)
+            WITH 
+                date(datetime({datetime: f.timestamp, timezone: 'UTC'})) as feedback_date,
+                f.feedback_type as feedback_type,
+                count(f) as count
+            RETURN 
+                feedback_date,
+                feedback_type,
+                count
+            ORDER BY feedback_date DESC, feedback_type
+            """
+        
+            result = tx.run(query, days=days, horizon=archive_horizon(archives))
+            # Dates stay native; the response layer renders them per negotiated format
+            rows = [
+                {
+                    'feedback_date': record['feedback_date'],
+                    'feedback_type': record['feedback_type'],
+                    'count': record['count']
+                }
+                for record in result
+            ]
+        if not archives:
+            return rows
+
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+        counts: Dict[tuple, int] = {(row['feedback_date'].iso_format(), row['feedback_type']): row['count']
+                                    for row in rows}
+        for archive in archives:
+            for index, day in enumerate(archive.get('days') or []):
+                if day < since:
+                    continue
+                for feedback_type, field in (('positive', 'days_positive'), ('negative', 'days_negative')):
+                    if archive[field][index]:
+                        key = (day, feedback_type)
+                        counts[key] = counts.get(key, 0) + archive[field][index]
+        merged = [{'feedback_date': Date.from_iso_format(day), 'feedback_type': feedback_type, 'count': count}
+                  for (day, feedback_type), count in counts.items()]
+        merged.sort(key=lambda row: row['feedback_type'])
+        merged.sort(key=lambda row: row['feedback_date'].iso_format(), reverse=True)
+        return merged
+
+    def _day_trend_rows(self, tx, days: int, horizon: str) -> List[Dict[str, Any]]:
+        """Per-day counts read from the time tree's Day counters (whole days in the window)"""
         query = """
-        MATCH (f:Feedback)
-        WHERE f.timestamp >= datetime() - duration({days: $days})
-        WITH 
-            date(f.timestamp) as feedback_date,
-            f.feedback_type as feedback_type,
-            count(f) as count
-        RETURN 
-            feedback_date,
-            feedback_type,
-            count
-        ORDER BY feedback_date DESC, feedback_type
+        MATCH (d:Day)
+        WHERE d.date >= date() - duration({days: $days})
+          AND d.date >= date(datetime($horizon))
+        RETURN d.date AS feedback_date, d.negative AS negative, d.positive AS positive
+        ORDER BY feedback_date DESC
         """
-        
-        result = tx.run(query, days=days)
-        # Convert Neo4j Date objects to strings for JSON serialization
-        return [
-            {
-                'feedback_date': record['feedback_date'].isoformat() if record['feedback_date'] else None,
-                'feedback_type': record['feedback_type'],
-                'count': record['count']
-            }
-            for record in result
-        ]
+        rows = []
+        for record in tx.run(query, days=days, horizon=horizon):
+            for feedback_type in ('negative', 'positive'):
+                if record[feedback_type]:
+                    rows.append({'feedback_date': record['feedback_date'], 'feedback_type': feedback_type,
+                                 'count': record[feedback_type]})
+        return rows
 
-    def get_user_engagement(self, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_user_engagement(self, limit: int = 20, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get user engagement metrics"""
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.execute_read(self._get_user_engagement_query, limit)
-                return result
+            return self._read('get_user_engagement', self._get_user_engagement_query, limit, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting user engagement: {e}")
             return []
     
     def _get_user_engagement_query(self, tx, limit: int) -> List[Dict[str, Any]]:
-        """Query for user engagement using the comprehensive feedback model"""
+        """Top users by feedback count, read from the User counters in index order (O(limit))"""
         query = """
-        MATCH (f:Feedback)
-        WITH 
-            f.user_id as user_id,
-            count(f) as total_feedback,
-            sum(CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END) as positive_feedback,
-            min(f.timestamp) as first_feedback,
-            max(f.timestamp) as last_feedback
+        MATCH (u:User)
+        WHERE u.total_feedback IS NOT NULL
         RETURN 
-            user_id,
-            total_feedback,
-            positive_feedback,
-            first_feedback,
-            last_feedback
-        ORDER BY total_feedback DESC
+            u.user_id as user_id,
+            u.total_feedback as total_feedback,
+            u.positive_feedback as positive_feedback,
+            u.first_feedback as first_feedback,
+            u.last_feedback as last_feedback
+        ORDER BY u.total_feedback DESC
         LIMIT $limit
         """
         
         result = tx.run(query, limit=limit)
-        # Convert Neo4j DateTime objects to strings for JSON serialization
+        # DateTimes stay native; the response layer renders them per negotiated format
         return [
             {
                 'user_id': record['user_id'],
                 'total_feedback': record['total_feedback'],
                 'positive_feedback': record['positive_feedback'],
-                'first_feedback': record['first_feedback'].isoformat() if record['first_feedback'] else None,
-                'last_feedback': record['last_feedback'].isoformat() if record['last_feedback'] else None
+                'first_feedback': record['first_feedback'],
+                'last_feedback': record['last_feedback']
             }
             for record in result
         ]
 
-    def get_category_insights(self) -> List[Dict[str, Any]]:
+    def get_category_insights(self, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get feedback category insights"""
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.execute_read(self._get_category_insights_query)
-                return result
+            return self._read('get_category_insights', self._get_category_insights_query, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting category insights: {e}")
             return []
     
     def _get_category_insights_query(self, tx) -> List[Dict[str, Any]]:
         """Query for category insights"""
+        archives = self._archives(tx)
         query = """
         MATCH (f:Feedback)
-        WHERE size(f.categories) > 0
+        WHERE size(f.categories) > 0 AND f.timestamp >= datetime($horizon)
         UNWIND f.categories as category
         WITH 
             category,
@@ -321,13 +674,116 @@ class Neo4jService:
         ORDER BY category, feedback_type
         """
         
-        result = tx.run(query)
-        return [dict(record) for record in result]
+        result = tx.run(query, horizon=archive_horizon(archives))
+        rows = [dict(record) for record in result]
+        if not archives:
+            return rows
+
+        counts = {(row['category'], row['feedback_type']): row['count'] for row in rows}
+        for archive in archives:
+            for index, category in enumerate(archive.get('categories') or []):
+                for feedback_type, field in (('positive', 'categories_positive'),
+                                             ('negative', 'categories_negative')):
+                    if archive[field][index]:
+                        key = (category, feedback_type)
+                        counts[key] = counts.get(key, 0) + archive[field][index]
+        return [{'category': category, 'feedback_type': feedback_type, 'count': count}
+                for (category, feedback_type), count in sorted(counts.items())]
     
+    def get_distinct_counts(self, start: str, end: str, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Approximate unique users and questions per day and over start..end (ISO dates, inclusive)"""
+        try:
+            return self._read('get_distinct_counts', self._get_distinct_counts_query, start, end, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting distinct counts: {e}")
+            return {}
+
+    def _get_distinct_counts_query(self, tx, start: str, end: str) -> Dict[str, Any]:
+        """Day sketches in the range, merged in memory"""
+        query = """
+        MATCH (s:DaySketch)
+        WHERE s.date >= date($start) AND s.date <= date($end)
+        RETURN s.date AS date, s.users AS users, s.queries AS queries
+        ORDER BY s.date
+        """
+        result = tx.run(query, start=start, end=end)
+        summary = summarize_days((record['date'], record['users'], record['queries']) for record in result)
+        return {'start': start, 'end': end, **summary}
+
+    def search_feedback(self, search_terms: List[str], feedback_type: Optional[str] = None,
+                        min_rating: Optional[int] = None, max_rating: Optional[int] = None,
+                        start: Optional[str] = None, end: Optional[str] = None, limit: int = 20,
+                        cursor: Optional[str] = None, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Feedback containing every term, best match first, from the feedback_text_idx full-text index
+
+        Args:
+            search_terms: Lower-case word terms (search.terms())
+            feedback_type, min_rating, max_rating: Optional filters
+            start, end: Optional ISO instants; timestamp >= start and < end
+            limit: Results per page
+            cursor: next_cursor of the previous page
+
+        Raises:
+            ValueError: the cursor is malformed
+        """
+        if cursor is not None:
+            decode_cursor(cursor)
+        # Searches are too varied to share cached results or in-flight calls, so
+        # they skip the read cache and single-flight and always run live
+        self._local.freshness = None
+        try:
+            return self._execute('search_feedback', self._search_feedback_query, tuple(search_terms), feedback_type,
+                                 min_rating, max_rating, start, end, limit, cursor, bookmark=bookmark)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error searching feedback: {e}")
+            return {'results': [], 'next_cursor': None}
+
+    def _search_feedback_query(self, tx, search_terms: tuple, feedback_type: Optional[str],
+                               min_rating: Optional[int], max_rating: Optional[int], start: Optional[str],
+                               end: Optional[str], limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+        """Keyset-paged on (score DESC, id ASC); queryNodes already yields in score order"""
+        after_score, after_id = decode_cursor(cursor) if cursor else (None, None)
+        query = """
+        CALL db.index.fulltext.queryNodes('feedback_text_idx', $search) YIELD node AS f, score
+        WHERE ($feedback_type IS NULL OR f.feedback_type = $feedback_type)
+          AND ($min_rating IS NULL OR f.rating_stars >= $min_rating)
+          AND ($max_rating IS NULL OR f.rating_stars <= $max_rating)
+          AND ($start IS NULL OR f.timestamp >= datetime($start))
+          AND ($end IS NULL OR f.timestamp < datetime($end))
+          AND ($after_score IS NULL OR score < $after_score
+               OR (score = $after_score AND elementId(f) > $after_id))
+        RETURN elementId(f) AS id, score,
+               f {.user_query, .bot_response, .user_comment, .feedback_type, .rating_stars, .timestamp} AS feedback
+        ORDER BY score DESC, id ASC
+        LIMIT $limit
+        """
+        result = tx.run(query, search=lucene_query(list(search_terms)), feedback_type=feedback_type,
+                        min_rating=min_rating, max_rating=max_rating, start=start, end=end,
+                        after_score=after_score, after_id=after_id, limit=limit + 1)
+        rows = []
+        for record in result:
+            feedback = dict(record['feedback'])
+            rows.append({'id': record['id'], 'score': record['score'], **feedback,
+                         'highlights': highlights(feedback, list(search_terms))})
+        return page(rows, limit)
+
+    def count_feedback(self) -> int:
+        """Number of stored Feedback nodes (served from the count store, no scan)"""
+        return self._execute('count_feedback', self._count_feedback_query)
+
+    def _count_feedback_query(self, tx) -> int:
+        record = tx.run("MATCH (f:Feedback) RETURN count(f) as total").single()
+        return record['total'] if record else 0
+
     def health_check(self) -> Dict[str, Any]:
         """Check Neo4j service health"""
         try:
-            with self.driver.session(database=self.database) as session:
+            with self._session(HEALTH, READ_ACCESS) as session:
                 result = session.run("RETURN 1 as status")
                 record = result.single()
                 
@@ -336,6 +792,7 @@ class Neo4jService:
                         'status': 'healthy',
                         'database': 'connected',
                         'database_name': self.database,
+                        'circuit_breaker': self.policy.breaker.snapshot(),
                         'timestamp': datetime.now().isoformat()
                     }
                 else:
@@ -343,6 +800,7 @@ class Neo4jService:
                         'status': 'unhealthy',
                         'database': 'disconnected',
                         'database_name': self.database,
+                        'circuit_breaker': self.policy.breaker.snapshot(),
                         'timestamp': datetime.now().isoformat()
                     }
         except Exception as e:
@@ -352,5 +810,6 @@ class Neo4jService:
                 'database': 'error',
                 'database_name': self.database,
                 'error': str(e),
+                'circuit_breaker': self.policy.breaker.snapshot(),
                 'timestamp': datetime.now().isoformat()
             }
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+On-demand request profiling with a bounded on-disk ring of results
+
+A selected request runs under cProfile while a sampler thread records the
+request thread's stack at a fixed interval. Each profile is written as a
+pstats file (<id>.prof, for snakeviz/pstats), collapsed stacks (<id>.folded,
+for flamegraph.pl/speedscope) and a small metadata file (<id>.json). Only the
+newest `max_profiles` profiles are kept.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FORMATS = {'prof': '.prof', 'folded': '.folded', 'json': '.json'}
+_PROFILE_ID = re.compile(r'^[0-9]{8}T[0-9]{12}-[A-Za-z0-9_.-]+-[0-9a-f]{8}$')
+
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Periodic sampler of one thread's Python stack, in collapsed-stack form
+
+        Args:
+            thread_id: threading.get_ident() of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ActiveProfile:
+    """cProfile plus stack sampler around one request"""
+
+    def __init__(self, sample_interval: float):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident(), sample_interval)
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self) -> float:
+        """Stop profiling; returns the profiled time in milliseconds"""
+        self.profiler.disable()
+        self.sampler.stop()
+        return (time.perf_counter() - self._started) * 1000
+
+
+class RequestProfiler:
+    def __init__(self, directory: str = 'profiles', max_profiles: int = 50, sample_rate: float = 0.0,
+                 endpoints: Iterable[str] = (), sample_interval: float = 0.005, max_concurrent: int = 1):
+        """
+        Selects requests for profiling and keeps the newest results on disk
+
+        Args:
+            directory: Where profile files are written
+            max_profiles: Profiles kept; older ones are deleted
+            sample_rate: Share of requests profiled without being asked to
+            endpoints: Flask endpoint names eligible for sampling (empty means all)
+            sample_interval: Seconds between stack samples
+            max_concurrent: Requests profiled at once; others run unprofiled
+        """
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.sample_rate = sample_rate
+        self.endpoints = frozenset(endpoints)
+        self.sample_interval = sample_interval
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._write_lock = threading.Lock()
+        self.skipped_busy = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def wants(self, endpoint: Optional[str], forced: bool) -> bool:
+        """Whether to profile a request to `endpoint`; `forced` when an admin asked for it"""
+        if forced:
+            return True
+        if self.sample_rate <= 0 or (self.endpoints and endpoint not in self.endpoints):
+            return False
+        return random.random() < self.sample_rate
+
+    def start(self) -> Optional[ActiveProfile]:
+        """Begin profiling the calling thread, or None if all profiling slots are busy"""
+        if not self._slots.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+        try:
+            return ActiveProfile(self.sample_interval)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def finish(self, active: ActiveProfile, metadata: Dict[str, Any]) -> Optional[str]:
+        """Stop `active`, write its files and prune the ring; returns the profile id"""
+        try:
+            duration_ms = active.stop()
+        finally:
+            self._slots.release()
+        label = re.sub(r'[^A-Za-z0-9_.-]', '_', metadata.get('endpoint') or 'unknown')[:40]
+        stamp = datetime.fromtimestamp(active.started_at, timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        profile_id = f"{stamp}-{label}-{uuid.uuid4().hex[:8]}"
+        metadata = dict(metadata, id=profile_id, duration_ms=round(duration_ms, 3),
+                        started_at=datetime.fromtimestamp(active.started_at, timezone.utc).isoformat(),
+                        samples=sum(active.sampler.stacks.values()))
+        base = os.path.join(self.directory, profile_id)
+        try:
+            with self._write_lock:
+                active.profiler.dump_stats(base + '.prof')
+                with open(base + '.folded', 'w', encoding='utf-8') as handle:
+                    handle.write(active.sampler.collapsed())
+                with open(base + '.json', 'w', encoding='utf-8') as handle:
+                    json.dump(metadata, handle)
+                self._prune()
+        except OSError as e:
+            logger.error(f"Could not write profile {profile_id}: {e}")
+            return None
+        logger.info(f"🔬 Profiled {metadata.get('method')} {metadata.get('path')} "
+                    f"in {duration_ms:.1f}ms -> {profile_id}")
+        return profile_id
+
+    def _prune(self):
+        for stale in self._profile_ids()[self.max_profiles:]:
+            for suffix in PROFILE_FORMATS.values():
+                try:
+                    os.remove(os.path.join(self.directory, stale + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _profile_ids(self) -> List[str]:
+        """Stored profile ids, newest first"""
+        ids = [name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')]
+        return sorted((i for i in ids if _PROFILE_ID.match(i)), reverse=True)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for profile_id in self._profile_ids():
+            try:
+                with open(os.path.join(self.directory, profile_id + '.json'), 'r', encoding='utf-8') as handle:
+                    profiles.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path(self, profile_id: str, fmt: str = 'prof') -> Optional[str]:
+        """File for a stored profile, or None for unknown ids and formats"""
+        if fmt not in PROFILE_FORMATS or not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, profile_id + PROFILE_FORMATS[fmt])
+        return path if os.path.exists(path) else None
+
+    def summary(self, profile_id: str, sort: str = 'cumulative', limit: int = 40) -> Optional[str]:
+        """pstats text report of a stored profile"""
+        path = self.path(profile_id, 'prof')
+        if path is None:
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'directory': self.directory, 'stored': len(self._profile_ids()),
+                'max_profiles': self.max_profiles, 'sample_rate': self.sample_rate,
+                'endpoints': sorted(self.endpoints), 'skipped_busy': self.skipped_busy}
@@ -0,0 +1,254 @@
+"""
+Per-query timings from Neo4j result summaries, a slow-query log and captured plans
+
+Every statement the service runs inside a transaction function reports its
+ResultSummary timings (result_available_after / result_consumed_after, in
+server milliseconds) along with the client-side time. Statements slower than
+the threshold are logged with redacted parameters and kept in a top-K table;
+for the first N slow occurrences of each statement an EXPLAIN or PROFILE plan
+is fetched in the background.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parameters whose values are safe to log as-is (enums and sizes, never user text)
+SAFE_PARAMETERS = frozenset({'feedback_type', 'days', 'limit', 'batch_size', 'version', 'horizon',
+                             'day', 'start', 'end'})
+PLAN_MODES = ('explain', 'profile')
+
+
+def redact_parameters(parameters: Dict[str, Any], safe: frozenset = SAFE_PARAMETERS) -> Dict[str, Any]:
+    """Parameters with free text replaced by its length, so logs never carry user content"""
+    redacted = {}
+    for name, value in (parameters or {}).items():
+        if name in safe or value is None or isinstance(value, (bool, int, float)):
+            redacted[name] = value
+        elif isinstance(value, str):
+            redacted[name] = f"<str:{len(value)}>"
+        elif isinstance(value, (list, tuple)):
+            redacted[name] = f"<list:{len(value)}>"
+        elif isinstance(value, dict):
+            redacted[name] = f"<map:{len(value)}>"
+        else:
+            redacted[name] = f"<{type(value).__name__}>"
+    return redacted
+
+
+def compact_plan(plan: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Operator tree from a summary plan/profile, keeping rows, DB hits and estimates"""
+    if not plan:
+        return None
+    args = plan.get('args') or {}
+    node = {'operator': plan.get('operatorType'), 'identifiers': plan.get('identifiers', [])}
+    for key, source in (('rows', plan.get('rows')), ('db_hits', plan.get('dbHits')),
+                        ('estimated_rows', args.get('EstimatedRows')), ('details', args.get('Details'))):
+        if source is not None:
+            node[key] = round(source, 2) if isinstance(source, float) else source
+    children = [compact_plan(child) for child in plan.get('children') or []]
+    if children:
+        node['children'] = children
+    return node
+
+
+def total_db_hits(plan: Optional[Dict[str, Any]]) -> Optional[int]:
+    if not plan or plan.get('dbHits') is None:
+        return None
+    return plan['dbHits'] + sum(total_db_hits(child) or 0 for child in plan.get('children') or [])
+
+
+class QueryTiming:
+    __slots__ = ('operation', 'database', 'query', 'parameters', 'available_ms', 'consumed_ms', 'client_ms',
+                 'write', 'recorded_at', 'plan', 'db_hits', 'plan_mode')
+
+    def __init__(self, operation: str, query: str, parameters: Dict[str, Any], available_ms: Optional[int],
+                 consumed_ms: Optional[int], client_ms: float, write: bool, database: Optional[str] = None):
+        self.operation = operation
+        self.database = database
+        self.query = query
+        self.parameters = parameters
+        self.available_ms = available_ms
+        self.consumed_ms = consumed_ms
+        self.client_ms = client_ms
+        self.write = write
+        self.recorded_at = time.time()
+        self.plan: Optional[Dict[str, Any]] = None
+        self.db_hits: Optional[int] = None
+        self.plan_mode: Optional[str] = None
+
+    @property
+    def server_ms(self) -> Optional[int]:
+        if self.available_ms is None:
+            return None
+        return self.available_ms + (self.consumed_ms or 0)
+
+    @property
+    def duration_ms(self) -> float:
+        """Server time when the summary has it, otherwise the client-side time"""
+        server = self.server_ms
+        return float(server) if server is not None else self.client_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {
+            'operation': self.operation,
+            'database': self.database,
+            'query': ' '.join(self.query.split()),
+            'parameters': redact_parameters(self.parameters),
+            'result_available_after_ms': self.available_ms,
+            'result_consumed_after_ms': self.consumed_ms,
+            'server_ms': self.server_ms,
+            'client_ms': round(self.client_ms, 3),
+            'recorded_at': datetime.fromtimestamp(self.recorded_at, timezone.utc).isoformat()
+        }
+        if self.plan_mode:
+            entry['plan_mode'] = self.plan_mode
+            entry['db_hits'] = self.db_hits
+            entry['plan'] = self.plan
+        return entry
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = 500.0, top_k: int = 20, plan_samples: int = 0,
+                 plan_mode: str = 'explain'):
+        """
+        Query timing statistics, slow-query logging and a top-K slowest table
+
+        Args:
+            threshold_ms: Queries at or above this duration are logged as slow
+            top_k: Slowest queries kept for slow_queries()
+            plan_samples: Slow occurrences per statement that get a plan captured (0 disables)
+            plan_mode: 'explain', or 'profile' (reads only; writes are always EXPLAINed)
+
+        One log can be shared by several services (e.g. tenant databases);
+        each passes its own plan fetcher to record().
+        """
+        if plan_mode not in PLAN_MODES:
+            raise ValueError(f"plan_mode must be one of {PLAN_MODES}")
+        self.threshold_ms = threshold_ms
+        self.top_k = top_k
+        self.plan_samples = plan_samples
+        self.plan_mode = plan_mode
+        self._lock = threading.Lock()
+        self._slowest: List[tuple] = []  # min-heap of (duration, sequence, QueryTiming)
+        self._sequence = itertools.count()
+        self._operations: Dict[str, Dict[str, Any]] = {}
+        self._plans_taken: Dict[tuple, int] = {}  # (operation, query) -> plans captured
+        self._plan_pool: Optional[ThreadPoolExecutor] = None
+
+    def record(self, operation: str, query: str, parameters: Dict[str, Any], summary: Any,
+               client_ms: float, write: bool = False, database: Optional[str] = None,
+               plan_fetcher: Optional[Callable[..., Any]] = None) -> QueryTiming:
+        """Record one statement; plan_fetcher(mode, query, parameters, write) returns a ResultSummary"""
+        timing = QueryTiming(operation, query, parameters or {},
+                             getattr(summary, 'result_available_after', None),
+                             getattr(summary, 'result_consumed_after', None), client_ms, write, database)
+        duration = timing.duration_ms
+        slow = duration >= self.threshold_ms
+        with self._lock:
+            stats = self._operations.setdefault(operation, {'count': 0, 'slow': 0, 'total_ms': 0.0,
+                                                            'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += duration
+            stats['max_ms'] = max(stats['max_ms'], duration)
+            if slow:
+                stats['slow'] += 1
+            if self.top_k > 0:
+                item = (duration, next(self._sequence), timing)
+                if len(self._slowest) < self.top_k:
+                    heapq.heappush(self._slowest, item)
+                elif duration > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, item)
+            want_plan = slow and plan_fetcher is not None and \
+                self._plans_taken.get((operation, query), 0) < self.plan_samples
+            if want_plan:
+                self._plans_taken[(operation, query)] = self._plans_taken.get((operation, query), 0) + 1
+        if slow:
+            logger.warning(f"🐢 Slow query '{operation}': {duration:.0f}ms "
+                           f"(available after {timing.available_ms}ms, consumed after {timing.consumed_ms}ms, "
+                           f"client {client_ms:.1f}ms) params={redact_parameters(timing.parameters)}")
+        if want_plan:
+            self._fetch_plan_later(timing, plan_fetcher)
+        return timing
+
+    def _fetch_plan_later(self, timing: QueryTiming, plan_fetcher: Callable[..., Any]):
+        """Plans are fetched off the request path, one at a time"""
+        with self._lock:
+            if self._plan_pool is None:
+                self._plan_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='query-plan')
+        self._plan_pool.submit(self._fetch_plan, timing, plan_fetcher)
+
+    def _fetch_plan(self, timing: QueryTiming, plan_fetcher: Callable[..., Any]):
+        # PROFILE executes the statement, so it is never used for writes
+        mode = 'profile' if self.plan_mode == 'profile' and not timing.write else 'explain'
+        try:
+            summary = plan_fetcher(mode, timing.query, timing.parameters, timing.write)
+        except Exception as e:
+            logger.warning(f"Could not capture {mode.upper()} plan for '{timing.operation}': {e}")
+            return
+        raw = getattr(summary, 'profile', None) if mode == 'profile' else getattr(summary, 'plan', None)
+        with self._lock:
+            timing.plan_mode = mode
+            timing.plan = compact_plan(raw)
+            timing.db_hits = total_db_hits(raw)
+        logger.info(f"🧭 Captured {mode.upper()} plan for '{timing.operation}'"
+                    + (f" ({timing.db_hits} db hits)" if timing.db_hits is not None else ""))
+
+    def slow_queries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Slowest recorded queries, slowest first"""
+        with self._lock:
+            ranked = sorted(self._slowest, key=lambda item: (-item[0], item[1]))
+            return [timing.to_dict() for _, _, timing in ranked[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            operations = {
+                name: {'count': s['count'], 'slow': s['slow'], 'max_ms': round(s['max_ms'], 3),
+                       'mean_ms': round(s['total_ms'] / s['count'], 3) if s['count'] else 0.0}
+                for name, s in sorted(self._operations.items())
+            }
+        return {'threshold_ms': self.threshold_ms, 'top_k': self.top_k, 'plan_samples': self.plan_samples,
+                'plan_mode': self.plan_mode, 'operations': operations}
+
+    def reset(self):
+        with self._lock:
+            self._slowest.clear()
+            self._operations.clear()
+            self._plans_taken.clear()
+
+    def close(self, wait: bool = False):
+        """Stop the plan fetcher; wait=True lets pending plan captures finish first"""
+        if self._plan_pool is not None:
+            self._plan_pool.shutdown(wait=wait)
+
+
+class RecordingTransaction:
+    """Transaction proxy that remembers each statement's result for its summary"""
+
+    def __init__(self, tx):
+        self._tx = tx
+        self.runs: List[tuple] = []
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs):
+        started = time.perf_counter()
+        result = self._tx.run(query, parameters, **kwargs)
+        self.runs.append((query, {**(parameters or {}), **kwargs}, result, started))
+        return result
+
+    def summaries(self):
+        """(query, parameters, summary, client ms) per statement; each statement's client time
+        runs until the next one started or, for the last, until its summary arrived"""
+        for index, (query, parameters, result, started) in enumerate(self.runs):
+            summary = result.consume()
+            finished = self.runs[index + 1][3] if index + 1 < len(self.runs) else time.perf_counter()
+            yield query, parameters, summary, (finished - started) * 1000
+
+    def __getattr__(self, name: str):
+        return getattr(self._tx, name)
@@ -0,0 +1,93 @@
+"""
+Per-client token-bucket rate limiting and a global concurrency cap
+
+Buckets live in an OrderedDict kept in least-recently-used order, so a
+lookup, a refill and the eviction of idle entries are all O(1) amortised.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, Tuple[float, float]], idle_ttl: float = 600.0,
+                 max_entries: int = 100000):
+        """
+        Token buckets per (limit name, client key)
+
+        Args:
+            limits: Limit name -> (tokens per second, burst capacity)
+            idle_ttl: Seconds after which an untouched bucket is dropped; a
+                dropped bucket would have refilled to full anyway
+            max_entries: Hard cap on tracked buckets
+        """
+        self.limits = limits
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, limit: str, client: str, tokens: float = 1.0) -> Tuple[bool, float]:
+        """Take tokens from the client's bucket; returns (allowed, seconds until allowed)"""
+        if limit not in self.limits:
+            return True, 0.0
+        rate, burst = self.limits[limit]
+        now = time.monotonic()
+        key = (limit, client)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(burst, now)
+                self._buckets[key] = bucket
+            else:
+                bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+                self._buckets.move_to_end(key)
+            self._evict(now)
+
+            if bucket.tokens >= tokens:
+                bucket.tokens -= tokens
+                return True, 0.0
+            return False, (tokens - bucket.tokens) / rate if rate > 0 else self.idle_ttl
+
+    def _evict(self, now: float):
+        """Drop idle buckets from the least-recently-used end"""
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket.updated < self.idle_ttl and len(self._buckets) <= self.max_entries:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrent: int):
+        """Non-blocking cap on requests being processed at once (0 disables it)"""
+        self.max_concurrent = max_concurrent
+        self._semaphore = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+
+    def try_acquire(self) -> bool:
+        return self._semaphore is None or self._semaphore.acquire(blocking=False)
+
+    def release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+def retry_after_header(seconds: Optional[float]) -> str:
+    """Retry-After value in whole seconds, at least 1"""
+    return str(max(1, math.ceil(seconds or 0)))
@@ -0,0 +1,130 @@
+"""
+Stale-while-revalidate cache for analytics reads
+
+A result younger than `ttl` seconds is served as is. During the following
+`grace` seconds it is still served at once, marked stale, while a single
+background refresh per key reloads it. Anything older is reloaded on the
+request path. When a reload fails, the last good result is served whatever
+its age, marked stale, so an outage shows old numbers with their age instead
+of an error or empty data.
+"""
+
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def freshness(stale: bool, age: float) -> Dict[str, Any]:
+    return {'stale': stale, 'age_seconds': round(age, 1)}
+
+
+class ReadCache:
+    def __init__(self, ttl: float = 0.0, grace: float = 0.0, max_entries: int = 512, refresh_workers: int = 1):
+        """
+        Last good result per read, with background revalidation
+
+        Args:
+            ttl: Seconds a result is served without going to the database
+            grace: Seconds after the TTL during which the cached result is served
+                stale while it is refreshed in the background
+            max_entries: Results kept; the least recently stored is dropped first
+            refresh_workers: Threads running background refreshes
+        """
+        self.ttl = ttl
+        self.grace = grace
+        self.max_entries = max_entries
+        self.refresh_workers = refresh_workers
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Tuple[Any, float]] = {}  # key -> (value, monotonic time stored)
+        self._refreshing: Set[tuple] = set()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self.hits = 0
+        self.stale_served = 0
+        self.fallbacks = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def get(self, key: tuple, load: Callable[[], Any]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        (result, freshness) for `key` = (operation, *args); load() reads from the database
+
+        Raises:
+            Exception: whatever load() raised, when there is no earlier result to fall back to
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[1]
+            if age < self.ttl:
+                self.hits += 1
+                return entry[0], freshness(False, age)
+            if age < self.ttl + self.grace:
+                self.stale_served += 1
+                self._refresh_later(key, load)
+                return entry[0], freshness(True, age)
+
+        try:
+            value = load()
+        except Exception as e:
+            if entry is None:
+                raise
+            self.fallbacks += 1
+            age = time.monotonic() - entry[1]
+            logger.warning(f"Serving last good {key[0]} result ({age:.0f}s old) after a failed read: "
+                           f"{type(e).__name__}: {e}")
+            return entry[0], freshness(True, age)
+        self._store(key, value)
+        return value, freshness(False, 0.0)
+
+    def _store(self, key: tuple, value: Any):
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (value, time.monotonic())
+
+    def _refresh_later(self, key: tuple, load: Callable[[], Any]):
+        with self._lock:
+            # A closed cache (e.g. an evicted tenant's) keeps serving but stops refreshing
+            if key in self._refreshing or self._closed:
+                return
+            self._refreshing.add(key)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                                thread_name_prefix='analytics-refresh')
+        self._pool.submit(self._refresh, key, load)
+
+    def _refresh(self, key: tuple, load: Callable[[], Any]):
+        try:
+            self._store(key, load())
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning(f"Background refresh of {key[0]} failed: {type(e).__name__}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            refreshing = len(self._refreshing)
+        return {'ttl': self.ttl, 'grace': self.grace, 'entries': entries, 'refreshing': refreshing,
+                'hits': self.hits, 'stale_served': self.stale_served, 'fallbacks': self.fallbacks,
+                'refreshes': self.refreshes, 'refresh_failures': self.refresh_failures}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            pool = self._pool
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Replay captured API traffic against a running server
+
+Reads the JSONL files written when CAPTURE_ENABLED is on (rotated files
+included), orders the requests by arrival time and re-issues them with their
+original spacing divided by --speed. The report puts the replay latency next
+to the server time recorded at capture, per endpoint, so two builds can be
+compared on the same traffic.
+
+Usage:
+    python replay_traffic.py captures/requests.jsonl
+    python replay_traffic.py captures/requests.jsonl --speed 4 --base-url http://staging:8000/api
+    python replay_traffic.py captures/requests.jsonl.2 captures/requests.jsonl.1 captures/requests.jsonl
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+from load_test import LoadGenerator, format_table, latency_summary, load_traffic, replay_headers
+
+
+def capture_files(path: str) -> List[str]:
+    """A capture file and its rotated siblings, oldest first"""
+    rotated = [name for name in glob.glob(glob.escape(path) + '.*') if name.rsplit('.', 1)[-1].isdigit()]
+    rotated.sort(key=lambda name: int(name.rsplit('.', 1)[-1]), reverse=True)
+    return rotated + ([path] if path not in rotated else [])
+
+
+def load_capture(paths: List[str], include_rotated: bool = True) -> List[Dict[str, Any]]:
+    """Captured requests from all files, ordered by arrival time; a file named both
+    directly and as a rotated sibling is read once"""
+    entries, seen = [], set()
+    for path in paths:
+        for name in (capture_files(path) if include_rotated else [path]):
+            key = os.path.abspath(name)
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.extend(load_traffic(name))
+    entries.sort(key=lambda entry: entry.get('ts', 0))
+    return entries
+
+
+def replay_schedule(entries: List[Dict[str, Any]], speed: float) -> Iterator[tuple]:
+    """(offset, name, method, path, body, headers) tuples with the captured gaps scaled by 1/speed"""
+    if not entries:
+        return
+    first = entries[0].get('ts', 0)
+    for entry in entries:
+        offset = (entry.get('ts', first) - first) / speed if speed > 0 else 0.0
+        yield (offset, entry.get('route') or entry['path'], entry['method'], entry['path'],
+               entry.get('body'), replay_headers(entry))
+
+
+def captured_summary(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Server-side latency recorded at capture time, per endpoint and overall"""
+    by_route: Dict[str, List[float]] = {}
+    for entry in entries:
+        if entry.get('duration_ms') is not None:
+            by_route.setdefault(entry.get('route') or entry['path'], []).append(entry['duration_ms'] / 1000.0)
+    summary = {name: latency_summary(values) for name, values in sorted(by_route.items())}
+    summary['TOTAL'] = latency_summary([value for values in by_route.values() for value in values])
+    return summary
+
+
+def format_comparison(report: Dict[str, Any], captured: Dict[str, Any]) -> str:
+    """Replay vs captured p50/p95/p99 per endpoint"""
+    header = f"{'endpoint':<22}{'captured p50':>14}{'replay p50':>12}{'captured p95':>14}{'replay p95':>12}" \
+             f"{'captured p99':>14}{'replay p99':>12}"
+    lines = [header, '-' * len(header)]
+    rows = list(report['endpoints'].items()) + [('TOTAL', report)]
+    for name, section in rows:
+        before = captured.get(name)
+        if not before:
+            continue
+        after = section['latency_ms']
+        lines.append(f"{name:<22}{before['p50']:>14.1f}{after['p50']:>12.1f}{before['p95']:>14.1f}"
+                     f"{after['p95']:>12.1f}{before['p99']:>14.1f}{after['p99']:>12.1f}")
+    lines.append("captured = server time at capture; replay = client-observed time from scheduled start")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured traffic against the Feedback API")
+    parser.add_argument("capture", nargs='+', help="Capture file(s); rotated .1, .2, ... siblings are included")
+    parser.add_argument("--base-url", default="http://localhost:8000/api", help="Base URL for the API")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Pacing multiplier: 1 = original timing, 2 = twice as fast, 0 = as fast as possible")
+    parser.add_argument("--no-rotated", action='store_true', help="Only read the named files")
+    parser.add_argument("--limit", type=int, default=None, help="Replay at most this many requests")
+    parser.add_argument("--workers", type=int, default=64, help="Client threads / keep-alive connections")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--header", action='append', default=[], help="Extra header 'Name: value' (repeatable)")
+    parser.add_argument("--json-out", default=None, help="Write the JSON report to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        entries = load_capture(args.capture, include_rotated=not args.no_rotated)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot read capture: {e}", file=sys.stderr)
+        return 1
+    if args.limit is not None:
+        entries = entries[:args.limit]
+    if not entries:
+        print(f"❌ No requests to replay in {', '.join(args.capture)}", file=sys.stderr)
+        return 1
+    headers = {}
+    for header in args.header:
+        name, _, value = header.partition(':')
+        headers[name.strip()] = value.strip()
+
+    span = entries[-1].get('ts', 0) - entries[0].get('ts', 0)
+    print(f"🔁 Replaying {len(entries)} requests spanning {span:.1f}s at {args.speed}x against {args.base_url}",
+          file=sys.stderr)
+    generator = LoadGenerator(args.base_url, rate=1.0, workers=args.workers, timeout=args.timeout, headers=headers)
+    report = generator.run_schedule(replay_schedule(entries, args.speed))
+    captured = captured_summary(entries)
+    report['config'] = {'base_url': args.base_url, 'speed': args.speed, 'requests': len(entries),
+                        'captured_span_s': round(span, 3), 'workers': args.workers}
+    report['captured_latency_ms'] = captured
+
+    print(format_table(report))
+    print()
+    print(format_comparison(report, captured))
+    if args.json_out == '-':
+        print(json.dumps(report, indent=2))
+    elif args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"📄 JSON report written to {args.json_out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Retry, deadline and circuit-breaker policy for database calls
+
+Retryable failures (deadlocks, leader switches, lost connections) are retried
+with jittered exponential backoff inside a per-operation deadline. Calls that
+still cannot reach the database once their retries are spent open a circuit
+breaker, so request threads fail fast instead of piling up on a dead backend.
+Contention such as deadlocks is retried but never counts against the breaker,
+since the database answered.
+"""
+
+import random
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Any
+
+from neo4j.exceptions import Neo4jError, ServiceUnavailable, SessionExpired, TransientError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+# Errors meaning the database could not be reached; only these count toward the breaker
+CONNECTIVITY_ERRORS = (ServiceUnavailable, SessionExpired)
+
+
+class DatabaseUnavailableError(Exception):
+    """The database cannot serve the call right now; retry after `retry_after` seconds"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(DatabaseUnavailableError):
+    """Raised without touching the database while the circuit breaker is open"""
+
+
+class PoolSliceExhaustedError(DatabaseUnavailableError):
+    """A workload's share of the connection pool stayed full for the whole wait"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a driver error is worth retrying"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    check = getattr(error, 'is_retryable', None)
+    return bool(check()) if callable(check) else False
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Open after `failure_threshold` consecutive failed calls, probe again after `reset_timeout`"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a trial call through"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; in half-open state only one trial call is let through"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit breaker closed, database calls resumed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.error(f"Circuit breaker opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """End a call without changing the breaker's health, e.g. one that ended in contention"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'retry_after_seconds': round(self.retry_after(), 3)
+        }
+
+
+class ResiliencePolicy:
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.05, max_delay: float = 2.0,
+                 default_deadline: float = 10.0, deadlines: Optional[Dict[str, float]] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Retry and circuit-breaker policy shared by every Neo4jService operation
+
+        Args:
+            max_attempts: Attempts per call, including the first one
+            base_delay: Backoff before the first retry, doubled on each attempt
+            max_delay: Upper bound for a single backoff
+            default_deadline: Seconds an operation may take across all attempts
+            deadlines: Per-operation overrides of default_deadline
+            breaker: Circuit breaker consulted before each call
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.default_deadline = default_deadline
+        self.deadlines = deadlines or {}
+        self.breaker = breaker or CircuitBreaker()
+
+    def deadline_for(self, operation: str) -> float:
+        return self.deadlines.get(operation, self.default_deadline)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry number (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def execute(self, operation: str, call: Callable[[float], Any]) -> Any:
+        """
+        Run `call(remaining_seconds)` under the retry, deadline and breaker policy
+
+        A call records at most one breaker failure, and only when its retries
+        ended on a connectivity error. A call that got an answer from the
+        database, even a non-retryable error, counts as a success.
+
+        Raises:
+            CircuitOpenError: the breaker is open, the database was not contacted
+            DatabaseUnavailableError: retryable failures outlasted the attempts or deadline
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{operation}: circuit breaker open", retry_after=self.breaker.retry_after() or 1.0)
+
+        deadline = time.monotonic() + self.deadline_for(operation)
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            try:
+                result = call(max(remaining, 0.001))
+            except Exception as e:
+                if not is_retryable(e):
+                    if isinstance(e, Neo4jError):
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.release()
+                    raise
+                delay = self.backoff(attempt)
+                remaining = deadline - time.monotonic()
+                # Stop early once another call has opened the breaker
+                if (attempt >= self.max_attempts or delay >= remaining
+                        or self.breaker.state == CircuitBreaker.OPEN):
+                    if isinstance(e, CONNECTIVITY_ERRORS):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release()
+                    logger.error(f"{operation} failed after {attempt} attempt(s): {e}")
+                    raise DatabaseUnavailableError(
+                        f"{operation}: database unavailable ({type(e).__name__})",
+                        retry_after=max(self.breaker.retry_after(), 1.0)
+                    ) from e
+                logger.warning(f"{operation} attempt {attempt} failed ({type(e).__name__}), retrying in {delay:.3f}s")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Retention for Feedback nodes: archive whole months, then delete them
+
+Every calendar month (UTC) that ended more than the retention age ago is
+processed oldest first:
+
+1. its Feedback nodes are streamed to a gzip JSONL file in the archive
+   directory (merged with any earlier file for that month),
+2. a (:MonthlyArchive {month}) node is (re)written with aggregates computed
+   from that file: totals, per-day, per-category and per-intent counts,
+3. the month's nodes are deleted in CALL { ... } IN TRANSACTIONS chunks,
+   pausing between chunks so the delete does not crowd out live traffic;
+   their Day counters are decremented and emptied days pruned.
+
+With the time tree on (Neo4jService(time_tree=True)) the month's Feedback is
+found by walking its ~30 Day nodes instead of filtering the Feedback label.
+
+Analytics read live Feedback only from the newest archive end onwards and
+add the MonthlyArchive aggregates, so a month counts exactly once even while
+its nodes are still being deleted. Every step is idempotent: a crashed run is
+completed by the next one, and feedback that arrives late for an archived
+month is folded into that month's archive on the next run.
+
+Usage:
+    python retention.py --status
+    python retention.py --run --days 365 [--dry-run]
+"""
+
+import gzip
+import json
+import os
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from migrations import utc_day
+
+logger = logging.getLogger(__name__)
+
+OLDEST_QUERY = """
+MATCH (f:Feedback) WHERE f.timestamp < datetime($cutoff)
+RETURN min(f.timestamp) AS oldest
+"""
+
+MONTH_FILTER = """
+MATCH (f:Feedback)
+WHERE f.timestamp >= datetime($start) AND f.timestamp < datetime($end)
+  AND (f.created_at IS NULL OR f.created_at < datetime($snapshot))
+"""
+
+# With the time tree a month's Feedback is reached through its Day nodes. Days are UTC
+# dates, so a UTC month is exactly the Days from its first to its last date.
+OLDEST_DAY_QUERY = """
+MATCH (d:Day) WHERE d.date < date(datetime($cutoff)) AND d.total > 0
+RETURN min(d.date) AS oldest
+"""
+
+DAY_MONTH_FILTER = """
+MATCH (d:Day)
+WHERE d.date >= date(datetime($start)) AND d.date < date(datetime($end))
+MATCH (f:Feedback)-[:ON_DAY]->(d)
+WHERE f.timestamp >= datetime($start) AND f.timestamp < datetime($end)
+  AND (f.created_at IS NULL OR f.created_at < datetime($snapshot))
+"""
+
+EXPORT_SUFFIX = "RETURN elementId(f) AS id, f {.*} AS feedback"
+
+# Deleting a node also takes it off its Day counters (a no-op for unlinked Feedback)
+DELETE_FEEDBACK = """
+OPTIONAL MATCH (f)-[:ON_DAY]->(d:Day)
+SET d.total = d.total - 1,
+    d.positive = d.positive - CASE WHEN f.feedback_type = 'positive' THEN 1 ELSE 0 END,
+    d.negative = d.negative - CASE WHEN f.feedback_type = 'negative' THEN 1 ELSE 0 END
+DETACH DELETE f
+"""
+
+PRUNE_DAYS_QUERY = """
+MATCH (d:Day)
+WHERE d.date >= date(datetime($start)) AND d.date < date(datetime($end))
+  AND d.total <= 0 AND NOT (d)<-[:ON_DAY]-()
+OPTIONAL MATCH (m:Month)-[:HAS_DAY]->(d)
+DETACH DELETE d
+WITH DISTINCT m
+WHERE m IS NOT NULL AND NOT (m)-[:HAS_DAY]->()
+OPTIONAL MATCH (y:Year)-[:HAS_MONTH]->(m)
+DETACH DELETE m
+WITH DISTINCT y
+WHERE y IS NOT NULL AND NOT (y)-[:HAS_MONTH]->()
+DETACH DELETE y
+"""
+
+SAVE_ARCHIVE_QUERY = """
+MERGE (a:MonthlyArchive {month: $month})
+SET a += $aggregate,
+    a.start = datetime($start),
+    a.end = datetime($end),
+    a.archived_at = datetime()
+"""
+
+ARCHIVE_STATUS_QUERY = """
+MATCH (a:MonthlyArchive)
+RETURN a.month AS month, a.total AS total, a.file AS file, a.archived_at AS archived_at
+ORDER BY a.month
+"""
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def next_month(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def iso(moment: datetime) -> str:
+    return moment.isoformat().replace('+00:00', 'Z')
+
+
+def to_json_value(value: Any) -> Any:
+    """JSON-safe form of a node property (temporal values become ISO strings)"""
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+    return value
+
+
+class MonthlyAggregate:
+    def __init__(self):
+        """Counts for one archived month, in the shape stored on MonthlyArchive"""
+        self.total = 0
+        self.positive = 0
+        self.negative = 0
+        self.rating_sum = 0
+        self.rating_count = 0
+        self.days: Dict[str, List[int]] = {}          # day -> [positive, negative]
+        self.categories: Dict[str, List[int]] = {}    # category -> [positive, negative]
+        self.intents: Dict[str, List[float]] = {}     # intent -> [positive, negative, conf sum, conf count]
+
+    def add(self, feedback: Dict[str, Any]):
+        feedback_type = feedback.get('feedback_type')
+        column = 0 if feedback_type == 'positive' else 1 if feedback_type == 'negative' else None
+        self.total += 1
+        if column == 0:
+            self.positive += 1
+        elif column == 1:
+            self.negative += 1
+        if feedback.get('rating_stars') is not None:
+            self.rating_sum += feedback['rating_stars']
+            self.rating_count += 1
+        if column is None:
+            return
+        # UTC day, as on the time tree's Day nodes and in the trends query
+        day = utc_day(feedback['timestamp']) if feedback.get('timestamp') else None
+        if day:
+            self.days.setdefault(day, [0, 0])[column] += 1
+        for category in feedback.get('categories') or []:
+            self.categories.setdefault(category, [0, 0])[column] += 1
+        intent = feedback.get('detected_intent')
+        if intent:
+            entry = self.intents.setdefault(intent, [0, 0, 0.0, 0])
+            entry[column] += 1
+            if feedback.get('confidence_score') is not None:
+                entry[2] += feedback['confidence_score']
+                entry[3] += 1
+
+    def properties(self) -> Dict[str, Any]:
+        days = sorted(self.days)
+        categories = sorted(self.categories)
+        intents = sorted(self.intents)
+        return {
+            'total': self.total,
+            'positive': self.positive,
+            'negative': self.negative,
+            'rating_sum': self.rating_sum,
+            'rating_count': self.rating_count,
+            'days': days,
+            'days_positive': [self.days[day][0] for day in days],
+            'days_negative': [self.days[day][1] for day in days],
+            'categories': categories,
+            'categories_positive': [self.categories[c][0] for c in categories],
+            'categories_negative': [self.categories[c][1] for c in categories],
+            'intents': intents,
+            'intents_positive': [int(self.intents[i][0]) for i in intents],
+            'intents_negative': [int(self.intents[i][1]) for i in intents],
+            'intents_confidence_sum': [float(self.intents[i][2]) for i in intents],
+            'intents_confidence_count': [int(self.intents[i][3]) for i in intents],
+        }
+
+
+class RetentionJob:
+    def __init__(self, service, retention_days: int = 365, archive_dir: str = 'archives',
+                 batch_size: int = 1000, chunk_size: Optional[int] = None, throttle: float = 0.5):
+        """
+        Archive and delete Feedback older than the retention age
+
+        Args:
+            service: Neo4jService whose sessions are used
+            retention_days: Age after which a month (once fully past it) is archived
+            archive_dir: Directory for feedback-YYYY-MM.jsonl.gz files
+            batch_size: Rows per inner delete transaction
+            chunk_size: Rows per outer delete statement
+            throttle: Seconds to pause between delete chunks
+        """
+        self.service = service
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size or batch_size * 10
+        self.throttle = throttle
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the month containing now - retention_days; everything before it is archived"""
+        now = now or datetime.now(timezone.utc)
+        return month_start(now - timedelta(days=self.retention_days))
+
+    @property
+    def time_tree(self) -> bool:
+        return getattr(self.service, 'time_tree', False)
+
+    def month_filter(self) -> str:
+        return DAY_MONTH_FILTER if self.time_tree else MONTH_FILTER
+
+    def oldest(self, cutoff: datetime) -> Optional[datetime]:
+        """Earliest live Feedback before the cutoff (the start of its UTC day when read from the time tree)"""
+        with self.service._session() as session:
+            query = OLDEST_DAY_QUERY if self.time_tree else OLDEST_QUERY
+            record = session.run(query, cutoff=iso(cutoff)).single()
+        oldest = record['oldest'] if record else None
+        if oldest is None:
+            return None
+        if self.time_tree:
+            day = oldest.to_native()
+            return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        return oldest.to_native().astimezone(timezone.utc)
+
+    def pending_months(self, cutoff: datetime) -> List[Tuple[datetime, datetime]]:
+        """(start, end) of each month before the cutoff, from the oldest live Feedback"""
+        oldest = self.oldest(cutoff)
+        if oldest is None:
+            return []
+        start = month_start(oldest)
+        months = []
+        while start < cutoff:
+            end = next_month(start)
+            months.append((start, end))
+            start = end
+        return months
+
+    def run(self, now: Optional[datetime] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Archive and delete every pending month; stops at the first failure"""
+        cutoff = self.cutoff(now)
+        months = self.pending_months(cutoff)
+        report: Dict[str, Any] = {'cutoff': iso(cutoff), 'months': []}
+        logger.info(f"🗄️ Retention: {len(months)} month(s) before {iso(cutoff)} to archive")
+        for start, end in months:
+            report['months'].append(self.archive_month(start, end, dry_run=dry_run))
+        return report
+
+    def archive_path(self, start: datetime) -> str:
+        return os.path.join(self.archive_dir, f"feedback-{start:%Y-%m}.jsonl.gz")
+
+    def archive_month(self, start: datetime, end: datetime, dry_run: bool = False) -> Dict[str, Any]:
+        month = f"{start:%Y-%m}"
+        started = time.perf_counter()
+        snapshot = iso(datetime.now(timezone.utc))
+        params = {'start': iso(start), 'end': iso(end), 'snapshot': snapshot}
+
+        if dry_run:
+            with self.service._session() as session:
+                pending = sum(1 for _ in session.run(self.month_filter() + EXPORT_SUFFIX, params))
+            return {'month': month, 'pending': pending, 'dry_run': True}
+
+        path = self.archive_path(start)
+        aggregate, exported = self._export(path, params)
+        if aggregate.total == 0:
+            return {'month': month, 'exported': 0, 'deleted': 0}
+
+        properties = aggregate.properties()
+        properties['file'] = os.path.basename(path)
+        with self.service._session() as session:
+            session.run(SAVE_ARCHIVE_QUERY, month=month, aggregate=properties,
+                        start=params['start'], end=params['end']).consume()
+        deleted = self._delete(params)
+        elapsed = round(time.perf_counter() - started, 2)
+        logger.info(f"✅ Archived {month}: {exported} new node(s), {aggregate.total} in archive, "
+                    f"{deleted} deleted in {elapsed}s")
+        return {'month': month, 'exported': exported, 'archived_total': aggregate.total,
+                'deleted': deleted, 'file': path, 'seconds': elapsed}
+
+    def _existing_lines(self, path: str) -> Iterator[str]:
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield line
+
+    def _export(self, path: str, params: Dict[str, str]) -> Tuple[MonthlyAggregate, int]:
+        """Rewrite the month's archive file with earlier and current nodes; returns its aggregate"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        aggregate = MonthlyAggregate()
+        seen = set()
+        exported = 0
+        partial = path + '.partial'
+        with gzip.open(partial, 'wt', encoding='utf-8') as out:
+            for line in self._existing_lines(path):
+                entry = json.loads(line)
+                seen.add((entry['id'], entry['feedback'].get('created_at')))
+                aggregate.add(entry['feedback'])
+                out.write(line if line.endswith('\n') else line + '\n')
+            with self.service._session() as session:
+                for record in session.run(self.month_filter() + EXPORT_SUFFIX, params):
+                    feedback = {key: to_json_value(value) for key, value in dict(record['feedback']).items()}
+                    key = (record['id'], feedback.get('created_at'))
+                    if key in seen:
+                        continue  # exported by an earlier, interrupted run
+                    seen.add(key)
+                    aggregate.add(feedback)
+                    out.write(json.dumps({'id': record['id'], 'feedback': feedback}, separators=(',', ':')) + '\n')
+                    exported += 1
+        if aggregate.total:
+            os.replace(partial, path)
+        else:
+            os.remove(partial)
+        return aggregate, exported
+
+    def _delete(self, params: Dict[str, str]) -> int:
+        """Delete the month's exported nodes chunk by chunk, pausing between chunks, then its empty days"""
+        # CALL { ... } IN TRANSACTIONS only accepts a literal batch size
+        query = (f"{self.month_filter()}WITH f LIMIT $chunk_size\n"
+                 f"CALL {{ WITH f {DELETE_FEEDBACK} }} IN TRANSACTIONS OF {int(self.batch_size)} ROWS\n"
+                 f"RETURN count(*) AS deleted")
+        deleted = 0
+        while True:
+            with self.service._session() as session:
+                count = session.run(query, params, chunk_size=self.chunk_size).single()['deleted']
+            deleted += count
+            if count < self.chunk_size:
+                with self.service._session() as session:
+                    session.run(PRUNE_DAYS_QUERY, start=params['start'], end=params['end']).consume()
+                return deleted
+            logger.info(f"   Deleted {deleted} archived node(s) so far")
+            time.sleep(self.throttle)
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self.service._session() as session:
+            return [
+                {'month': record['month'], 'total': record['total'], 'file': record['file'],
+                 'archived_at': to_json_value(record['archived_at'])}
+                for record in session.run(ARCHIVE_STATUS_QUERY)
+            ]
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from neo4j_service import Neo4jService
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Archive and delete old Feedback nodes")
+    parser.add_argument("--status", action="store_true", help="List archived months")
+    parser.add_argument("--run", action="store_true", help="Archive and delete months past the retention age")
+    parser.add_argument("--dry-run", action="store_true", help="With --run, only count what would be archived")
+    parser.add_argument("--days", type=int, default=int(os.getenv('RETENTION_DAYS', 365)),
+                        help="Retention age in days")
+    parser.add_argument("--archive-dir", default=os.getenv('RETENTION_ARCHIVE_DIR', 'archives'))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv('RETENTION_BATCH_SIZE', 1000)),
+                        help="Rows per delete transaction")
+    parser.add_argument("--throttle", type=float, default=float(os.getenv('RETENTION_THROTTLE', 0.5)),
+                        help="Seconds between delete chunks")
+    args = parser.parse_args()
+
+    service = Neo4jService(
+        os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
+        os.getenv('NEO4J_USERNAME', 'neo4j'),
+        os.getenv('NEO4J_PASSWORD', 'password'),
+        os.getenv('NEO4J_DATABASE', 'neo4j'),
+        lazy=True,
+        time_tree=os.getenv('TIME_TREE_ENABLED', 'false').lower() == 'true'
+    )
+    try:
+        job = RetentionJob(service, args.days, args.archive_dir, batch_size=args.batch_size,
+                           throttle=args.throttle)
+        if args.run:
+            print(json.dumps(job.run(dry_run=args.dry_run), indent=2))
+        print(json.dumps(job.status(), indent=2))
+    finally:
+        service.close()
@@ -0,0 +1,140 @@
+"""
+Full-text search helpers: terms, highlight snippets, cursors and an inverted index
+
+Neo4j answers searches from its Lucene full-text index (feedback_text_idx)
+and SQLite from an FTS5 table (feedback_fts). SQLite builds without FTS5 use
+InvertedIndex, a size-bounded in-memory index. All of them cover the same
+three fields with the same matching rules: a query is split into lower-case
+word terms and a document must contain every term.
+Results are ranked by score, ties broken by id, and paged with an opaque
+cursor holding the (score, id) of the last result.
+"""
+
+import base64
+import json
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+SEARCH_FIELDS = ('user_comment', 'user_query', 'bot_response')
+MAX_TERMS = 10
+SNIPPET_CONTEXT = 60
+
+_WORD = re.compile(r'\w+')
+
+
+def terms(text: str) -> List[str]:
+    """Distinct lower-case word terms of a search string, in order"""
+    seen: List[str] = []
+    for term in _WORD.findall(text.lower()):
+        if term not in seen:
+            seen.append(term)
+    return seen[:MAX_TERMS]
+
+
+def lucene_query(search_terms: List[str]) -> str:
+    """Lucene query requiring every term; word terms need no escaping and lower case is never an operator"""
+    return ' AND '.join(search_terms)
+
+
+def highlight(text: Optional[str], search_terms: List[str], context: int = SNIPPET_CONTEXT) -> Optional[str]:
+    """Snippet around the first matching term with every match wrapped in <mark>, or None without a match"""
+    if not text or not search_terms:
+        return None
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(term) for term in search_terms) + r')\b', re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return None
+    start = max(0, first.start() - context)
+    end = min(len(text), first.end() + context)
+    snippet = pattern.sub(r'<mark>\1</mark>', text[start:end])
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+
+def highlights(document: Dict[str, Any], search_terms: List[str]) -> Dict[str, str]:
+    snippets = {field: highlight(document.get(field), search_terms) for field in SEARCH_FIELDS}
+    return {field: snippet for field, snippet in snippets.items() if snippet}
+
+
+def encode_cursor(score: float, doc_id: Any) -> str:
+    raw = json.dumps([score, doc_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[float, Any]:
+    """(score, id) of the last result on the previous page"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        score, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return float(score), doc_id
+    except Exception as e:
+        raise ValueError(f"Malformed cursor: {e}")
+
+
+def page(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """Search response from up to limit + 1 ranked rows; the extra row only signals a next page"""
+    results = rows[:limit]
+    next_cursor = encode_cursor(results[-1]['score'], results[-1]['id']) if len(rows) > limit else None
+    return {'results': results, 'next_cursor': next_cursor}
+
+
+class InvertedIndex:
+    def __init__(self, max_documents: Optional[int] = None):
+        """
+        In-memory term -> {document id: term frequency} postings over SEARCH_FIELDS
+
+        Args:
+            max_documents: Documents kept; adding past it drops the earliest added (None: unbounded)
+        """
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._lengths: Dict[Any, int] = {}  # in the order documents were added
+        self._terms: Dict[Any, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: Any, document: Dict[str, Any]):
+        tokens = [term for field in SEARCH_FIELDS for term in _WORD.findall((document.get(field) or '').lower())]
+        counts: Dict[str, int] = {}
+        for term in tokens:
+            counts[term] = counts.get(term, 0) + 1
+        with self._lock:
+            if doc_id in self._lengths:
+                self._remove(doc_id)
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            self._lengths[doc_id] = len(tokens)
+            self._terms[doc_id] = list(counts)
+            while self.max_documents and len(self._lengths) > self.max_documents:
+                self._remove(next(iter(self._lengths)))
+
+    def _remove(self, doc_id: Any):
+        for term in self._terms.pop(doc_id):
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+        del self._lengths[doc_id]
+
+    def search(self, search_terms: List[str]) -> List[Tuple[float, Any]]:
+        """(score, id) of documents containing every term, best first (TF-IDF with length normalisation)"""
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in search_terms]
+            if not postings or not all(postings):
+                return []
+            postings.sort(key=len)
+            matches: Set[Any] = set(postings[0])
+            for posting in postings[1:]:
+                matches.intersection_update(posting)
+            total = len(self._lengths)
+            idf = [math.log(1 + total / len(posting)) for posting in postings]
+            scored = [
+                (round(sum(math.sqrt(posting[doc_id]) * weight for posting, weight in zip(postings, idf))
+                       / math.sqrt(self._lengths[doc_id] or 1), 6), doc_id)
+                for doc_id in matches
+            ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored
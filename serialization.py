@@ -0,0 +1,129 @@
+"""
+Response format negotiation: JSON, MessagePack and CBOR
+
+Query results keep native temporal values (neo4j.time Date/DateTime or Python
+date/datetime). JSON renders them as ISO 8601 strings; the binary formats
+encode them compactly as integer milliseconds since the Unix epoch (UTC, and
+midnight UTC for dates).
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Optional, Tuple
+
+from flask.json.provider import DefaultJSONProvider
+from neo4j.time import Date as Neo4jDate, DateTime as Neo4jDateTime
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional dependency
+    cbor2 = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+CBOR = 'application/cbor'
+
+# Accepted spellings of each media type
+MEDIA_TYPE_ALIASES = {
+    'application/json': JSON,
+    'application/msgpack': MSGPACK,
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.msgpack': MSGPACK,
+    'application/cbor': CBOR,
+}
+
+
+class UnsupportedFormatError(ValueError):
+    """A request body arrived in a format this process cannot decode"""
+
+
+class FeedbackJSONProvider(DefaultJSONProvider):
+    """JSON provider that renders neo4j and Python temporals as ISO 8601 strings"""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, (Neo4jDate, Neo4jDateTime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+def available_formats() -> Tuple[str, ...]:
+    formats = [JSON]
+    if msgpack:
+        formats.append(MSGPACK)
+    if cbor2:
+        formats.append(CBOR)
+    return tuple(formats)
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Best available response media type for an Accept header; JSON by default"""
+    if not accept:
+        return JSON
+    best, best_quality = JSON, 0.0
+    available = available_formats()
+    for part in accept.split(','):
+        media_type, _, params = part.strip().partition(';')
+        media_type = MEDIA_TYPE_ALIASES.get(media_type.strip().lower())
+        if media_type not in available:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def to_epoch_millis(value: Any) -> int:
+    """Milliseconds since the Unix epoch for a date or datetime (naive values are UTC)"""
+    if isinstance(value, (Neo4jDate, Neo4jDateTime)):
+        value = value.to_native()
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def compact_temporals(obj: Any) -> Any:
+    """Copy of `obj` with every temporal value replaced by epoch milliseconds"""
+    if isinstance(obj, dict):
+        return {key: compact_temporals(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [compact_temporals(value) for value in obj]
+    if isinstance(obj, (Neo4jDate, Neo4jDateTime, date)):
+        return to_epoch_millis(obj)
+    return obj
+
+
+def encode(obj: Any, media_type: str) -> bytes:
+    """Encode a response payload in a binary media type"""
+    if media_type == MSGPACK:
+        return msgpack.packb(compact_temporals(obj), use_bin_type=True)
+    if media_type == CBOR:
+        return cbor2.dumps(compact_temporals(obj))
+    raise UnsupportedFormatError(f"Cannot encode {media_type}")
+
+
+def decode(body: bytes, content_type: Optional[str]) -> Any:
+    """Decode a MessagePack or CBOR request body"""
+    media_type = MEDIA_TYPE_ALIASES.get((content_type or '').split(';')[0].strip().lower())
+    if media_type == MSGPACK and msgpack:
+        return msgpack.unpackb(body, raw=False)
+    if media_type == CBOR and cbor2:
+        return cbor2.loads(body)
+    raise UnsupportedFormatError(f"Unsupported request content type: {content_type}")
+
+
+def is_binary_content_type(content_type: Optional[str]) -> bool:
+    media_type = MEDIA_TYPE_ALIASES.get((content_type or '').split(';')[0].strip().lower())
+    return media_type in (MSGPACK, CBOR)
@@ -0,0 +1,103 @@
+"""
+Single-flight coalescing of identical concurrent calls
+
+While a call for a key is in flight, further callers with the same key do not
+start their own: they wait for the first caller (the leader) and receive its
+result, or its exception. Nothing is cached, so a call that starts after the
+previous one finished goes to the database again. A dashboard refresh storm
+of N identical analytics requests becomes one query.
+"""
+
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from resilience import DatabaseUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightTimeout(DatabaseUnavailableError):
+    """A coalesced caller stopped waiting for the in-flight call it joined"""
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True, timeout: Optional[float] = None):
+        """
+        Share one in-flight call between concurrent callers of the same key
+
+        Args:
+            enabled: With False every caller runs its own call
+            timeout: Seconds a waiter waits for the leader; None defers to the
+                per-call timeout passed to do(), or waits for as long as the leader runs
+        """
+        self.enabled = enabled
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, call: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Result of call(), shared with every concurrent caller of the same key
+
+        Raises:
+            SingleFlightTimeout: this caller waited longer than the timeout for the leader
+            Exception: whatever the leader's call raised, re-raised in every waiter
+        """
+        if not self.enabled:
+            return call()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+
+        if leader:
+            try:
+                flight.result = call()
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+
+        wait = self.timeout if self.timeout is not None else timeout
+        if not flight.done.wait(wait):
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"⏳ Stopped waiting after {wait:.2f}s for in-flight call {key!r}")
+            raise SingleFlightTimeout(f"Timed out after {wait:.2f}s waiting for an identical in-flight call")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'in_flight': len(self._flights),
+                'waiting': sum(flight.waiters for flight in self._flights.values()),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts
+            }
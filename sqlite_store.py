@@ -0,0 +1,663 @@
+"""
+Embedded SQLite feedback store
+
+For single-node deployments and CI without a Neo4j server. The database runs
+in WAL mode with synchronous=NORMAL, so readers never block the writer and a
+commit is an append to the log rather than an fsync of the main file. Every
+analytics query is answered from a covering index. Timestamps are stored as
+UTC ISO 8601 text, which sorts chronologically.
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Optional, Any
+
+from storage import FeedbackStore
+from hyperloglog import HyperLogLog, add_feedback, summarize_days
+from search import InvertedIndex, highlights, decode_cursor, page
+from resilience import DatabaseUnavailableError
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def build_day_sketches(conn: sqlite3.Connection):
+    """Fill day_sketch from existing feedback (UTC days)"""
+    days: Dict[str, tuple] = {}
+    for day, user_id, user_query in conn.execute("SELECT substr(timestamp, 1, 10), user_id, user_query FROM feedback"):
+        users, queries = days.setdefault(day, (HyperLogLog(), HyperLogLog()))
+        add_feedback(users, queries, user_id, user_query)
+    conn.executemany("INSERT OR REPLACE INTO day_sketch VALUES (?, ?, ?)",
+                     [(day, users.to_bytes(), queries.to_bytes()) for day, (users, queries) in days.items()])
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Whether this SQLite build includes the FTS5 full-text module"""
+    return conn.execute(
+        "SELECT 1 FROM pragma_compile_options WHERE compile_options = 'ENABLE_FTS5'"
+    ).fetchone() is not None
+
+
+def build_search_index(conn: sqlite3.Connection):
+    """Create and fill feedback_fts; skipped on builds without FTS5, which search an in-memory index"""
+    if not fts5_available(conn):
+        return
+    # External content, so the text is not stored twice; unicode61 with '_' as a token
+    # character splits words like search.terms() does
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+            user_comment, user_query, bot_response,
+            content='feedback', content_rowid='id',
+            tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+        )
+        """
+    )
+    conn.execute("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')")
+
+
+# Schema versions tracked with PRAGMA user_version; a step is SQL or a callable taking the connection
+SCHEMA = {
+    1: [
+        """
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY,
+            user_query TEXT NOT NULL,
+            bot_response TEXT NOT NULL,
+            feedback_type TEXT NOT NULL,
+            user_comment TEXT NOT NULL DEFAULT '',
+            rating_stars INTEGER NOT NULL,
+            message_id TEXT,
+            user_id TEXT,
+            detected_intent TEXT,
+            confidence_score REAL,
+            timestamp TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS feedback_category (
+            feedback_id INTEGER NOT NULL REFERENCES feedback(id) ON DELETE CASCADE,
+            category TEXT NOT NULL,
+            feedback_type TEXT NOT NULL
+        )
+        """,
+        # Covering indexes: each analytics query reads only its index
+        "CREATE INDEX IF NOT EXISTS idx_feedback_type ON feedback(feedback_type)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_timestamp_type ON feedback(timestamp, feedback_type)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_user ON feedback(user_id, feedback_type, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_intent ON feedback(detected_intent, feedback_type, confidence_score)",
+        "CREATE INDEX IF NOT EXISTS idx_category_type ON feedback_category(category, feedback_type)",
+        "CREATE INDEX IF NOT EXISTS idx_category_feedback ON feedback_category(feedback_id)",
+    ],
+    # Per-user counters kept on write, so engagement reads the top rows of one index
+    2: [
+        """
+        CREATE TABLE IF NOT EXISTS user_engagement (
+            user_id TEXT PRIMARY KEY,
+            total_feedback INTEGER NOT NULL,
+            positive_feedback INTEGER NOT NULL,
+            first_feedback TEXT NOT NULL,
+            last_feedback TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_user_engagement_total ON user_engagement(total_feedback)",
+        """
+        INSERT OR REPLACE INTO user_engagement
+        SELECT user_id, count(*), sum(feedback_type = 'positive'), min(timestamp), max(timestamp)
+        FROM feedback
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        """,
+    ],
+    # HyperLogLog sketches of users and questions per UTC day
+    3: [
+        """
+        CREATE TABLE IF NOT EXISTS day_sketch (
+            date TEXT PRIMARY KEY,
+            users BLOB NOT NULL,
+            queries BLOB NOT NULL
+        )
+        """,
+        build_day_sketches,
+    ],
+    # Running totals per intent kept on write; intent performance reads one row per intent
+    4: [
+        """
+        CREATE TABLE IF NOT EXISTS intent_stats (
+            intent TEXT PRIMARY KEY,
+            total_feedback INTEGER NOT NULL,
+            positive_count INTEGER NOT NULL,
+            negative_count INTEGER NOT NULL,
+            confidence_sum REAL NOT NULL,
+            confidence_count INTEGER NOT NULL
+        )
+        """,
+        """
+        INSERT OR REPLACE INTO intent_stats
+        SELECT detected_intent, count(*), sum(feedback_type = 'positive'), sum(feedback_type = 'negative'),
+               coalesce(sum(confidence_score), 0.0), count(confidence_score)
+        FROM feedback
+        WHERE detected_intent IS NOT NULL AND detected_intent <> ''
+        GROUP BY detected_intent
+        """,
+    ],
+    # FTS5 index over the searchable text
+    5: [
+        build_search_index,
+    ],
+}
+LATEST_VERSION = max(SCHEMA)
+
+SEARCH_COLUMNS = ('id', 'user_query', 'bot_response', 'user_comment', 'feedback_type', 'rating_stars', 'timestamp')
+
+
+def to_utc_text(timestamp: str) -> str:
+    """Stored form of an ISO 8601 timestamp; naive values are taken as UTC"""
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+
+def from_utc_text(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class SQLiteFeedbackStore(FeedbackStore):
+    def __init__(self, path: str = 'feedback.db', busy_timeout: float = 5.0,
+                 search_index_size: Optional[int] = 100000):
+        """
+        SQLite-backed feedback store
+
+        Args:
+            path: Database file; ':memory:' gives a database shared by this process's threads
+            busy_timeout: Seconds a connection waits for a lock before failing
+            search_index_size: Newest feedback kept in the in-memory search index used when
+                SQLite lacks FTS5 (None: all of it)
+        """
+        self.path = path
+        self.database = path
+        self.busy_timeout = busy_timeout
+        self._uri = path == ':memory:'
+        if self._uri:
+            self.path = f"file:feedback-{id(self)}?mode=memory&cache=shared"
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # SQLite has a single writer; queueing here avoids busy-wait retries
+        self._write_lock = threading.Lock()
+        self.startup_stats: Dict[str, Any] = {}
+        # Search uses feedback_fts when SQLite has FTS5, otherwise this index (see bootstrap)
+        self._fts = False
+        self._search_index = InvertedIndex(max_documents=search_index_size)
+        self._search_indexed_through = 0
+        self._search_lock = threading.Lock()
+        # Keeps a shared in-memory database alive for the store's lifetime
+        self._keepalive = self._connection() if self._uri else None
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened and configured on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, uri=self._uri,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _run(self, operation: str, work, *args, write: bool = False) -> Any:
+        """Run `work(conn, *args)` in a transaction; lock timeouts become DatabaseUnavailableError"""
+        conn = self._connection()
+        try:
+            if write:
+                with self._write_lock:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        result = work(conn, *args)
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                    conn.execute("COMMIT")
+                    return result
+            return work(conn, *args)
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                raise DatabaseUnavailableError(f"{operation}: database is locked", retry_after=1.0) from e
+            raise
+
+    def bootstrap(self, warm_connections: int = 0) -> Dict[str, Any]:
+        """Create or upgrade the schema"""
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {'migrations_applied': self._run('migrate', self._migrate, write=True)}
+        self._fts = self._run('search_index', self._prepare_search_index, write=True)
+        stats['search'] = 'fts5' if self._fts else 'inverted_index'
+        if not self._fts:
+            logger.warning(f"⚠️ SQLite was built without FTS5; search uses an in-memory index of the newest "
+                           f"{self._search_index.max_documents or 'all'} feedback")
+        stats['total_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        self.startup_stats = stats
+        logger.info(f"SQLite bootstrap finished in {stats['total_ms']}ms: {stats}")
+        return stats
+
+    def _migrate(self, conn: sqlite3.Connection) -> List[int]:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        applied = []
+        for version in sorted(SCHEMA):
+            if version <= current:
+                continue
+            for statement in SCHEMA[version]:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            applied.append(version)
+        if applied:
+            conn.execute(f"PRAGMA user_version = {LATEST_VERSION}")
+        return applied
+
+    def _prepare_search_index(self, conn: sqlite3.Connection) -> bool:
+        """Whether feedback_fts is usable, creating it for databases upgraded on a build without FTS5"""
+        if not fts5_available(conn):
+            return False
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'feedback_fts'").fetchone() is None:
+            build_search_index(conn)
+        return True
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def store_feedback(self, feedback_data: Dict[str, Any]) -> bool:
+        """Store one feedback record"""
+        return self.store_feedback_many([feedback_data]) == 1
+
+    def store_feedback_many(self, records: List[Dict[str, Any]]) -> int:
+        """Store records in one transaction with two bulk executemany inserts"""
+        if not records:
+            return 0
+        return self._run('store_feedback', self._insert_feedback, records, write=True)
+
+    def _insert_feedback(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> int:
+        # Ids are assigned here, under the write lock, so categories can be
+        # inserted in bulk without a round trip per row for lastrowid
+        next_id = conn.execute("SELECT coalesce(max(id), 0) + 1 FROM feedback").fetchone()[0]
+        created_at = datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+        rows, category_rows = [], []
+        for offset, record in enumerate(records):
+            feedback_id = next_id + offset
+            rows.append((
+                feedback_id,
+                record['user_query'],
+                record['bot_response'],
+                record['feedback_type'],
+                record.get('user_comment', ''),
+                record.get('rating_stars', 0),
+                record.get('message_id') or None,
+                record.get('user_id') or None,
+                record.get('detected_intent') or None,
+                record.get('confidence_score'),
+                to_utc_text(record['timestamp']),
+                created_at
+            ))
+            for category in set(record.get('categories') or []):
+                category_rows.append((feedback_id, category, record['feedback_type']))
+
+        conn.executemany(
+            """
+            INSERT INTO feedback (id, user_query, bot_response, feedback_type, user_comment,
+                                  rating_stars, message_id, user_id, detected_intent,
+                                  confidence_score, timestamp, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows
+        )
+        if category_rows:
+            conn.executemany(
+                "INSERT INTO feedback_category (feedback_id, category, feedback_type) VALUES (?, ?, ?)",
+                category_rows
+            )
+        conn.executemany(
+            """
+            INSERT INTO user_engagement VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                total_feedback = total_feedback + 1,
+                positive_feedback = positive_feedback + excluded.positive_feedback,
+                first_feedback = min(first_feedback, excluded.first_feedback),
+                last_feedback = max(last_feedback, excluded.last_feedback)
+            """,
+            [(row[7], int(row[3] == 'positive'), row[10], row[10]) for row in rows if row[7]]
+        )
+        conn.executemany(
+            """
+            INSERT INTO intent_stats VALUES (?, 1, ?, ?, coalesce(?, 0.0), ? IS NOT NULL)
+            ON CONFLICT(intent) DO UPDATE SET
+                total_feedback = total_feedback + 1,
+                positive_count = positive_count + excluded.positive_count,
+                negative_count = negative_count + excluded.negative_count,
+                confidence_sum = confidence_sum + excluded.confidence_sum,
+                confidence_count = confidence_count + excluded.confidence_count
+            """,
+            [(row[8], int(row[3] == 'positive'), int(row[3] == 'negative'), row[9], row[9])
+             for row in rows if row[8]]
+        )
+        if self._fts:
+            conn.executemany(
+                "INSERT INTO feedback_fts (rowid, user_comment, user_query, bot_response) VALUES (?, ?, ?, ?)",
+                [(row[0], row[4], row[1], row[2]) for row in rows]
+            )
+        self._add_to_day_sketches(conn, rows)
+        return len(rows)
+
+    def _add_to_day_sketches(self, conn: sqlite3.Connection, rows: List[tuple]):
+        """Count inserted rows in their day's sketches; only days whose registers rose are rewritten"""
+        by_day: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_day.setdefault(row[10][:10], []).append(row)
+        changed = []
+        for day, day_rows in by_day.items():
+            stored = conn.execute("SELECT users, queries FROM day_sketch WHERE date = ?", (day,)).fetchone()
+            users, queries = (HyperLogLog(stored[0]), HyperLogLog(stored[1])) if stored else \
+                (HyperLogLog(), HyperLogLog())
+            rose = False
+            for row in day_rows:
+                rose = add_feedback(users, queries, row[7], row[1]) or rose
+            if rose:
+                changed.append((day, users.to_bytes(), queries.to_bytes()))
+        if changed:
+            conn.executemany("INSERT OR REPLACE INTO day_sketch VALUES (?, ?, ?)", changed)
+
+    def count_feedback(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM feedback").fetchone()[0]
+
+    def get_overall_analytics(self, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Get overall feedback analytics"""
+        try:
+            row = self._run('get_overall_analytics', lambda conn: conn.execute(
+                """
+                SELECT count(*),
+                       coalesce(sum(feedback_type = 'positive'), 0),
+                       coalesce(sum(feedback_type = 'negative'), 0)
+                FROM feedback
+                """
+            ).fetchone())
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting overall analytics: {e}")
+            return {}
+        total, positive, negative = row
+        return {
+            'total_feedback': total,
+            'positive_count': positive,
+            'negative_count': negative,
+            'satisfaction_rate': round(positive * 100.0 / total, 2) if total else 0
+        }
+
+    def get_intent_performance(self, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get intent performance analytics"""
+        try:
+            rows = self._run('get_intent_performance', lambda conn: conn.execute(
+                """
+                SELECT intent,
+                       total_feedback,
+                       positive_count,
+                       negative_count,
+                       round(positive_count * 100.0 / total_feedback, 2) AS satisfaction_rate,
+                       round(confidence_sum / nullif(confidence_count, 0), 3)
+                FROM intent_stats
+                WHERE total_feedback > 0
+                ORDER BY satisfaction_rate ASC, total_feedback DESC
+                """
+            ).fetchall())
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting intent performance: {e}")
+            return []
+        return [
+            {
+                'intent_name': intent,
+                'total_feedback': total,
+                'positive_count': positive,
+                'negative_count': negative,
+                'satisfaction_rate': rate,
+                'avg_confidence': confidence
+            }
+            for intent, total, positive, negative, rate, confidence in rows
+        ]
+
+    def get_feedback_trends(self, days: int = 30, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get feedback trends over time"""
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+        try:
+            rows = self._run('get_feedback_trends', lambda conn: conn.execute(
+                """
+                SELECT substr(timestamp, 1, 10) AS feedback_date, feedback_type, count(*)
+                FROM feedback
+                WHERE timestamp >= ?
+                GROUP BY feedback_date, feedback_type
+                ORDER BY feedback_date DESC, feedback_type
+                """,
+                (cutoff,)
+            ).fetchall())
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting feedback trends: {e}")
+            return []
+        return [
+            {
+                'feedback_date': date.fromisoformat(feedback_date),
+                'feedback_type': feedback_type,
+                'count': count
+            }
+            for feedback_date, feedback_type, count in rows
+        ]
+
+    def get_user_engagement(self, limit: int = 20, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get user engagement metrics"""
+        try:
+            rows = self._run('get_user_engagement', lambda conn: conn.execute(
+                """
+                SELECT user_id, total_feedback, positive_feedback, first_feedback, last_feedback
+                FROM user_engagement
+                ORDER BY total_feedback DESC
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall())
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting user engagement: {e}")
+            return []
+        return [
+            {
+                'user_id': user_id,
+                'total_feedback': total,
+                'positive_feedback': positive,
+                'first_feedback': from_utc_text(first),
+                'last_feedback': from_utc_text(last)
+            }
+            for user_id, total, positive, first, last in rows
+        ]
+
+    def get_distinct_counts(self, start: str, end: str, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Approximate unique users and questions per day and over start..end (ISO dates, inclusive)"""
+        try:
+            rows = self._run('get_distinct_counts', lambda conn: conn.execute(
+                "SELECT date, users, queries FROM day_sketch WHERE date BETWEEN ? AND ? ORDER BY date",
+                (start, end)
+            ).fetchall())
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting distinct counts: {e}")
+            return {}
+        summary = summarize_days((date.fromisoformat(day), users, queries) for day, users, queries in rows)
+        return {'start': start, 'end': end, **summary}
+
+    def search_feedback(self, search_terms: List[str], feedback_type: Optional[str] = None,
+                        min_rating: Optional[int] = None, max_rating: Optional[int] = None,
+                        start: Optional[str] = None, end: Optional[str] = None, limit: int = 20,
+                        cursor: Optional[str] = None, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Feedback containing every term, best match first, from feedback_fts or the in-memory index"""
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            if self._fts:
+                rows = self._run('search_feedback', self._fts_rows, search_terms, feedback_type, min_rating,
+                                 max_rating, start, end, after, limit + 1)
+            else:
+                self._run('search_feedback', self._index_new_feedback)
+                ranked = self._search_index.search(list(search_terms))
+                if after is not None:
+                    ranked = [(score, doc_id) for score, doc_id in ranked
+                              if score < after[0] or (score == after[0] and doc_id > after[1])]
+                rows = self._run('search_feedback', self._ranked_rows, ranked, feedback_type, min_rating,
+                                 max_rating, start, end, limit + 1)
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error searching feedback: {e}")
+            return {'results': [], 'next_cursor': None}
+        for row in rows:
+            row['highlights'] = highlights(row, list(search_terms))
+        return page(rows, limit)
+
+    def _index_new_feedback(self, conn: sqlite3.Connection):
+        """Add feedback stored since the last search; only the newest search_index_size rows are read"""
+        with self._search_lock:
+            rows = conn.execute(
+                "SELECT id, user_comment, user_query, bot_response FROM feedback WHERE id > ? "
+                "ORDER BY id DESC LIMIT ?",
+                (self._search_indexed_through, self._search_index.max_documents or -1)
+            ).fetchall()
+            for feedback_id, user_comment, user_query, bot_response in reversed(rows):
+                self._search_index.add(feedback_id, {'user_comment': user_comment, 'user_query': user_query,
+                                                     'bot_response': bot_response})
+            if rows:
+                self._search_indexed_through = rows[0][0]
+
+    def _ranked_rows(self, conn: sqlite3.Connection, ranked: List[tuple], feedback_type: Optional[str],
+                     min_rating: Optional[int], max_rating: Optional[int], start: Optional[str],
+                     end: Optional[str], wanted: int) -> List[Dict[str, Any]]:
+        """Filter ranked (score, id) pairs in chunks until `wanted` rows are found"""
+        conditions, arguments = [], []
+        for clause, value in (("feedback_type = ?", feedback_type), ("rating_stars >= ?", min_rating),
+                              ("rating_stars <= ?", max_rating),
+                              ("timestamp >= ?", to_utc_text(start) if start else None),
+                              ("timestamp < ?", to_utc_text(end) if end else None)):
+            if value is not None:
+                conditions.append(clause)
+                arguments.append(value)
+        rows: List[Dict[str, Any]] = []
+        for offset in range(0, len(ranked), 500):
+            chunk = ranked[offset:offset + 500]
+            found = {
+                record[0]: record
+                for record in conn.execute(
+                    f"SELECT {', '.join(SEARCH_COLUMNS)} FROM feedback WHERE id IN ({', '.join('?' * len(chunk))})"
+                    + ''.join(f" AND {condition}" for condition in conditions),
+                    [doc_id for _, doc_id in chunk] + arguments
+                )
+            }
+            for score, doc_id in chunk:
+                if doc_id in found:
+                    row = dict(zip(SEARCH_COLUMNS, found[doc_id]), score=score)
+                    row['timestamp'] = from_utc_text(row['timestamp'])
+                    rows.append(row)
+                    if len(rows) >= wanted:
+                        return rows
+        return rows
+
+    def _fts_rows(self, conn: sqlite3.Connection, search_terms: List[str], feedback_type: Optional[str],
+                     min_rating: Optional[int], max_rating: Optional[int], start: Optional[str],
+                     end: Optional[str], after: Optional[tuple], wanted: int) -> List[Dict[str, Any]]:
+        """Keyset-paged on (score DESC, id ASC); score is the negated bm25 rank, so higher is better"""
+        # Each term is quoted, so FTS5 reads it as a word and never as an operator
+        match = ' '.join(f'"{term}"' for term in search_terms)
+        conditions, arguments = [], [match]
+        for clause, value in (("f.feedback_type = ?", feedback_type), ("f.rating_stars >= ?", min_rating),
+                              ("f.rating_stars <= ?", max_rating),
+                              ("f.timestamp >= ?", to_utc_text(start) if start else None),
+                              ("f.timestamp < ?", to_utc_text(end) if end else None)):
+            if value is not None:
+                conditions.append(clause)
+                arguments.append(value)
+        if after is not None:
+            conditions.append("(m.score < ? OR (m.score = ? AND f.id > ?))")
+            arguments.extend([after[0], after[0], after[1]])
+        rows = []
+        for record in conn.execute(
+            f"""
+            SELECT {', '.join('f.' + column for column in SEARCH_COLUMNS)}, m.score
+            FROM (SELECT rowid AS id, -bm25(feedback_fts) AS score
+                  FROM feedback_fts WHERE feedback_fts MATCH ?) AS m
+            JOIN feedback f ON f.id = m.id
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY m.score DESC, f.id
+            LIMIT {int(wanted)}
+            """,
+            arguments
+        ):
+            row = dict(zip(SEARCH_COLUMNS + ('score',), record))
+            row['timestamp'] = from_utc_text(row['timestamp'])
+            rows.append(row)
+        return rows
+
+    def get_category_insights(self, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get feedback category insights"""
+        try:
+            rows = self._run('get_category_insights', lambda conn: conn.execute(
+                """
+                SELECT category, feedback_type, count(*)
+                FROM feedback_category
+                GROUP BY category, feedback_type
+                ORDER BY category, feedback_type
+                """
+            ).fetchall())
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting category insights: {e}")
+            return []
+        return [
+            {'category': category, 'feedback_type': feedback_type, 'count': count}
+            for category, feedback_type, count in rows
+        ]
+
+    def health_check(self) -> Dict[str, Any]:
+        """Check SQLite store health"""
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return {
+                'status': 'healthy',
+                'database': 'connected',
+                'database_name': self.database,
+                'backend': 'sqlite',
+                'timestamp': datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+            return {
+                'status': 'unhealthy',
+                'database': 'error',
+                'database_name': self.database,
+                'backend': 'sqlite',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
@@ -0,0 +1,82 @@
+"""
+Storage backend interface for feedback
+
+The Flask layer talks to a FeedbackStore. Neo4jService is the graph
+implementation; SQLiteFeedbackStore (sqlite_store.py) is an embedded one for
+single-node deployments and CI where no Neo4j server is available.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Any
+
+
+class FeedbackStore(ABC):
+    """Feedback storage and the analytics served by the API"""
+
+    database: str = ''
+
+    def bootstrap(self, warm_connections: int = 0) -> Dict[str, Any]:
+        """Prepare the backend (connectivity, schema); returns timing stats"""
+        return {}
+
+    def close(self):
+        """Release connections held by the backend"""
+
+    @abstractmethod
+    def store_feedback(self, feedback_data: Dict[str, Any]) -> bool:
+        """Store one validated feedback record; True when it was written"""
+
+    def store_feedback_many(self, records: List[Dict[str, Any]]) -> int:
+        """Store several records; returns how many were written"""
+        return sum(1 for record in records if self.store_feedback(record))
+
+    def last_bookmark(self) -> Optional[str]:
+        """Consistency token of the calling thread's last write, if the backend has one"""
+        return None
+
+    def last_read_freshness(self) -> Optional[Dict[str, Any]]:
+        """`stale` flag and age of the calling thread's last analytics read, for backends that cache"""
+        return None
+
+    @abstractmethod
+    def count_feedback(self) -> int:
+        """Number of stored feedback records"""
+
+    @abstractmethod
+    def get_overall_analytics(self, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Totals, positive/negative counts and satisfaction rate"""
+
+    @abstractmethod
+    def get_intent_performance(self, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Satisfaction and confidence per detected intent"""
+
+    @abstractmethod
+    def get_feedback_trends(self, days: int = 30, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Feedback counts per day and type over the last `days` days"""
+
+    @abstractmethod
+    def get_user_engagement(self, limit: int = 20, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most active users with their first and last feedback"""
+
+    @abstractmethod
+    def get_category_insights(self, bookmark: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Feedback counts per category and type"""
+
+    @abstractmethod
+    def get_distinct_counts(self, start: str, end: str, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Approximate unique users and questions per day and over start..end (ISO dates, inclusive)"""
+
+    @abstractmethod
+    def search_feedback(self, search_terms: List[str], feedback_type: Optional[str] = None,
+                        min_rating: Optional[int] = None, max_rating: Optional[int] = None,
+                        start: Optional[str] = None, end: Optional[str] = None, limit: int = 20,
+                        cursor: Optional[str] = None, bookmark: Optional[str] = None) -> Dict[str, Any]:
+        """Feedback containing every term, best match first: `results` with highlights and a `next_cursor`"""
+
+    @abstractmethod
+    def health_check(self) -> Dict[str, Any]:
+        """Backend health as a dict with at least `status` and `database`"""
+
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Connection pool usage, for backends that pool connections"""
+        return None
@@ -0,0 +1,257 @@
+"""
+Multi-tenant database routing
+
+Each tenant (a programme) maps to its own Neo4j database. Requests name their
+tenant with an `X-Tenant` header or a `/t/<tenant>` path prefix. Tenant
+services share the process-wide driver but each has its own pool slices,
+circuit breaker, last-good cache and metrics, so a noisy tenant queues on its
+own slices instead of delaying everyone else. The slices of all active
+tenants and of the default database together fit in the driver's pool (see
+split_pool). A bounded LRU keeps the most recently used tenants active.
+
+The tenant named by a request is trusted as is unless tenant keys are
+configured, in which case the request must also carry that tenant's key in
+X-Tenant-Key. Without keys, X-Tenant must be set or stripped by a gateway in
+front of the API.
+"""
+
+import hmac
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+
+from neo4j_service import Neo4jService, DEFAULT_POOL_SHARES
+from resilience import DatabaseUnavailableError
+
+logger = logging.getLogger(__name__)
+
+TENANT_HEADER = 'X-Tenant'
+TENANT_KEY_HEADER = 'X-Tenant-Key'
+TENANT_PATH_PREFIX = '/t/'
+
+# Smallest tenant pool that still gives every workload slice one connection
+MIN_TENANT_POOL_SIZE = len(DEFAULT_POOL_SHARES)
+
+
+def parse_tenant_map(value: str) -> Dict[str, str]:
+    """Tenant -> database from "unep=unep_feedback,undp=undp_feedback"; a bare name uses itself"""
+    tenants = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, database = item.partition('=')
+        tenants[name.strip()] = (database or name).strip()
+    return tenants
+
+
+def parse_tenant_keys(value: str) -> Dict[str, str]:
+    """Tenant -> access key from "unep=key1,undp=key2"; entries without a key are ignored"""
+    keys = {}
+    for item in value.split(','):
+        name, _, key = item.strip().partition('=')
+        if name.strip() and key.strip():
+            keys[name.strip()] = key.strip()
+    return keys
+
+
+def split_pool(pool_size: int, max_active: int, tenant_pool_size: int) -> Tuple[int, int]:
+    """
+    (connections for the default database, connections per active tenant) within one driver pool
+
+    Active tenants together get at most half of the pool, so each gets
+    `tenant_pool_size` or less; the default database's slices are sized from
+    the rest. The slices of every active service then never add up to more
+    than the driver's pool.
+
+    Raises:
+        ValueError: the pool cannot give every active tenant MIN_TENANT_POOL_SIZE connections
+    """
+    per_tenant = min(tenant_pool_size, pool_size // 2 // max(1, max_active))
+    if per_tenant < MIN_TENANT_POOL_SIZE:
+        raise ValueError(f"A pool of {pool_size} connections is too small for {max_active} active tenants "
+                         f"of at least {MIN_TENANT_POOL_SIZE} connections each")
+    if per_tenant < tenant_pool_size:
+        logger.warning(f"Tenant pools capped at {per_tenant} connections so {max_active} active tenants "
+                       f"fit in half of the {pool_size}-connection pool")
+    return pool_size - per_tenant * max_active, per_tenant
+
+
+class TenantPathMiddleware:
+    def __init__(self, wsgi_app):
+        """Move a `/t/<tenant>` path prefix into the X-Tenant header before routing"""
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith(TENANT_PATH_PREFIX):
+            tenant, _, rest = path[len(TENANT_PATH_PREFIX):].partition('/')
+            if tenant:
+                environ['HTTP_X_TENANT'] = tenant
+                environ['PATH_INFO'] = '/' + rest
+                environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + TENANT_PATH_PREFIX + tenant
+        return self.wsgi_app(environ, start_response)
+
+
+class TenantMetrics:
+    __slots__ = ('requests', 'errors', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.requests, 2) if self.requests else 0,
+            'max_ms': round(self.max_ms, 2)
+        }
+
+
+class TenantRegistry:
+    def __init__(self, base_service: Neo4jService, tenants: Dict[str, str],
+                 service_factory: Callable[[str], Neo4jService], max_active: int = 8,
+                 warm_connections: int = 0, max_feedback: int = 0, quota_refresh: float = 60.0,
+                 keys: Optional[Dict[str, str]] = None):
+        """
+        Per-tenant Neo4jService instances over one shared driver
+
+        Args:
+            base_service: Service for the default database, owner of the driver
+            tenants: Tenant name -> database name
+            service_factory: Builds a service for a database on the shared driver
+            max_active: Tenant services kept active at once (LRU); an evicted
+                service is closed and rebuilt without a new bootstrap on next use
+            warm_connections: Connections opened when a tenant is first bootstrapped
+            max_feedback: Storage quota in Feedback nodes per tenant (0 disables it)
+            quota_refresh: Seconds between exact counts for the storage quota
+            keys: Tenant name -> access key required in X-Tenant-Key; None or
+                empty trusts the tenant named by the request
+        """
+        self.base_service = base_service
+        self.tenants = tenants
+        self.service_factory = service_factory
+        self.max_active = max_active
+        self.warm_connections = warm_connections
+        self.max_feedback = max_feedback
+        self.quota_refresh = quota_refresh
+        self.keys = keys or {}
+        self._services: "OrderedDict[str, Neo4jService]" = OrderedDict()
+        self._bootstrapped: Set[str] = set()
+        self._lock = threading.Lock()
+        self._activation_locks = {name: threading.Lock() for name in tenants}
+        self._metrics = {name: TenantMetrics() for name in tenants}
+        self._counts: Dict[str, tuple] = {}
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self.tenants
+
+    def authorized(self, tenant: str, key: Optional[str]) -> bool:
+        """Whether a request may act for `tenant`; always True when no keys are configured"""
+        if not self.keys:
+            return True
+        expected = self.keys.get(tenant)
+        return bool(expected and key) and hmac.compare_digest(expected.encode('utf-8'), key.encode('utf-8'))
+
+    def service_for(self, tenant: str) -> Neo4jService:
+        """Bootstrapped service for a tenant, activating it on first use"""
+        with self._lock:
+            service = self._services.get(tenant)
+            if service is not None:
+                self._services.move_to_end(tenant)
+                return service
+
+        # Only one request bootstraps a given tenant; others wait for it
+        with self._activation_locks[tenant]:
+            with self._lock:
+                service = self._services.get(tenant)
+            if service is None:
+                service = self._activate(tenant)
+        return service
+
+    def _activate(self, tenant: str) -> Neo4jService:
+        database = self.tenants[tenant]
+        service = self.service_factory(database)
+        # Migrations and warm-up ran the first time; a reactivated tenant only needs its service object
+        if tenant not in self._bootstrapped:
+            logger.info(f"Activating tenant '{tenant}' on database '{database}'")
+            try:
+                service.bootstrap(warm_connections=self.warm_connections)
+            except Exception as e:
+                service.close()
+                logger.error(f"Tenant '{tenant}' bootstrap failed: {e}")
+                raise DatabaseUnavailableError(f"Tenant '{tenant}' database unavailable", retry_after=5.0) from e
+        evicted: List[Tuple[str, Neo4jService]] = []
+        with self._lock:
+            self._bootstrapped.add(tenant)
+            self._services[tenant] = service
+            while len(self._services) > self.max_active:
+                evicted.append(self._services.popitem(last=False))
+        for name, old_service in evicted:
+            old_service.close()
+            logger.info(f"Deactivated least recently used tenant '{name}'")
+        return service
+
+    def prewarm(self):
+        """Activate the first `max_active` configured tenants; failures are left for first use"""
+        for tenant in list(self.tenants)[:self.max_active]:
+            try:
+                self.service_for(tenant)
+            except Exception as e:
+                logger.warning(f"Could not pre-warm tenant '{tenant}': {e}")
+
+    def over_storage_quota(self, tenant: str, service: Neo4jService) -> bool:
+        """Whether the tenant has reached its Feedback quota; counts are refreshed periodically"""
+        if self.max_feedback <= 0:
+            return False
+        with self._lock:
+            count, counted_at = self._counts.get(tenant, (0, None))
+        if counted_at is None or time.monotonic() - counted_at >= self.quota_refresh:
+            count = service.count_feedback()
+            with self._lock:
+                self._counts[tenant] = (count, time.monotonic())
+        return count >= self.max_feedback
+
+    def record_write(self, tenant: str):
+        """Count a stored record against the quota until the next exact count"""
+        with self._lock:
+            count, counted_at = self._counts.get(tenant, (0, None))
+            if counted_at is not None:
+                self._counts[tenant] = (count + 1, counted_at)
+
+    def record_request(self, tenant: str, elapsed_ms: float, error: bool):
+        metrics = self._metrics.get(tenant)
+        if metrics is None:
+            return
+        with self._lock:
+            metrics.requests += 1
+            metrics.errors += int(error)
+            metrics.total_ms += elapsed_ms
+            metrics.max_ms = max(metrics.max_ms, elapsed_ms)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            active = dict(self._services)
+        stats = {}
+        for tenant, database in self.tenants.items():
+            service = active.get(tenant)
+            stats[tenant] = {
+                'database': database,
+                'active': service is not None,
+                'metrics': self._metrics[tenant].snapshot(),
+                'pool': service.pool_stats() if service else None,
+                'circuit_breaker': service.policy.breaker.snapshot() if service else None
+            }
+        return stats
+
+    def close(self):
+        with self._lock:
+            services = list(self._services.values())
+            self._services.clear()
+        for service in services:
+            service.close()
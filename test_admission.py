@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Admission control and pool-slice tests
+
+Run with: python -m pytest test_admission.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from admission import (AdmissionClass, AdmissionController, classify_request,
+                       INGEST, LIGHT_READ, HEAVY_ANALYTICS, HEALTH)
+from fake_neo4j import FakeDriver
+from neo4j_service import Neo4jService
+from resilience import PoolSliceExhaustedError
+
+
+def test_routes_are_classified_by_cost():
+    assert classify_request('POST', '/api/feedback') == INGEST
+    assert classify_request('GET', '/api/feedback/analytics') == LIGHT_READ
+    assert classify_request('GET', '/api/feedback/trends') == HEAVY_ANALYTICS
+    assert classify_request('GET', '/api/health/ready') == HEALTH
+    assert classify_request('GET', '/api/admin/slow-queries') is None
+
+
+def test_full_queue_rejects_and_timeout_rejects():
+    admission = AdmissionClass('heavy', max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    assert admission.acquire()
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(admission.acquire()))
+    waiter.start()
+    time.sleep(0.01)
+    # The single queue place is taken, so a third request is shed at once
+    assert not admission.acquire()
+    waiter.join()
+    assert results == [False]
+    assert admission.stats() == {'active': 1, 'waiting': 0, 'max_concurrent': 1, 'max_queue': 1, 'rejected': 2}
+
+
+def test_queued_request_is_admitted_when_a_slot_frees():
+    admission = AdmissionClass('ingest', max_concurrent=1, max_queue=4, queue_timeout=2.0)
+    assert admission.acquire()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(admission.acquire()))
+    waiter.start()
+    time.sleep(0.02)
+    assert admission.stats()['waiting'] == 1
+    admission.release()
+    waiter.join()
+    assert results == [True] and admission.stats()['active'] == 1
+
+
+def test_controller_passes_unknown_classes_through():
+    controller = AdmissionController({INGEST: AdmissionClass(INGEST, 1, 0, 0.0)})
+    assert controller.acquire('export')
+    assert controller.acquire(INGEST) and not controller.acquire(INGEST)
+    controller.release(INGEST)
+    assert controller.stats()[INGEST]['active'] == 0
+
+
+def test_full_pool_slice_fails_fast_without_touching_other_workloads():
+    service = Neo4jService('fake://', '', '', driver=FakeDriver(), lazy=True,
+                           pool_slices={HEAVY_ANALYTICS: 1, INGEST: 1}, pool_slice_timeout=0.05)
+    with service._session(HEAVY_ANALYTICS):
+        with pytest.raises(PoolSliceExhaustedError):
+            with service._session(HEAVY_ANALYTICS):
+                pass
+        with service._session(INGEST):
+            assert service.pool_stats()['slices'][INGEST]['in_use'] == 1
+    assert service.pool_stats()['slices'][HEAVY_ANALYTICS]['in_use'] == 0
+
+
+def test_shed_request_gets_503_with_retry_after(api, api_client, monkeypatch):
+    controller = AdmissionController({HEAVY_ANALYTICS: AdmissionClass(HEAVY_ANALYTICS, 1, 0, 3.0)})
+    controller.acquire(HEAVY_ANALYTICS)
+    monkeypatch.setattr(api, 'admission_controller', controller)
+    monkeypatch.setattr(api, 'ADMISSION_ENABLED', True)
+
+    response = api_client.get('/api/feedback/trends')
+    assert response.status_code == 503 and response.headers['Retry-After'] == '3'
+    assert response.get_json()['details']['request_class'] == HEAVY_ANALYTICS
+    assert api_client.get('/api/feedback/analytics').status_code == 200
+    assert controller.stats()[HEAVY_ANALYTICS]['active'] == 1
@@ -6,61 +6,12 @@ Run this script to test all API endpoints with sample data
 
 import requests
 import json
-from datetime import datetime, timedelta
-import random
-import uuid
+
+from load_test import generate_sample_feedback
 
 # API Configuration
 API_BASE_URL = "http://localhost:8000/api"
 
-def generate_sample_feedback():
-    """Generate sample feedback data for testing"""
-    sample_intents = [
-        "carbon_reduction_inquiry",
-        "waste_management_policy",
-        "renewable_energy_info",
-        "environmental_regulations",
-        "air_quality_concern"
-    ]
-    
-    sample_categories = [
-        ["helpful", "accurate"],
-        ["informative", "clear"],
-        ["confusing", "incomplete"],
-        ["detailed", "relevant"],
-        ["unclear", "outdated"]
-    ]
-    
-    sample_messages = [
-        "How to reduce carbon emissions in urban areas?",
-        "What are the waste management policies for small businesses?",
-        "Can you explain renewable energy incentives?",
-        "What environmental regulations apply to manufacturing?",
-        "How can I report air quality issues in my area?"
-    ]
-    
-    feedback_types = ["positive", "negative"]
-    
-    return {
-        "feedback_id": str(uuid.uuid4()),
-        "message_id": f"msg_{random.randint(1000, 9999)}",
-        "message_text": random.choice(sample_messages),
-        "conversation_id": f"conv_{random.randint(100, 999)}",
-        "user_id": f"user_{random.randint(100, 999)}",
-        "feedback_type": random.choice(feedback_types),
-        "comment": "This response was helpful for understanding the policy." if random.choice([True, False]) else "",
-        "categories": random.choice(sample_categories),
-        "timestamp": (datetime.now() - timedelta(days=random.randint(0, 30))).isoformat() + "Z",
-        "intent": random.choice(sample_intents),
-        "confidence": round(random.uniform(0.6, 0.95), 2),
-        "entities": [
-            {
-                "entity": "topic",
-                "value": random.choice(["carbon", "waste", "energy", "regulations", "air quality"])
-            }
-        ]
-    }
-
 def test_health_check():
     """Test the health check endpoint"""
     print("🔍 Testing Health Check...")
@@ -182,28 +133,16 @@ def test_category_insights():
         print(f"❌ Category insights test failed: {e}")
         return False
 
-def populate_sample_data(num_records=10):
-    """Populate the database with sample data for testing"""
+def populate_sample_data(num_records=10, rate=50):
+    """Populate the database with sample data using the concurrent load generator"""
+    from load_test import run_load_test, format_table
+
     print(f"\n🌱 Populating database with {num_records} sample records...")
-    
-    success_count = 0
-    for i in range(num_records):
-        sample_data = generate_sample_feedback()
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/feedback",
-                json=sample_data,
-                headers={'Content-Type': 'application/json'},
-                timeout=10
-            )
-            if response.status_code == 200:
-                success_count += 1
-                print(f"✅ Record {i+1}/{num_records} stored successfully")
-            else:
-                print(f"❌ Record {i+1}/{num_records} failed: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Record {i+1}/{num_records} error: {e}")
-    
+    report = run_load_test(API_BASE_URL, rate, total=num_records, mix={'write': 1.0},
+                           workers=min(16, num_records), arrival='constant')
+    print(format_table(report))
+
+    success_count = report['status_codes'].get('200', 0)
     print(f"\n📝 Successfully stored {success_count}/{num_records} records")
     return success_count
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness tests: baseline handling and the regression gate
+
+Run with: python -m pytest test_benchmarks.py
+"""
+
+import json
+
+import benchmarks
+
+
+def results(**timings):
+    return {name: {'min_us': value, 'median_us': value, 'loops': 10, 'rounds': 3}
+            for name, value in timings.items()}
+
+
+def test_compare_classifies_against_the_threshold():
+    baseline = {'benchmarks': results(steady=10.0, slower=10.0, faster=10.0)}
+    rows = benchmarks.compare(results(steady=11.0, slower=13.0, faster=7.0, added=5.0), baseline, 0.25)
+    by_name = {row['name']: row for row in rows}
+
+    assert by_name['steady']['status'] == 'ok'
+    assert by_name['slower']['status'] == 'REGRESSED'
+    assert round(by_name['slower']['change'], 3) == 0.3
+    assert by_name['faster']['status'] == 'faster'
+    assert by_name['added']['status'] == 'new' and by_name['added']['change'] is None
+
+
+def test_save_baseline_keeps_benchmarks_that_were_not_run(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    assert benchmarks.load_baseline(path) == {}
+
+    benchmarks.save_baseline(path, results(schema_load=30.0, parse_timestamp=0.5))
+    benchmarks.save_baseline(path, results(schema_load=25.0))
+    baseline = benchmarks.load_baseline(path)
+
+    assert baseline['environment'] == benchmarks.environment()
+    assert list(baseline['benchmarks']) == ['parse_timestamp', 'schema_load']
+    assert baseline['benchmarks']['schema_load']['min_us'] == 25.0
+    assert baseline['benchmarks']['parse_timestamp']['min_us'] == 0.5
+
+
+def test_format_rows_shows_missing_baselines_as_dashes():
+    rows = benchmarks.compare(results(schema_load=12.5, added=3.0), {'benchmarks': results(schema_load=10.0)}, 0.25)
+    lines = benchmarks.format_rows(rows, 0.25).splitlines()
+
+    assert lines[2].split() == ['schema_load', '10.00', '12.50', '+25.0%', 'ok']
+    assert lines[3].split() == ['added', '-', '3.00', '-', 'new']
+    assert lines[-1] == 'threshold: +25% on the fastest round per operation'
+
+
+def test_measure_reports_per_operation_timings():
+    measured = benchmarks.measure(lambda: sum(range(10)), rounds=3, min_round_time=0.001)
+    assert measured['rounds'] == 3 and measured['loops'] >= 1
+    assert 0 < measured['min_us'] <= measured['median_us']
+
+
+def test_gate_fails_only_on_a_confirmed_regression(tmp_path, capsys):
+    path = tmp_path / 'baseline.json'
+    args = ['--baseline', str(path), '--filter', 'trends_rows', '--rounds', '2']
+
+    path.write_text(json.dumps({'environment': benchmarks.environment(),
+                                'benchmarks': results(trends_rows=1e-6)}))
+    assert benchmarks.main(args + ['--confirm', '1']) == 1
+    assert 'Regressed beyond +25%: trends_rows' in capsys.readouterr().err
+
+    path.write_text(json.dumps({'environment': benchmarks.environment(),
+                                'benchmarks': results(trends_rows=1e9)}))
+    assert benchmarks.main(args) == 0
+    assert 'faster' in capsys.readouterr().out
+
+
+def test_list_and_unknown_filter():
+    assert benchmarks.main(['--list']) == 0
+    assert benchmarks.main(['--filter', 'no-such-benchmark']) == 2
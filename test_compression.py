@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Response compression tests: negotiation, segment splicing and the Flask hook
+
+Run with: python -m pytest test_compression.py
+"""
+
+import gzip
+import json
+import zlib
+
+import pytest
+
+from compression import CompressionCache, compress, negotiate_encoding, supported_encodings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DECODERS = {'gzip': gzip.decompress, 'deflate': zlib.decompress}
+if brotli:
+    DECODERS['br'] = brotli.decompress
+
+
+def test_negotiation_follows_q_values_and_support():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding('identity') is None
+    assert negotiate_encoding('deflate, gzip;q=0.5') == 'deflate'
+    assert negotiate_encoding('gzip;q=0, deflate;q=0.1') == 'deflate'
+    assert negotiate_encoding('*') == supported_encodings()[0]
+    assert negotiate_encoding('br') == ('br' if brotli else None)
+
+
+@pytest.mark.parametrize('encoding', sorted(DECODERS))
+def test_spliced_segments_decode_to_the_original_body(encoding):
+    cache = CompressionCache(max_entries=2)
+    data = json.dumps([{'day': str(day), 'count': day} for day in range(200)]).encode('utf-8')
+    for timestamp in ('2025-08-03T12:00:00', '2025-08-03T12:00:01'):
+        prefix = b'{"data":'
+        body = prefix + data + f',"timestamp":"{timestamp}"}}'.encode('utf-8')
+        compressed = cache.compress_segmented(body, len(prefix), len(prefix) + len(data), encoding)
+        assert DECODERS[encoding](compressed) == body
+        assert compress(body, encoding) != body
+    if encoding != 'br':
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_segment_cache_is_bounded():
+    cache = CompressionCache(max_entries=2)
+    for index in range(5):
+        body = json.dumps({'data': [index] * 50}).encode('utf-8')
+        cache.compress_segmented(body, 8, len(body) - 1, 'gzip')
+    assert len(cache._entries) == 2
+
+
+def test_json_responses_are_compressed_when_accepted(api, api_client, service, monkeypatch, sample_feedback):
+    for _ in range(3):
+        service.store_feedback(sample_feedback(categories=['air', 'water']))
+    monkeypatch.setattr(api, 'COMPRESSION_MIN_SIZE', 10)
+
+    plain = api_client.get('/api/feedback/categories')
+    assert 'Content-Encoding' not in plain.headers
+    response = api_client.get('/api/feedback/categories', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data))['data'] == plain.get_json()['data']
+
+    # Binary formats are left alone
+    packed = api_client.get('/api/feedback/categories', headers={'Accept-Encoding': 'gzip',
+                                                             'Accept': 'application/msgpack'})
+    assert 'Content-Encoding' not in packed.headers
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Service and API tests on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_fake_neo4j.py
+(no database or running server needed)
+"""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from fake_neo4j import FakeDriver, FaultInjector, LatencyModel
+from neo4j import READ_ACCESS
+from neo4j.exceptions import TransientError, ServiceUnavailable
+from migrations import LATEST_VERSION
+from neo4j_service import Neo4jService
+from read_cache import ReadCache
+from resilience import CircuitOpenError, DatabaseUnavailableError
+
+
+def test_bootstrap_applies_migrations_once(make_service):
+    driver = FakeDriver()
+    service = make_service(driver)
+    graph = driver.graph('neo4j')
+    assert graph.schema_version['version'] == LATEST_VERSION
+    assert set(graph.indexes) == {'feedback_timestamp_idx', 'feedback_type_idx', 'feedback_rating_idx',
+                                  'user_total_feedback_idx', 'feedback_intent_idx', 'feedback_text_idx'}
+    assert set(graph.constraints) == {'monthly_archive_month', 'time_tree_year', 'time_tree_month',
+                                      'time_tree_day', 'user_id_unique', 'day_sketch_date', 'intent_name_unique'}
+    assert service.bootstrap()['migrations_applied'] == []
+
+
+def test_backfill_runs_in_chunks(sample_feedback):
+    driver = FakeDriver()
+    driver.graph('neo4j').seed([dict(sample_feedback(), categories=None) for _ in range(25)])
+    service = Neo4jService('fake://', '', '', driver=driver, lazy=True, migration_batch_size=4)
+    service.bootstrap()
+    assert all(f['categories'] == [] for f in driver.graph('neo4j').feedback)
+
+
+def test_store_and_analytics_round_trip(make_service, sample_feedback):
+    service = make_service()
+    service.store_feedback(sample_feedback('positive', categories=['air']))
+    service.store_feedback(sample_feedback('negative', categories=['air', 'water']))
+    service.store_feedback(sample_feedback('positive', days_ago=40))
+
+    assert service.get_overall_analytics() == {
+        'total_feedback': 3, 'positive_count': 2, 'negative_count': 1, 'satisfaction_rate': 66.67
+    }
+    trends = service.get_feedback_trends(30)
+    assert sorted((t['feedback_type'], t['count']) for t in trends) == [('negative', 1), ('positive', 1)]
+    assert [(c['category'], c['feedback_type'], c['count']) for c in service.get_category_insights()] == [
+        ('air', 'negative', 1), ('air', 'positive', 1), ('water', 'negative', 1)
+    ]
+    assert service.count_feedback() == 3
+
+
+def test_intents_and_engagement_from_seeded_nodes(make_service, sample_feedback):
+    driver = FakeDriver()
+    driver.graph('neo4j').seed([
+        dict(sample_feedback('positive'), user_id='a', detected_intent='recycling', confidence_score=0.9),
+        dict(sample_feedback('negative'), user_id='a', detected_intent='recycling', confidence_score=0.7),
+        dict(sample_feedback('positive'), user_id='b', detected_intent='energy', confidence_score=0.8),
+    ])
+    service = make_service(driver)  # the user_engagement migration links the seeded nodes
+    intents = service.get_intent_performance()
+    assert [(i['intent_name'], i['satisfaction_rate'], i['avg_confidence']) for i in intents] == [
+        ('recycling', 50.0, 0.8), ('energy', 100.0, 0.8)
+    ]
+    engagement = service.get_user_engagement(1)
+    assert engagement[0]['user_id'] == 'a' and engagement[0]['total_feedback'] == 2
+
+    # Writes update the User counters; feedback without a user id creates no User
+    service.store_feedback(dict(sample_feedback('positive'), user_id='b'))
+    service.store_feedback(dict(sample_feedback('negative', days_ago=3), user_id='b'))
+    service.store_feedback(sample_feedback('positive'))
+    engagement = service.get_user_engagement(5)
+    assert [(u['user_id'], u['total_feedback'], u['positive_feedback']) for u in engagement] == [
+        ('b', 3, 2), ('a', 2, 1)
+    ]
+    assert engagement[0]['first_feedback'] < engagement[0]['last_feedback']
+
+
+def test_transient_errors_are_retried(make_service, sample_feedback):
+    faults = FaultInjector()
+    service = make_service(FakeDriver(faults=faults))
+    faults.fail_next(TransientError, 2)
+    assert service.store_feedback(sample_feedback()) is True
+    assert faults.injected == 2
+    assert service.count_feedback() == 1
+
+
+def test_retried_transactions_never_repeat_their_writes(make_service, sample_feedback):
+    faults = FaultInjector(seed=3)
+    service = make_service(FakeDriver(faults=faults), max_attempts=20)
+    faults.rates[TransientError] = 0.3
+    for _ in range(20):
+        assert service.store_feedback(sample_feedback()) is True
+    assert faults.injected > 0
+    assert service.count_feedback() == 20 and len(service.driver.graph('neo4j').feedback) == 20
+
+def test_persistent_outage_opens_the_breaker(make_service, sample_feedback):
+    faults = FaultInjector()
+    service = make_service(FakeDriver(faults=faults), failure_threshold=2, max_attempts=3)
+    faults.rates[ServiceUnavailable] = 1.0
+    # Each call counts once, however many attempts it made
+    for _ in range(2):
+        with pytest.raises(DatabaseUnavailableError):
+            service.store_feedback(sample_feedback())
+    assert faults.injected == 6
+    injected = faults.injected
+    with pytest.raises(CircuitOpenError):
+        service.store_feedback(sample_feedback())
+    assert faults.injected == injected
+
+
+def test_last_good_result_served_while_unavailable(make_service, sample_feedback):
+    faults = FaultInjector()
+    service = make_service(FakeDriver(faults=faults), max_attempts=1)
+    service.store_feedback(sample_feedback())
+    first = service.get_overall_analytics()
+    faults.fail_next(ServiceUnavailable)
+    assert service.get_overall_analytics() == first
+    assert service.last_read_freshness()['stale'] is True
+
+
+def test_stale_result_served_while_refreshing_in_background(sample_feedback):
+    service = Neo4jService('fake://', '', '', driver=FakeDriver(), lazy=True, read_cache=ReadCache(ttl=0, grace=60))
+    service.bootstrap()
+    assert service.get_overall_analytics()['total_feedback'] == 0
+    service.store_feedback(sample_feedback())
+    # Served from the cache at once, stale, while one refresh reloads it
+    assert service.get_overall_analytics()['total_feedback'] == 0
+    assert service.last_read_freshness()['stale'] is True
+    for _ in range(100):
+        if service.read_cache.stats()['refreshes']:
+            break
+        time.sleep(0.01)
+    assert service.get_overall_analytics()['total_feedback'] == 1
+
+
+def test_reads_use_read_access_and_bookmarks(make_service, sample_feedback):
+    driver = FakeDriver()
+    service = make_service(driver)
+    service.store_feedback(sample_feedback())
+    bookmark = service.last_bookmark()
+    assert bookmark
+    service.get_overall_analytics(bookmark=bookmark)
+    assert driver.last_session['access_mode'] == READ_ACCESS
+    assert driver.last_session['bookmarks'].raw_values
+
+
+def test_transaction_timeout_follows_the_deadline(make_service):
+    service = make_service(FakeDriver(latency=LatencyModel.constant(300)), default_deadline=0.05)
+    started = time.monotonic()
+    assert service.get_overall_analytics() == {}
+    assert time.monotonic() - started < 0.3
+
+
+def test_latency_model_spec():
+    model = LatencyModel.parse('uniform:1:3,spike:1.0:100', seed=1)
+    assert 0.101 <= model.sample() <= 0.103
+
+
+def test_flask_endpoints_on_fake_driver(api_client, sample_feedback):
+    response = api_client.post('/api/feedback', json=dict(sample_feedback(categories=['air']), intent='recycling',
+                                                          confidence=0.82))
+    assert response.status_code == 200
+    bookmark = response.headers['X-Neo4j-Bookmark']
+    assert api_client.post('/api/feedback', json=dict(sample_feedback(), confidence=1.5)).status_code == 400
+
+    response = api_client.get('/api/feedback/intents')
+    assert [(i['intent_name'], i['avg_confidence']) for i in response.get_json()['data']] == [('recycling', 0.82)]
+
+    response = api_client.get('/api/feedback/analytics', headers={'X-Neo4j-Bookmark': bookmark})
+    assert response.status_code == 200
+    assert response.get_json()['data']['total_feedback'] == 1
+
+    response = api_client.get('/api/feedback/trends?days=7')
+    assert response.get_json()['data'][0]['feedback_date'] == datetime.now(timezone.utc).date().isoformat()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Health monitor tests on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_health_monitor.py
+"""
+
+import time
+
+from fake_neo4j import FakeDriver, FaultInjector
+from health_monitor import HealthMonitor
+from neo4j.exceptions import ServiceUnavailable
+
+
+def ready_monitor(service, **kwargs):
+    monitor = HealthMonitor(interval=60, **kwargs)
+    monitor.attach(service)
+    monitor.probe_now()
+    monitor.mark_ready({'migrations_applied': []})
+    return monitor
+
+
+def test_unattached_monitor_reports_not_initialized():
+    monitor = HealthMonitor()
+    assert monitor.probe_now()['database'] == 'not_initialized'
+    ready, details = monitor.readiness()
+    assert not ready and details['reasons'] == ['starting']
+
+
+def test_probe_is_cached_between_intervals(make_service):
+    driver = FakeDriver()
+    service = make_service(driver)
+    monitor = ready_monitor(service)
+    statements = driver.statements
+
+    for _ in range(5):
+        assert monitor.cached_health()['status'] == 'healthy'
+    assert driver.statements == statements
+    assert monitor.cached_health()['probe_age_seconds'] >= 0
+
+
+def test_failed_probe_makes_the_service_unready(make_service):
+    faults = FaultInjector()
+    service = make_service(FakeDriver(faults=faults))
+    monitor = ready_monitor(service)
+    assert monitor.readiness()[0]
+
+    faults.fail_next(ServiceUnavailable)
+    assert monitor.probe_now()['status'] == 'unhealthy'
+    ready, details = monitor.readiness()
+    assert not ready and details['reasons'] == ['database_unhealthy']
+    assert monitor.liveness()['status'] == 'alive'
+
+
+def test_stale_probe_and_backlog_make_the_service_unready(make_service):
+    monitor = ready_monitor(make_service(), max_in_flight=2, stale_after=0.01)
+    time.sleep(0.02)
+    monitor.request_started()
+    monitor.request_started()
+    ready, details = monitor.readiness()
+    assert not ready
+    assert details['reasons'] == ['health_probe_stale', 'request_backlog']
+
+    monitor.request_finished()
+    monitor.request_finished()
+    monitor.request_finished()
+    assert monitor.in_flight == 0
+
+
+def test_startup_failure_keeps_readiness_false(make_service):
+    monitor = HealthMonitor(interval=60)
+    monitor.attach(make_service())
+    monitor.probe_now()
+    monitor.mark_startup_failed('Connection refused')
+    ready, details = monitor.readiness()
+    assert not ready and details['startup'] == {'status': 'retrying', 'last_error': 'Connection refused'}
+    assert monitor.mark_ready() >= 0
+    assert monitor.readiness()[0]
+
+
+def test_health_routes_serve_the_cached_state(api, api_client, service, monkeypatch):
+    monitor = ready_monitor(service)
+    monkeypatch.setattr(api, 'health_monitor', monitor)
+
+    assert api_client.get('/api/health').status_code == 200
+    assert api_client.get('/api/health/live').get_json()['data']['status'] == 'alive'
+    response = api_client.get('/api/health/ready')
+    assert response.status_code == 200 and response.get_json()['data']['status'] == 'ready'
+
+    monitor.mark_startup_failed('boom')
+    assert api_client.get('/api/health/ready').status_code == 503
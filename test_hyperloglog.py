@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Per-day HyperLogLog sketch tests: distinct users and questions
+
+Run with: python -m pytest test_hyperloglog.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fake_neo4j import FakeDriver
+
+
+def test_day_sketches_estimate_distinct_users_and_questions(api, monkeypatch, make_service, sample_feedback):
+    driver = FakeDriver()
+    # Seeded before bootstrap: added by the day-sketch migration
+    driver.graph('neo4j').seed([dict(sample_feedback(days_ago=2), user_id=f'old{i}') for i in range(5)])
+    service = make_service(driver)
+    for i in range(40):
+        service.store_feedback(dict(sample_feedback(), user_id=f'u{i % 10}',
+                                    user_query=f'Question {i % 8}?' if i % 2 else f'question  {i % 8}?'))
+
+    today = datetime.now(timezone.utc).date()
+    counts = service.get_distinct_counts((today - timedelta(days=7)).isoformat(), today.isoformat())
+    assert (counts['unique_users'], counts['unique_queries']) == (15, 9)
+    assert [(day['unique_users'], day['unique_queries']) for day in counts['days']] == [(5, 1), (10, 8)]
+
+    monkeypatch.setattr(api, 'feedback_store', service)
+    client = api.app.test_client()
+    data = client.get('/api/feedback/unique?days=1').get_json()['data']
+    assert (data['unique_users'], data['unique_queries']) == (10, 8)
+    assert data['start'] == data['end'] == today.isoformat()
+    # days=N covers N calendar days ending today: the day two days back needs days=3
+    assert client.get('/api/feedback/unique?days=2').get_json()['data']['unique_users'] == 10
+    data = client.get('/api/feedback/unique?days=3').get_json()['data']
+    assert (data['unique_users'], data['start']) == (15, (today - timedelta(days=2)).isoformat())
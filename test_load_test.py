@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Load generator tests against the API served on the in-process fake driver
+
+Run with: python -m pytest test_load_test.py
+"""
+
+import random
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from load_test import LoadGenerator, format_table, generate_sample_feedback, parse_mix, percentile
+
+
+@pytest.fixture
+def api_url(api):
+    server = make_server('127.0.0.1', 0, api.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api", api
+    server.shutdown()
+
+
+def test_mix_is_normalised_and_validated():
+    assert parse_mix('write=3,trends=1') == {'write': 0.75, 'trends': 0.25}
+    assert parse_mix('analytics') == {'analytics': 1.0}
+    with pytest.raises(ValueError):
+        parse_mix('export=1')
+    with pytest.raises(ValueError):
+        parse_mix('write=0')
+
+
+def test_nearest_rank_percentiles():
+    values = [float(value) for value in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 99), percentile([], 50)) == (50.0, 99.0, 0.0)
+
+
+def test_generated_payloads_pass_the_schema(api):
+    payloads = [generate_sample_feedback() for _ in range(20)]
+    for payload in payloads:
+        assert not api.feedback_schema.validate(payload)
+    assert {'user_id', 'intent', 'confidence'} <= set(payloads[0])
+
+
+def test_seeded_generators_repeat_their_payloads_without_touching_the_module_rng():
+    state = random.getstate()
+    runs = []
+    for _ in range(2):
+        generator = LoadGenerator('http://x/api', rate=1, seed=5)
+        # Timestamps are offsets from now, so only they differ between runs
+        requests = [generator.next_request(index) for index in range(10)]
+        runs.append([body and dict(body, timestamp=None) for _, _, _, body, _ in requests])
+    assert runs[0] == runs[1] and any(runs[0])
+    assert random.getstate() == state
+
+
+def test_generator_reports_every_request(api_url):
+    base_url, Flask_api = api_url
+    generator = LoadGenerator(base_url, rate=200, mix=parse_mix('write=1,analytics=1'), workers=4,
+                              arrival='constant', seed=7)
+    report = generator.run(total=40)
+
+    assert report['requests'] == 40 and report['error_rate'] == 0.0
+    assert set(report['endpoints']) == {'write', 'analytics'}
+    assert report['status_codes'] == {'200': 40}
+    assert Flask_api.feedback_store.count_feedback() == report['endpoints']['write']['requests']
+    # Generated writes carry user ids and intents, so the engagement and intent reads have rows
+    assert Flask_api.feedback_store.get_user_engagement(5)
+    assert Flask_api.feedback_store.get_intent_performance()
+    assert report['config']['target_rate_rps'] == 200
+    assert 'TOTAL' in format_table(report)
+
+
+def test_recorded_traffic_is_cycled(api_url):
+    base_url, _ = api_url
+    traffic = [{'method': 'GET', 'path': '/feedback/trends?days=7', 'route': 'trends',
+                'headers': {'Accept': 'application/json', 'Content-Type': 'text/plain'}}]
+    report = LoadGenerator(base_url, rate=100, traffic=traffic, workers=2, arrival='constant').run(total=5)
+    assert report['endpoints']['trends']['requests'] == 5
+    assert report['config']['recorded_requests'] == 1
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Schema migration tests on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_migrations.py
+"""
+
+import pytest
+
+from fake_neo4j import FakeDriver
+from migrations import LATEST_VERSION, MIGRATIONS, Migration, MigrationRunner
+from neo4j_service import Neo4jService
+
+CATEGORIES_BACKFILL = MIGRATIONS[1].backfills[0]
+DAY_SKETCH_VERSION = next(m.version for m in MIGRATIONS if m.name == 'day_sketch_backfill')
+
+
+@pytest.fixture
+def make_runner(sample_feedback):
+    def build(records=0, batch_size=2, chunk_size=5):
+        driver = FakeDriver()
+        graph = driver.graph('neo4j')
+        graph.seed([dict(sample_feedback(), categories=None) for _ in range(records)])
+        service = Neo4jService('fake://', '', '', driver=driver, lazy=True)
+        return MigrationRunner(service, batch_size=batch_size, chunk_size=chunk_size), graph
+    return build
+
+
+def test_migrate_stops_at_the_target_and_resumes_from_the_stored_version(make_runner):
+    runner, graph = make_runner()
+    assert runner.migrate(target=3) == [1, 2, 3]
+    status = runner.status()
+    assert status['current_version'] == 3
+    assert status['pending'] == [m.version for m in MIGRATIONS if m.version > 3]
+
+    assert runner.migrate() == list(range(4, LATEST_VERSION + 1))
+    assert graph.schema_version['applied_versions'] == list(range(1, LATEST_VERSION + 1))
+    assert runner.migrate() == []
+
+
+def test_backfill_resumes_after_an_interrupted_run(make_runner):
+    runner, graph = make_runner(records=15)
+    # State left behind by a run that crashed after its first two chunks
+    graph.schema_version = {'name': 'feedback', 'version': 1,
+                            'backfill_name': CATEGORIES_BACKFILL.name, 'backfill_processed': 10}
+    assert runner.status()['backfill_in_progress'] == CATEGORIES_BACKFILL.name
+
+    assert runner.run_backfill(CATEGORIES_BACKFILL) == 15
+    assert all(f['categories'] == [] for f in graph.feedback)
+    assert 'backfill_name' not in graph.schema_version
+    assert runner.run_backfill(CATEGORIES_BACKFILL) == 0
+
+
+def test_progress_is_recorded_after_every_chunk(make_runner):
+    runner, graph = make_runner(records=12)
+    recorded = []
+    original = runner.service._session
+
+    def tracking_session(*args, **kwargs):
+        if graph.schema_version and graph.schema_version.get('backfill_processed'):
+            recorded.append(graph.schema_version['backfill_processed'])
+        return original(*args, **kwargs)
+
+    runner.service._session = tracking_session
+    assert runner.run_backfill(CATEGORIES_BACKFILL) == 12
+    assert sorted(set(recorded)) == [5, 10, 12]
+
+
+def test_failed_verification_leaves_the_version_unchanged(make_runner):
+    runner, graph = make_runner(records=3)
+    runner.migrate(target=1)
+    unverified = Migration(2, 'feedback_categories', verify=MIGRATIONS[1].verify)
+
+    with pytest.raises(RuntimeError, match='failed verification'):
+        runner._apply(unverified)
+    assert runner.current_version() == 1
+
+
+def test_failed_statement_leaves_the_version_unrecorded_and_is_retried(make_runner):
+    runner, graph = make_runner()
+    run = graph.run
+
+    def failing_run(query, *args):
+        if query.startswith('CREATE FULLTEXT INDEX'):
+            raise RuntimeError('leader switched')
+        return run(query, *args)
+
+    graph.run = failing_run
+    with pytest.raises(RuntimeError, match='leader switched'):
+        runner.migrate()
+    failed = next(m.version for m in MIGRATIONS if 'feedback_text_idx' in ' '.join(m.statements))
+    assert runner.current_version() == failed - 1
+
+    graph.run = run
+    assert runner.migrate() == list(range(failed, LATEST_VERSION + 1))
+    assert 'feedback_text_idx' in graph.indexes
+
+
+def test_target_zero_applies_nothing(make_runner):
+    runner, graph = make_runner()
+    assert runner.migrate(target=0) == []
+    assert runner.current_version() == 0
+
+def test_day_sketch_backfill_is_chunked_and_runs_once(make_runner, sample_feedback):
+    runner, graph = make_runner(batch_size=2, chunk_size=4)
+    graph.seed([dict(sample_feedback(days_ago=index % 3), user_id=f'u{index}') for index in range(10)])
+    runner.migrate(target=DAY_SKETCH_VERSION - 1)
+    recorded = []
+    original = runner.service._session
+
+    def tracking_session(*args, **kwargs):
+        if graph.schema_version.get('backfill_processed'):
+            recorded.append(graph.schema_version['backfill_processed'])
+        return original(*args, **kwargs)
+
+    runner.service._session = tracking_session
+    assert runner.migrate() == [DAY_SKETCH_VERSION]
+    runner.service._session = original
+    assert sorted(set(recorded)) == [4, 8, 10]
+    assert all(f['sketched'] for f in graph.feedback) and len(graph.sketches) == 3
+    service = runner.service
+    assert service.get_distinct_counts('1970-01-01', '2999-12-31')['unique_users'] == 10
+
+    # Later bootstraps leave existing Feedback alone; the CLI rebuild re-adds all of it
+    statements = []
+    run = graph.run
+
+    def recording_run(query, *args):
+        statements.append(query)
+        return run(query, *args)
+
+    graph.run = recording_run
+    assert service.bootstrap()['migrations_applied'] == []
+    assert statements and not any('sketched' in query for query in statements)
+    assert service.rebuild_day_sketches() == 10
+    service.read_cache.clear()
+    assert service.get_distinct_counts('1970-01-01', '2999-12-31')['unique_users'] == 10
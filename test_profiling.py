@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Request profiler tests: selection, the on-disk ring and the admin routes
+
+Run with: python -m pytest test_profiling.py
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from profiling import PROFILE_FORMATS, RequestProfiler
+
+ADMIN = 'profiling-admin'
+
+
+def busy(ms=20):
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def profile_once(profiler, endpoint='get_analytics'):
+    active = profiler.start()
+    busy()
+    return profiler.finish(active, {'method': 'GET', 'endpoint': endpoint, 'path': '/api/x', 'status': 200})
+
+
+@pytest.fixture(scope='module')
+def profiled_api(tmp_path_factory, make_service):
+    """A second copy of Flask_api imported with profiling on; the shared module stays untouched"""
+    directory = str(tmp_path_factory.mktemp('profiles'))
+    overrides = {'PROFILING_ENABLED': 'true', 'PROFILING_DIR': directory, 'ADMIN_TOKEN': ADMIN,
+                 'RATE_LIMIT_ENABLED': 'false'}
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            'Flask_api_profiled', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Flask_api.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    module.feedback_store = make_service()
+    yield module
+    sys.modules.pop('Flask_api_profiled', None)
+
+
+def test_wants_honours_force_rate_and_endpoints(tmp_path):
+    off = RequestProfiler(str(tmp_path / 'off'))
+    assert off.wants('get_analytics', forced=True)
+    assert not off.wants('get_analytics', forced=False)
+
+    always = RequestProfiler(str(tmp_path / 'on'), sample_rate=1.0, endpoints=['get_analytics'])
+    assert always.wants('get_analytics', forced=False)
+    assert not always.wants('submit_feedback', forced=False)
+
+
+def test_finish_writes_all_formats(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_interval=0.001)
+    profile_id = profile_once(profiler)
+
+    for fmt in PROFILE_FORMATS:
+        assert os.path.exists(profiler.path(profile_id, fmt))
+    metadata = profiler.list_profiles()[0]
+    assert metadata['id'] == profile_id and metadata['endpoint'] == 'get_analytics'
+    assert metadata['duration_ms'] >= 20 and metadata['samples'] > 0
+    assert 'busy' in open(profiler.path(profile_id, 'folded')).read()
+    assert 'busy' in profiler.summary(profile_id)
+
+
+def test_busy_slots_skip_instead_of_waiting(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_concurrent=1)
+    active = profiler.start()
+    assert profiler.start() is None
+    assert profiler.stats()['skipped_busy'] == 1
+    profiler.finish(active, {'endpoint': 'x'})
+    active = profiler.start()
+    assert active is not None
+    profiler.finish(active, {'endpoint': 'x'})
+
+
+def test_ring_keeps_only_the_newest_profiles(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_profiles=2)
+    ids = []
+    for _ in range(4):
+        ids.append(profile_once(profiler))
+        time.sleep(0.002)
+
+    assert [p['id'] for p in profiler.list_profiles()] == ids[:1:-1]
+    assert sorted(os.listdir(tmp_path)) == sorted(i + s for i in ids[2:] for s in PROFILE_FORMATS.values())
+    assert profiler.path(ids[0]) is None
+
+
+def test_path_rejects_traversal_and_unknown_formats(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    profile_id = profile_once(profiler)
+    assert profiler.path('../' + profile_id) is None
+    assert profiler.path(profile_id, 'exe') is None
+    assert profiler.summary('20240101T000000000000-x-deadbeef') is None
+
+
+def test_forced_profile_is_listed_and_downloadable(profiled_api):
+    client = profiled_api.app.test_client()
+    assert 'X-Profile-Id' not in client.get('/api/feedback/analytics').headers
+    assert 'X-Profile-Id' not in client.get('/api/feedback/analytics', headers={'X-Profile': 'wrong'}).headers
+
+    response = client.get('/api/feedback/analytics', headers={'X-Profile': ADMIN})
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+
+    admin = {'X-Admin-Token': ADMIN}
+    assert client.get('/api/admin/profiles').status_code == 403
+    listed = client.get('/api/admin/profiles', headers=admin).get_json()['data']
+    assert profile_id in [p['id'] for p in listed['profiles']]
+
+    metadata = client.get(f'/api/admin/profiles/{profile_id}?format=json', headers=admin)
+    assert json.loads(metadata.get_data())['endpoint'] == 'get_analytics'
+    text = client.get(f'/api/admin/profiles/{profile_id}?format=text&limit=5', headers=admin)
+    assert text.mimetype == 'text/plain' and 'function calls' in text.get_data(as_text=True)
+    assert client.get(f'/api/admin/profiles/{profile_id}?format=text&sort=bogus', headers=admin).status_code == 400
+    assert client.get(f'/api/admin/profiles/{profile_id}?format=exe', headers=admin).status_code == 404
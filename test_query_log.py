@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Slow-query log tests on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_query_log.py
+"""
+
+from fake_neo4j import FakeDriver, LatencyModel
+from neo4j_service import Neo4jService
+from query_log import SlowQueryLog
+
+
+def test_slow_query_log_records_summaries_and_plans(sample_feedback):
+    log = SlowQueryLog(threshold_ms=5, plan_samples=1, plan_mode='profile')
+    service = Neo4jService('fake://', '', '', driver=FakeDriver(latency=LatencyModel.constant(10)),
+                           lazy=True, query_log=log)
+    service.bootstrap()
+    service.store_feedback(sample_feedback())
+    service.get_feedback_trends(7)
+    log.close(wait=True)
+
+    # Reads also fetch the MonthlyArchive aggregates; keep the statements that take parameters
+    slow = {entry['operation']: entry for entry in log.slow_queries() if entry['parameters']}
+    assert slow['get_feedback_trends']['result_available_after_ms'] == 10
+    assert slow['get_feedback_trends']['parameters']['days'] == 7
+    assert slow['get_feedback_trends']['plan_mode'] == 'profile' and slow['get_feedback_trends']['db_hits'] == 2
+    # Writes are only EXPLAINed, and user text never reaches the log
+    create = next(entry for entry in log.slow_queries()
+                  if entry['operation'] == 'store_feedback' and 'user_query' in entry['parameters'])
+    assert create['plan_mode'] == 'explain'
+    assert create['parameters']['user_query'] == '<str:37>'
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Rate limiter and load-shedding tests
+
+Run with: python -m pytest test_rate_limiter.py
+"""
+
+import time
+
+import pytest
+
+from load_test import LatencyRecorder, format_table
+from rate_limiter import RateLimiter, ConcurrencyLimiter, retry_after_header
+
+
+def test_bucket_allows_the_burst_then_refills():
+    limiter = RateLimiter({'write': (20.0, 3.0)})
+    assert [limiter.consume('write', 'a')[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = limiter.consume('write', 'a')
+    assert not allowed and retry_after == pytest.approx(0.05, abs=0.01)
+
+    time.sleep(0.06)
+    assert limiter.consume('write', 'a') == (True, 0.0)
+    # Other clients and unknown limits are unaffected
+    assert limiter.consume('write', 'b') == (True, 0.0)
+    assert limiter.consume('export', 'a') == (True, 0.0)
+
+
+def test_idle_and_excess_buckets_are_evicted():
+    limiter = RateLimiter({'write': (1.0, 1.0)}, idle_ttl=0.05, max_entries=2)
+    limiter.consume('write', 'a')
+    limiter.consume('write', 'b')
+    limiter.consume('write', 'c')
+    assert len(limiter) == 2
+
+    time.sleep(0.06)
+    limiter.consume('write', 'd')
+    assert len(limiter) == 1
+
+
+def test_concurrency_limiter_and_retry_after_header():
+    limiter = ConcurrencyLimiter(1)
+    assert limiter.try_acquire() and not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+    assert ConcurrencyLimiter(0).try_acquire()
+    assert [retry_after_header(value) for value in (None, 0.2, 1.0, 2.1)] == ['1', '1', '1', '3']
+
+
+def test_over_limit_requests_get_429_with_retry_after(api, api_client, monkeypatch):
+    monkeypatch.setattr(api, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(api, 'rate_limiter', RateLimiter({'analytics': (0.5, 2.0)}))
+
+    statuses = [api_client.get('/api/feedback/analytics').status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    response = api_client.get('/api/feedback/analytics')
+    assert response.headers['Retry-After'] == '2'
+    assert response.get_json()['details']['limit'] == 'analytics'
+    # A client sending its own API key has its own bucket; health is never limited
+    assert api_client.get('/api/feedback/analytics', headers={'X-API-Key': 'dashboard'}).status_code == 200
+    assert api_client.get('/api/health/live').status_code == 200
+
+
+def test_load_report_counts_429s_apart_from_errors():
+    recorder = LatencyRecorder()
+    for status in (200, 200, 429, 500):
+        recorder.record('analytics', 0.01, status)
+    report = recorder.report(1.0)
+    report['duration_s'] = 1.0
+    assert report['error_rate'] == 0.25
+    assert report['rate_limited'] == 1 and report['rate_limited_rate'] == 0.25
+    assert '429s' in format_table(report)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Read cache, single-flight and read freshness tests
+
+Run with: python -m pytest test_read_cache.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from fake_neo4j import FakeDriver, FaultInjector, LatencyModel
+from neo4j.exceptions import ServiceUnavailable
+from read_cache import ReadCache
+from resilience import DatabaseUnavailableError
+from singleflight import SingleFlight, SingleFlightTimeout
+
+
+class Loader:
+    """load() stand-in returning 1, 2, 3, ... or raising while `failing` is set;
+    waits for `gate` when one is given"""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+        self.gate = None
+
+    def __call__(self):
+        if self.gate is not None:
+            self.gate.wait(1)
+        if self.failing:
+            raise ConnectionError('database down')
+        self.calls += 1
+        return self.calls
+
+
+def wait_for(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_fresh_results_are_served_without_loading():
+    cache = ReadCache(ttl=60)
+    load = Loader()
+    assert cache.get(('trends', 7), load) == (1, {'stale': False, 'age_seconds': 0.0})
+    value, freshness = cache.get(('trends', 7), load)
+    assert value == 1 and freshness['stale'] is False
+    assert cache.get(('trends', 30), load)[0] == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_grace_window_serves_stale_and_refreshes_once():
+    cache = ReadCache(ttl=0.01, grace=60)
+    load = Loader()
+    cache.get(('analytics',), load)
+    time.sleep(0.02)
+
+    load.gate = threading.Event()
+    for _ in range(5):
+        value, freshness = cache.get(('analytics',), load)
+        assert value == 1 and freshness['stale'] is True
+    assert cache.stats()['refreshing'] == 1
+    load.gate.set()
+    assert wait_for(lambda: cache.stats()['refreshes'] == 1)
+    assert load.calls == 2
+    assert cache.get(('analytics',), load) == (2, {'stale': False, 'age_seconds': 0.0})
+    cache.close()
+
+
+def test_results_past_the_grace_window_are_reloaded_inline():
+    cache = ReadCache(ttl=0.01, grace=0.01)
+    load = Loader()
+    cache.get(('analytics',), load)
+    time.sleep(0.03)
+    assert cache.get(('analytics',), load) == (2, {'stale': False, 'age_seconds': 0.0})
+    assert cache.stats()['stale_served'] == 0
+
+
+def test_failed_load_falls_back_to_the_last_good_result():
+    cache = ReadCache()
+    load = Loader()
+    load.failing = True
+    with pytest.raises(ConnectionError):
+        cache.get(('analytics',), load)
+
+    load.failing = False
+    cache.get(('analytics',), load)
+    load.failing = True
+    value, freshness = cache.get(('analytics',), load)
+    assert value == 1 and freshness['stale'] is True
+    assert cache.stats()['fallbacks'] == 1
+
+
+def test_oldest_entry_is_dropped_at_capacity():
+    cache = ReadCache(ttl=60, max_entries=2)
+    load = Loader()
+    for days in (1, 2, 3):
+        cache.get(('trends', days), load)
+    assert cache.stats()['entries'] == 2
+    assert cache.get(('trends', 1), load)[0] == 4
+
+
+def test_closed_cache_serves_stale_without_refreshing():
+    cache = ReadCache(ttl=0.01, grace=60)
+    load = Loader()
+    cache.get(('analytics',), load)
+    cache.close()
+    time.sleep(0.02)
+    assert cache.get(('analytics',), load)[1]['stale'] is True
+    assert cache.stats()['refreshing'] == 0 and load.calls == 1
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+
+    def call(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return 'analytics'
+
+    def caller():
+        return flight.do('analytics', slow)
+
+    threading.Timer(0.05, release.set).start()
+    assert run_concurrently(6, caller) == ['analytics'] * 6
+    assert len(calls) == 1
+    assert flight.stats()['coalesced'] == 5 and flight.stats()['in_flight'] == 0
+
+
+def test_single_flight_reraises_the_leader_error_in_every_waiter():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.05)
+        raise ServiceUnavailable('down')
+
+    results = run_concurrently(4, lambda: flight.do('analytics', failing))
+    assert all(isinstance(result, ServiceUnavailable) for result in results)
+    assert flight.stats()['leaders'] == 1
+    # Nothing is cached: the next call runs again
+    assert flight.do('analytics', lambda: 'recovered') == 'recovered'
+
+
+def test_single_flight_waiters_give_up_after_the_timeout():
+    flight = SingleFlight(timeout=0.02)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=('analytics', lambda: release.wait(1)))
+    leader.start()
+    assert wait_for(lambda: flight.stats()['in_flight'] == 1)
+
+    with pytest.raises(SingleFlightTimeout):
+        flight.do('analytics', lambda: 'unused')
+    assert isinstance(SingleFlightTimeout('x'), DatabaseUnavailableError)
+    assert flight.stats()['timeouts'] == 1
+    release.set()
+    leader.join()
+
+
+def test_disabled_single_flight_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    load = Loader()
+    assert [flight.do('analytics', load) for _ in range(3)] == [1, 2, 3]
+
+
+def test_failed_read_does_not_report_the_previous_freshness(make_service):
+    faults = FaultInjector()
+    service = make_service(FakeDriver(faults=faults), max_attempts=1)
+    service.get_overall_analytics()
+    faults.fail_next(ServiceUnavailable)
+    service.get_overall_analytics()
+    assert service.last_read_freshness()['stale'] is True
+
+    faults.fail_next(ServiceUnavailable)
+    with pytest.raises(DatabaseUnavailableError):
+        service.get_feedback_trends(7)
+    assert service.last_read_freshness() is None
+    assert service.read_cache.stats()['entries'] == 1
+
+
+def test_stale_read_is_marked_in_the_response(api, api_client, monkeypatch, make_service):
+    faults = FaultInjector()
+    monkeypatch.setattr(api, 'feedback_store', make_service(FakeDriver(faults=faults), max_attempts=1))
+
+    fresh = api_client.get('/api/feedback/analytics')
+    assert 'Age' not in fresh.headers and 'stale' not in fresh.get_json()
+    faults.fail_next(ServiceUnavailable)
+    stale = api_client.get('/api/feedback/analytics')
+    assert stale.status_code == 200 and 'Age' in stale.headers
+    assert stale.get_json()['data'] == fresh.get_json()['data']
+
+
+def test_search_bypasses_the_read_cache(service):
+    service.get_overall_analytics()
+    assert service.search_feedback(['carbon'])['results'] == []
+    assert service.last_read_freshness() is None
+    assert service.read_cache.stats()['entries'] == 1
+
+    service.store_feedback({'user_query': 'How can I reduce my carbon footprint?', 'bot_response': 'Like this',
+                            'feedback_type': 'positive', 'rating_stars': 5,
+                            'timestamp': '2025-08-01T10:00:00+00:00'})
+    assert len(service.search_feedback(['carbon'])['results']) == 1
+
+
+def test_identical_concurrent_reads_share_one_call(make_service):
+    faults = FaultInjector()
+    service = make_service(FakeDriver(latency=LatencyModel.constant(100), faults=faults), max_attempts=1)
+    service.query_log.reset()
+
+    def burst(count=8):
+        results = [None] * count
+
+        def call(index):
+            try:
+                results[index] = service.get_overall_analytics()
+            except Exception as e:
+                results[index] = e
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    results = burst()
+    assert all(result == results[0] for result in results)
+    stats = service.single_flight.stats()
+    assert stats['leaders'] + stats['coalesced'] == 8 and stats['coalesced'] >= 6
+    assert service.query_log.stats()['operations']['get_overall_analytics']['count'] == 2 * stats['leaders']
+
+    # The leader's failure reaches every waiter, which then falls back to the last good result
+    faults.rates[ServiceUnavailable] = 1.0
+    assert burst() == results
+    assert service.single_flight.stats()['in_flight'] == 0
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Read routing and causal-consistency bookmark tests
+
+Run with: python -m pytest test_read_routing.py
+"""
+
+import pytest
+from neo4j import READ_ACCESS, WRITE_ACCESS
+
+from fake_neo4j import FakeDriver
+from neo4j_service import decode_bookmark, encode_bookmark
+
+
+def test_bookmark_tokens_round_trip(make_service, sample_feedback):
+    driver = FakeDriver()
+    service = make_service(driver)
+    service.store_feedback(sample_feedback())
+    assert driver.last_session['access_mode'] == WRITE_ACCESS
+
+    token = service.last_bookmark()
+    assert '=' not in token
+    assert len(decode_bookmark(token).raw_values) == 1
+    assert encode_bookmark(decode_bookmark(token)) == token
+    assert encode_bookmark(None) is None
+
+
+@pytest.mark.parametrize('token', ['not base64!', 'eyJhIjogMX0', 'WzFd'])
+def test_malformed_bookmarks_are_rejected(token):
+    with pytest.raises(ValueError, match='Malformed bookmark'):
+        decode_bookmark(token)
+
+
+def test_writes_return_a_bookmark_that_reads_wait_for(api_client, service, sample_feedback):
+    driver = service.driver
+
+    response = api_client.post('/api/feedback', json=sample_feedback())
+    token = response.get_json()['data']['bookmark']
+    assert response.headers['X-Neo4j-Bookmark'] == token
+
+    assert api_client.get('/api/feedback/analytics', headers={'X-Neo4j-Bookmark': token}).status_code == 200
+    assert driver.last_session['access_mode'] == READ_ACCESS
+    assert driver.last_session['bookmarks'].raw_values == decode_bookmark(token).raw_values
+
+    api_client.get(f"/api/feedback/trends?bookmark={token}")
+    assert driver.last_session['bookmarks'].raw_values == decode_bookmark(token).raw_values
+
+    response = api_client.get('/api/feedback/analytics?bookmark=garbage')
+    assert response.status_code == 400
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Retry and circuit-breaker policy tests
+
+Run with: python -m pytest test_resilience.py
+"""
+
+import time
+
+import pytest
+
+from fake_neo4j import client_error, make_error
+from neo4j.exceptions import ServiceUnavailable, TransientError
+from resilience import (CircuitBreaker, CircuitOpenError, DatabaseUnavailableError, ResiliencePolicy,
+                        PoolSliceExhaustedError)
+
+
+def make_policy(failure_threshold=3, reset_timeout=60, max_attempts=3):
+    return ResiliencePolicy(max_attempts=max_attempts, base_delay=0.001, max_delay=0.002,
+                            breaker=CircuitBreaker(failure_threshold=failure_threshold,
+                                                   reset_timeout=reset_timeout))
+
+
+def failing(error_type):
+    calls = []
+
+    def call(remaining):
+        calls.append(remaining)
+        raise make_error(error_type, f"injected {error_type.__name__}")
+    return call, calls
+
+
+def test_deadlock_storm_does_not_open_the_breaker():
+    policy = make_policy()
+    call, calls = failing(TransientError)
+    for _ in range(10):
+        with pytest.raises(DatabaseUnavailableError):
+            policy.execute('store_feedback', call)
+    assert len(calls) == 30
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+    assert policy.breaker.snapshot()['consecutive_failures'] == 0
+
+
+def test_sustained_unavailability_opens_the_breaker_once_per_call():
+    policy = make_policy()
+    call, calls = failing(ServiceUnavailable)
+    for expected_failures in (1, 2):
+        with pytest.raises(DatabaseUnavailableError):
+            policy.execute('get_overall_analytics', call)
+        assert policy.breaker.snapshot()['consecutive_failures'] == expected_failures
+        assert policy.breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(DatabaseUnavailableError):
+        policy.execute('get_overall_analytics', call)
+    assert policy.breaker.state == CircuitBreaker.OPEN
+    attempts = len(calls)
+    with pytest.raises(CircuitOpenError):
+        policy.execute('get_overall_analytics', call)
+    assert len(calls) == attempts
+
+
+def test_half_open_probe_recovers_the_breaker():
+    policy = make_policy(failure_threshold=1, reset_timeout=0.05, max_attempts=1)
+    call, _ = failing(ServiceUnavailable)
+    with pytest.raises(DatabaseUnavailableError):
+        policy.execute('health_check', call)
+    assert policy.breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert policy.breaker.state == CircuitBreaker.HALF_OPEN
+    assert policy.execute('health_check', lambda remaining: 'ok') == 'ok'
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_half_open_probe_reopens_the_breaker():
+    policy = make_policy(failure_threshold=1, reset_timeout=0.05, max_attempts=1)
+    call, _ = failing(ServiceUnavailable)
+    with pytest.raises(DatabaseUnavailableError):
+        policy.execute('health_check', call)
+    time.sleep(0.06)
+    with pytest.raises(DatabaseUnavailableError):
+        policy.execute('health_check', call)
+    assert policy.breaker.state == CircuitBreaker.OPEN
+
+
+def test_transient_error_recovers_after_a_retry():
+    policy = make_policy()
+    errors = [make_error(TransientError, 'deadlock')]
+
+    def call(remaining):
+        if errors:
+            raise errors.pop()
+        return 'stored'
+    assert policy.execute('store_feedback', call) == 'stored'
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_are_not_retried_and_count_as_an_answer():
+    policy = make_policy(failure_threshold=2)
+    call, _ = failing(ServiceUnavailable)
+    with pytest.raises(DatabaseUnavailableError):
+        policy.execute('store_feedback', call)
+
+    attempts = []
+
+    def rejected(remaining):
+        attempts.append(remaining)
+        raise client_error('Schema.ConstraintValidationFailed', 'already exists')
+    with pytest.raises(Exception, match='already exists'):
+        policy.execute('store_feedback', rejected)
+    assert len(attempts) == 1
+    assert policy.breaker.snapshot()['consecutive_failures'] == 0
+
+
+def test_local_errors_leave_the_breaker_alone():
+    policy = make_policy(failure_threshold=1, reset_timeout=0.05, max_attempts=1)
+    call, _ = failing(ServiceUnavailable)
+    with pytest.raises(DatabaseUnavailableError):
+        policy.execute('store_feedback', call)
+    time.sleep(0.06)
+
+    def exhausted(remaining):
+        raise PoolSliceExhaustedError('pool slice full')
+    with pytest.raises(PoolSliceExhaustedError):
+        policy.execute('store_feedback', exhausted)
+    # The trial slot is free again for the next call
+    assert policy.breaker.allow()
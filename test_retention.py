@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Retention tests: monthly archives on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_retention.py
+"""
+
+from fake_neo4j import FakeDriver
+from retention import RetentionJob
+
+
+def test_retention_archives_old_months_without_changing_analytics(tmp_path, make_service, sample_feedback):
+    driver = FakeDriver()
+    driver.graph('neo4j').seed([
+        dict(sample_feedback('positive', days_ago=400, categories=['air']), detected_intent='air',
+             confidence_score=0.9),
+        dict(sample_feedback('negative', days_ago=420, categories=['air']), detected_intent='air',
+             confidence_score=0.5),
+        dict(sample_feedback('positive', days_ago=2, categories=['water'])),
+    ])
+    service = make_service(driver)
+    before = (service.get_overall_analytics(), service.get_category_insights(),
+              service.get_intent_performance(), service.get_feedback_trends(500))
+
+    job = RetentionJob(service, retention_days=365, archive_dir=str(tmp_path), throttle=0)
+    report = job.run()
+    assert sum(month.get('deleted', 0) for month in report['months']) == 2
+    assert service.count_feedback() == 1
+    assert len(list(tmp_path.glob('feedback-*.jsonl.gz'))) == len(job.status()) >= 1
+
+    service.read_cache.clear()
+    after = (service.get_overall_analytics(), service.get_category_insights(),
+             service.get_intent_performance(), service.get_feedback_trends(500))
+    assert after == before
+    # A second run finds nothing left to archive
+    assert job.run()['months'] == []
+
+    # A store upgraded after archiving rebuilds its Intent totals from the archives
+    graph = driver.graph('neo4j')
+    graph.intents.clear()
+    graph.schema_version['version'] = 6
+    service.bootstrap()
+    service.read_cache.clear()
+    assert service.get_intent_performance() == before[2]
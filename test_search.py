@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Full-text search tests on the Neo4j (fake driver) and SQLite stores
+
+Run with: python -m pytest test_search.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import sqlite_store
+from search import InvertedIndex
+from sqlite_store import SQLiteFeedbackStore
+
+
+@pytest.mark.parametrize('backend', ['neo4j', 'sqlite', 'sqlite-without-fts5'])
+def test_search_pages_ranked_results_with_highlights_and_filters(api, monkeypatch, backend, make_service,
+                                                                  sample_feedback):
+    if backend == 'sqlite-without-fts5':
+        monkeypatch.setattr(sqlite_store, 'fts5_available', lambda conn: False)
+    store = make_service() if backend == 'neo4j' else SQLiteFeedbackStore(':memory:')
+    if backend != 'neo4j':
+        store.bootstrap()
+    for index in range(5):
+        store.store_feedback(dict(sample_feedback('positive' if index % 2 else 'negative', days_ago=index),
+                                  user_query=f'Where can I recycle plastic bottles? ({index})',
+                                  user_comment='Plastic everywhere, plastic!' if index == 3 else ''))
+    store.store_feedback(dict(sample_feedback(), user_query='How is the air quality today?'))
+    monkeypatch.setattr(api, 'feedback_store', store)
+    monkeypatch.setattr(api, 'ADMIN_TOKEN', 'secret')
+    client = api.app.test_client()
+    headers = {'X-Admin-Token': 'secret'}
+
+    assert client.get('/api/feedback/search?q=plastic').status_code == 403
+    first = client.get('/api/feedback/search?q=PLASTIC&limit=3', headers=headers).get_json()['data']
+    # The comment repeating the term ranks first, with its matches highlighted
+    assert first['results'][0]['highlights']['user_comment'] == '<mark>Plastic</mark> everywhere, <mark>plastic</mark>!'
+    second = client.get(f"/api/feedback/search?q=plastic&limit=3&cursor={first['next_cursor']}",
+                        headers=headers).get_json()['data']
+    assert second['next_cursor'] is None
+    assert len({row['id'] for row in first['results'] + second['results']}) == 5
+
+    assert [row['user_query'] for row in client.get('/api/feedback/search?q=air quality',
+                                                    headers=headers).get_json()['data']['results']] == [
+        'How is the air quality today?']
+    filtered = client.get(f"/api/feedback/search?q=plastic&type=negative&start="
+                          f"{(datetime.now(timezone.utc) - timedelta(days=2)).date().isoformat()}",
+                          headers=headers).get_json()['data']['results']
+    assert sorted(row['user_query'][-3:] for row in filtered) == ['(0)', '(2)']
+    assert client.get('/api/feedback/search?q=plastic&cursor=@@', headers=headers).status_code == 400
+
+
+def test_inverted_index_keeps_the_newest_documents():
+    index = InvertedIndex(max_documents=2)
+    for doc_id in range(1, 4):
+        index.add(doc_id, {'user_query': f'solar panel {doc_id}'})
+    assert len(index) == 2
+    assert sorted(doc_id for _, doc_id in index.search(['solar'])) == [2, 3]
+    # Re-adding replaces the document's terms rather than indexing it twice
+    index.add(3, {'user_query': 'wind turbine'})
+    assert [doc_id for _, doc_id in index.search(['solar'])] == [2]
+    assert [doc_id for _, doc_id in index.search(['wind', 'turbine'])] == [3]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+MessagePack/CBOR negotiation and encoding tests
+
+Run with: python -m pytest test_serialization.py
+"""
+
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import cbor2
+import msgpack
+import pytest
+from neo4j.time import Date as Neo4jDate, DateTime as Neo4jDateTime
+
+from serialization import (CBOR, JSON, MSGPACK, FeedbackJSONProvider, UnsupportedFormatError,
+                           compact_temporals, decode, encode, negotiate_format, to_epoch_millis)
+
+
+def test_negotiation_honours_aliases_and_q_values():
+    assert negotiate_format(None) == JSON
+    assert negotiate_format('text/html') == JSON
+    assert negotiate_format('application/x-msgpack') == MSGPACK
+    assert negotiate_format('application/msgpack;q=0.5, application/cbor') == CBOR
+    assert negotiate_format('application/cbor;q=0.2, application/json;q=0.9') == JSON
+
+
+def test_temporals_become_epoch_millis():
+    assert to_epoch_millis(date(1970, 1, 2)) == 86400000
+    assert to_epoch_millis(datetime(1970, 1, 1, 1, tzinfo=timezone(timedelta(hours=1)))) == 0
+    assert to_epoch_millis(datetime(1970, 1, 1, 0, 0, 1)) == 1000  # naive means UTC
+    assert to_epoch_millis(Neo4jDate(1970, 1, 2)) == 86400000
+    assert compact_temporals({'days': [date(1970, 1, 1)], 'n': 1}) == {'days': [0], 'n': 1}
+    assert FeedbackJSONProvider.default(Neo4jDateTime(2025, 8, 3, 12, 0, 0, tzinfo=timezone.utc)) \
+        == '2025-08-03T12:00:00.000000000+00:00'
+
+
+@pytest.mark.parametrize('media_type, loads', [(MSGPACK, msgpack.unpackb), (CBOR, cbor2.loads)])
+def test_binary_round_trip(media_type, loads):
+    payload = {'feedback_date': date(2025, 8, 3), 'count': 3, 'tags': ['air']}
+    body = encode(payload, media_type)
+    assert loads(body) == {'feedback_date': 1754179200000, 'count': 3, 'tags': ['air']}
+    assert decode(body, f"{media_type}; charset=binary") == loads(body)
+
+
+def test_unknown_formats_are_rejected():
+    with pytest.raises(UnsupportedFormatError):
+        encode({}, 'text/csv')
+    with pytest.raises(UnsupportedFormatError):
+        decode(b'', 'application/xml')
+
+
+def test_endpoints_answer_and_accept_binary_formats(api_client, sample_feedback):
+
+    response = api_client.post('/api/feedback', data=msgpack.packb(sample_feedback()),
+                           content_type='application/msgpack')
+    assert response.status_code == 200
+    response = api_client.post('/api/feedback', data=cbor2.dumps(sample_feedback()), content_type=CBOR)
+    assert response.status_code == 200
+    assert api_client.post('/api/feedback', data=b'\xc1', content_type=MSGPACK).status_code == 415
+
+    response = api_client.get('/api/feedback/trends', headers={'Accept': CBOR})
+    assert response.mimetype == CBOR
+    rows = cbor2.loads(response.data)['data']
+    assert all(isinstance(row['feedback_date'], int) for row in rows)
+    assert json.loads(api_client.get('/api/feedback/trends').data)['data'][0]['feedback_date'].startswith('20')
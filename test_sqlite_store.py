@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Embedded SQLite store tests, including schema upgrades from version 1
+
+Run with: python -m pytest test_sqlite_store.py
+"""
+
+import sqlite3
+import threading
+from datetime import date, datetime, timezone
+
+import pytest
+
+import sqlite_store
+from sqlite_store import LATEST_VERSION, SCHEMA, SQLiteFeedbackStore, from_utc_text, to_utc_text
+
+
+@pytest.fixture
+def store():
+    store = SQLiteFeedbackStore(':memory:')
+    store.bootstrap()
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def feedback(sample_feedback):
+    def build(feedback_type='positive', user_id='', intent='', confidence=None, **kwargs):
+        return dict(sample_feedback(feedback_type, **kwargs), user_id=user_id, detected_intent=intent,
+                    confidence_score=confidence)
+    return build
+
+
+def test_timestamps_are_stored_as_utc_text():
+    assert to_utc_text('2025-08-01T03:00:00+05:00') == '2025-07-31T22:00:00.000000'
+    assert to_utc_text('2025-08-01T03:00:00Z') == '2025-08-01T03:00:00.000000'
+    assert to_utc_text('2025-08-01T03:00:00') == '2025-08-01T03:00:00.000000'
+    assert from_utc_text('2025-07-31T22:00:00.000000') == datetime(2025, 7, 31, 22, tzinfo=timezone.utc)
+
+
+def test_analytics_round_trip(store, feedback):
+    store.store_feedback_many([
+        feedback('positive', 'u1', 'greet', 0.9, categories=['air']),
+        feedback('negative', 'u1', 'greet', 0.5, categories=['air', 'water']),
+        feedback('positive', 'u2', 'climate'),
+        feedback('positive', days_ago=40),
+    ])
+    assert store.get_overall_analytics() == {
+        'total_feedback': 4, 'positive_count': 3, 'negative_count': 1, 'satisfaction_rate': 75.0
+    }
+    assert sum(row['count'] for row in store.get_feedback_trends(30)) == 3
+    assert [(row['category'], row['feedback_type'], row['count']) for row in store.get_category_insights()] == [
+        ('air', 'negative', 1), ('air', 'positive', 1), ('water', 'negative', 1)
+    ]
+    engagement = store.get_user_engagement()
+    assert [(row['user_id'], row['total_feedback'], row['positive_feedback']) for row in engagement] == [
+        ('u1', 2, 1), ('u2', 1, 1)
+    ]
+    intents = {row['intent_name']: row for row in store.get_intent_performance()}
+    assert intents['greet']['satisfaction_rate'] == 50.0 and intents['greet']['avg_confidence'] == 0.7
+    assert intents['climate']['avg_confidence'] is None
+
+
+def test_concurrent_writers_queue_on_the_single_writer(store, feedback):
+    def write(count):
+        for _ in range(count):
+            store.store_feedback(feedback())
+    threads = [threading.Thread(target=write, args=(25,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.count_feedback() == 100
+
+
+def test_schema_upgrade_from_version_1_backfills_the_new_tables(tmp_path, feedback):
+    path = str(tmp_path / 'feedback.db')
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA[1]:
+        conn.execute(statement)
+    rows = [
+        ('How do I recycle?', 'Like this', 'positive', 5, 'u1', 'recycle', 0.8, '2025-08-01T10:00:00.000000'),
+        ('How do I recycle?', 'Like this', 'negative', 2, 'u1', 'recycle', None, '2025-08-01T11:00:00.000000'),
+        ('What is COP?', 'A conference', 'positive', 4, 'u2', '', None, '2025-08-02T09:00:00.000000'),
+    ]
+    conn.executemany(
+        "INSERT INTO feedback (user_query, bot_response, feedback_type, rating_stars, user_id, detected_intent, "
+        "confidence_score, timestamp, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [row + (row[-1],) for row in rows]
+    )
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteFeedbackStore(path)
+    assert store.bootstrap()['migrations_applied'] == list(range(2, LATEST_VERSION + 1))
+    assert store._connection().execute("PRAGMA user_version").fetchone()[0] == LATEST_VERSION
+    assert [(row['user_id'], row['total_feedback']) for row in store.get_user_engagement()] == [('u1', 2), ('u2', 1)]
+    assert [(row['intent_name'], row['total_feedback'], row['avg_confidence'])
+            for row in store.get_intent_performance()] == [('recycle', 2, 0.8)]
+    counts = store.get_distinct_counts('2025-08-01', '2025-08-02')
+    assert (counts['unique_users'], counts['unique_queries']) == (2, 2)
+    assert [day['date'] for day in counts['days']] == [date(2025, 8, 1), date(2025, 8, 2)]
+    searched = store.search_feedback(['recycle'])['results']
+    assert [row['feedback_type'] for row in searched] == ['positive', 'negative']
+    assert store.search_feedback(['cop', 'conference'])['results'][0]['user_query'] == 'What is COP?'
+    store.store_feedback(feedback())
+    assert len(store.search_feedback(['carbon', 'footprint'])['results']) == 1
+
+    # New writes keep the backfilled counters going, and a second bootstrap is a no-op
+    store.store_feedback(feedback('positive', 'u2'))
+    assert store.get_user_engagement()[0]['total_feedback'] == 2
+    assert store.bootstrap()['migrations_applied'] == []
+    store.close()
+
+
+def test_builds_without_fts5_search_a_bounded_in_memory_index(tmp_path, monkeypatch, feedback):
+    path = str(tmp_path / 'feedback.db')
+    monkeypatch.setattr(sqlite_store, 'fts5_available', lambda conn: False)
+    store = SQLiteFeedbackStore(path, search_index_size=3)
+    assert store.bootstrap()['search'] == 'inverted_index'
+    assert store._connection().execute("SELECT 1 FROM sqlite_master WHERE name = 'feedback_fts'").fetchone() is None
+    for index in range(5):
+        store.store_feedback(dict(feedback(), user_query=f'Is wind power reliable? ({index})'))
+    # Only the newest search_index_size rows are indexed
+    assert [row['user_query'][-3:] for row in store.search_feedback(['wind'])['results']] == ['(2)', '(3)', '(4)']
+    store.close()
+
+    # Opened later on a build with FTS5, bootstrap creates and fills feedback_fts
+    monkeypatch.undo()
+    store = SQLiteFeedbackStore(path)
+    assert store.bootstrap() == dict(store.startup_stats, migrations_applied=[], search='fts5')
+    assert len(store.search_feedback(['wind', 'power'])['results']) == 5
+    store.store_feedback(dict(feedback(), user_query='Is wind power cheap?'))
+    assert len(store.search_feedback(['wind'])['results']) == 6
+    store.close()
+
+
+def test_health_check_reports_the_backend(store):
+    health = store.health_check()
+    assert health['status'] == 'healthy' and health['backend'] == 'sqlite'
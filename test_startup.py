@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Startup tests: lazy construction, pool warm-up and background bootstrap
+
+Run with: python -m pytest test_startup.py
+"""
+
+import threading
+
+from fake_neo4j import FakeDriver, FaultInjector
+from health_monitor import HealthMonitor
+from migrations import LATEST_VERSION
+from neo4j.exceptions import ServiceUnavailable
+from neo4j_service import Neo4jService
+
+
+def test_lazy_service_does_not_touch_the_database():
+    driver = FakeDriver()
+    Neo4jService('fake://', '', '', driver=driver, lazy=True)
+    assert driver.sessions_opened == 0
+
+
+def test_bootstrap_warms_distinct_connections_and_records_the_schema_version():
+    driver = FakeDriver(max_connection_pool_size=4)
+    service = Neo4jService('fake://', '', '', driver=driver, lazy=True, max_connection_pool_size=4)
+    stats = service.bootstrap(warm_connections=10)
+
+    # Capped at the pool size; each warm-up session is held until all four are open
+    assert stats['warmed_connections'] == 4
+    assert set(stats) >= {'verify_ms', 'warm_up_ms', 'schema_ms', 'total_ms', 'migrations_applied'}
+    assert service.startup_stats is stats
+    assert driver.graph('neo4j').schema_version['version'] == LATEST_VERSION
+    assert service.bootstrap()['migrations_applied'] == []
+
+
+def test_background_bootstrap_retries_until_the_database_is_reachable(monkeypatch):
+    import Flask_api
+
+    faults = FaultInjector()
+    faults.fail_next(ServiceUnavailable, 2)
+    service = Neo4jService('fake://', '', '', driver=FakeDriver(faults=faults), lazy=True)
+    monitor = HealthMonitor(interval=60)
+    monitor.attach(service)
+    failures = []
+    original = monitor.mark_startup_failed
+    monkeypatch.setattr(monitor, 'mark_startup_failed', lambda error: (failures.append(error), original(error)))
+    monkeypatch.setattr(Flask_api, 'feedback_store', service)
+    monkeypatch.setattr(Flask_api, 'tenant_registry', None)
+    monkeypatch.setattr(Flask_api, 'health_monitor', monitor)
+    monkeypatch.setattr(Flask_api.time, 'sleep', lambda seconds: None)
+
+    thread = threading.Thread(target=Flask_api._bootstrap_in_background)
+    thread.start()
+    thread.join(timeout=10)
+    monitor.stop()
+
+    assert len(failures) == 2
+    assert monitor.startup['status'] == 'complete'
+    assert monitor.readiness()[0]
+
+
+def test_reloader_parent_detection(monkeypatch):
+    import Flask_api
+
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN', raising=False)
+    assert Flask_api.is_reloader_parent(True)
+    assert not Flask_api.is_reloader_parent(False)
+    monkeypatch.setenv('WERKZEUG_RUN_MAIN', 'true')
+    assert not Flask_api.is_reloader_parent(True)
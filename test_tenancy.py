@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Multi-tenant routing tests on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_tenancy.py
+"""
+
+import pytest
+
+from neo4j_service import Neo4jService, default_pool_slices
+from tenancy import TenantRegistry, TenantPathMiddleware, parse_tenant_keys, parse_tenant_map, split_pool
+
+
+class TrackedService(Neo4jService):
+    bootstraps = 0
+
+    def bootstrap(self, warm_connections: int = 0):
+        TrackedService.bootstraps += 1
+        return super().bootstrap(warm_connections)
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+@pytest.fixture
+def make_registry(make_service):
+    def build(max_active=1, keys=None):
+        base = make_service()
+        TrackedService.bootstraps = 0
+
+        def factory(database):
+            return TrackedService('fake://', '', '', database, max_connection_pool_size=8, lazy=True,
+                                  driver=base.driver)
+        tenants = parse_tenant_map('unep=unep_feedback,undp')
+        return TenantRegistry(base, tenants, factory, max_active=max_active, keys=keys), base
+    return build
+
+
+def test_tenant_map_and_keys_parsing():
+    assert parse_tenant_map('unep=unep_feedback, undp,') == {'unep': 'unep_feedback', 'undp': 'undp'}
+    assert parse_tenant_keys('unep=k1,undp,unhcr=') == {'unep': 'k1'}
+
+
+def test_tenants_write_to_their_own_databases(make_registry, sample_feedback):
+    registry, base = make_registry(max_active=2)
+    registry.service_for('unep').store_feedback(sample_feedback())
+    assert base.driver.graph('unep_feedback').feedback
+    assert not base.driver.graph('undp').feedback
+    assert not base.driver.graph('neo4j').feedback
+
+
+def test_evicted_services_are_closed_and_reactivation_skips_bootstrap(make_registry):
+    registry, base = make_registry(max_active=1)
+    first = registry.service_for('unep')
+    assert registry.service_for('unep') is first
+    registry.service_for('undp')
+    assert getattr(first, 'closed', False)
+    assert not base.driver.closed
+    assert TrackedService.bootstraps == 2
+
+    again = registry.service_for('unep')
+    assert again is not first
+    assert TrackedService.bootstraps == 2
+    assert again.get_overall_analytics()['total_feedback'] == 0
+    assert registry.stats()['unep']['active'] and not registry.stats()['undp']['active']
+
+    registry.close()
+    assert again.closed
+
+
+def test_pool_split_fits_the_driver_pool():
+    base_size, per_tenant = split_pool(100, 8, 20)
+    assert (base_size, per_tenant) == (52, 6)
+    used = sum(default_pool_slices(base_size).values()) + 8 * sum(default_pool_slices(per_tenant).values())
+    assert used <= 100
+    assert split_pool(200, 2, 20) == (160, 20)
+    with pytest.raises(ValueError):
+        split_pool(20, 8, 20)
+
+
+def test_tenant_keys_are_required_when_configured(make_registry):
+    registry, _ = make_registry(keys={'unep': 'k1'})
+    assert registry.authorized('unep', 'k1')
+    assert not registry.authorized('unep', 'k2')
+    assert not registry.authorized('unep', None)
+    assert not registry.authorized('undp', 'k1')
+    open_registry, _ = make_registry()
+    assert open_registry.authorized('undp', None)
+
+
+def test_tenant_requests_are_routed_and_checked(api, api_client, monkeypatch, make_registry, sample_feedback):
+    registry, base = make_registry(max_active=2, keys={'unep': 'k1'})
+    monkeypatch.setattr(api, 'feedback_store', base)
+    monkeypatch.setattr(api, 'tenant_registry', registry)
+
+    assert api_client.get('/api/feedback/analytics', headers={'X-Tenant': 'unhcr'}).status_code == 404
+    assert api_client.get('/api/feedback/analytics', headers={'X-Tenant': 'unep'}).status_code == 403
+    response = api_client.post('/api/feedback', json=sample_feedback(),
+                           headers={'X-Tenant': 'unep', 'X-Tenant-Key': 'k1'})
+    assert response.status_code == 200
+    assert len(base.driver.graph('unep_feedback').feedback) == 1
+    assert registry.stats()['unep']['metrics']['requests'] == 1
+
+
+def test_path_prefix_becomes_the_tenant_header():
+    seen = {}
+
+    def app(environ, start_response):
+        seen.update(environ)
+        return []
+    TenantPathMiddleware(app)({'PATH_INFO': '/t/unep/api/feedback/analytics', 'SCRIPT_NAME': ''}, None)
+    assert seen['HTTP_X_TENANT'] == 'unep'
+    assert seen['PATH_INFO'] == '/api/feedback/analytics'
+    assert seen['SCRIPT_NAME'] == '/t/unep'
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Year/Month/Day time tree tests on the in-process fake Neo4j driver
+
+Run with: python -m pytest test_time_tree.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fake_neo4j import FakeDriver
+from neo4j_service import Neo4jService
+from retention import RetentionJob
+
+
+def test_time_tree_matches_label_scan_and_follows_retention(tmp_path, make_service, sample_feedback):
+    driver = FakeDriver()
+    driver.graph('neo4j').seed([sample_feedback('negative', days_ago=400)] +
+                               [sample_feedback('positive', days_ago=days) for days in (1, 3, 3)])
+    scan = make_service(driver)
+    tree = Neo4jService('fake://', '', '', driver=driver, lazy=True, time_tree=True)
+    assert tree.bootstrap()['time_tree_linked'] == 4
+    tree.store_feedback(sample_feedback('negative', days_ago=3))
+    graph = driver.graph('neo4j')
+    assert sum(day['total'] for day in graph.days.values()) == 5
+    assert tree.get_feedback_trends(30) == scan.get_feedback_trends(30)
+    assert tree.get_overall_analytics() == scan.get_overall_analytics()
+
+    RetentionJob(tree, retention_days=365, archive_dir=str(tmp_path), throttle=0).run()
+    assert sum(day['total'] for day in graph.days.values()) == 4
+    assert all(day['date'].to_native() > (datetime.now(timezone.utc) - timedelta(days=300)).date()
+               for day in graph.days.values())
+    tree.read_cache.clear()
+    assert tree.get_overall_analytics()['total_feedback'] == 5
+    assert tree.bootstrap()['time_tree_linked'] == 0
+
+
+def test_time_tree_days_are_utc_dates(make_service, sample_feedback):
+    month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    local = timezone(timedelta(hours=5))
+    # 02:00 on the 1st at +05:00 is still the last day of the previous month in UTC
+    early = dict(sample_feedback('positive'), timestamp=month.replace(hour=2, tzinfo=local).isoformat())
+    late = dict(sample_feedback('negative'), timestamp=(month + timedelta(hours=10)).isoformat())
+    driver = FakeDriver()
+    graph = driver.graph('neo4j')
+    graph.seed([early, late])
+    graph.archives['archived'] = {'month': 'archived', 'end': month.isoformat(), 'total': 0,
+                                  'positive': 0, 'negative': 0}
+    scan = make_service(driver)
+    tree = Neo4jService('fake://', '', '', driver=driver, lazy=True, time_tree=True)
+    tree.bootstrap()
+
+    previous_day = (month - timedelta(days=1)).date().isoformat()
+    assert sorted(graph.days) == [previous_day, month.date().isoformat()]
+    assert tree.get_overall_analytics() == scan.get_overall_analytics()
+    assert scan.get_overall_analytics()['total_feedback'] == 1
+    days = (datetime.now(timezone.utc) - month).days + 2
+    assert tree.get_feedback_trends(days) == scan.get_feedback_trends(days)
+
+    # Days linked in the timestamp's own offset before migration 9 are moved to the UTC day
+    node = next(f for f in graph.feedback if f['_day'] == previous_day)
+    graph.days[previous_day]['total'] -= 1
+    graph.days[previous_day]['positive'] -= 1
+    graph.days[month.date().isoformat()]['total'] += 1
+    graph.days[month.date().isoformat()]['positive'] += 1
+    node['_day'] = month.date().isoformat()
+    graph.schema_version['version'] = 8
+    tree.bootstrap()
+    assert graph.days[previous_day]['positive'] == 1
+    assert graph.days[month.date().isoformat()]['total'] == 1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Traffic capture and replay tests
+
+Run with: python -m pytest test_traffic_capture.py
+"""
+
+import json
+
+import replay_traffic
+from traffic_capture import REDACTED, TrafficCapture
+
+
+def record(capture, path='/api/feedback', body=None, client='203.0.113.7'):
+    capture.record(1700000000.0, 0.5, 'POST', 'submit_feedback', path,
+                   {'Content-Type': 'application/json', 'X-API-Key': 'secret'}, body, client, 201, 12.5)
+
+
+def read_lines(path):
+    with open(path, 'r', encoding='utf-8') as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def test_free_text_and_identifiers_are_redacted_by_default(tmp_path):
+    capture = TrafficCapture(str(tmp_path / 'requests.jsonl'))
+    record(capture, body={'user_query': 'my account number is 42', 'bot_response': 'ok',
+                          'user_comment': '', 'user_id': 'device-1', 'message_id': 'm-1',
+                          'feedback_type': 'positive', 'rating_stars': 5})
+    record(capture, path='/api/feedback/search?q=jane+doe&limit=5', body=None)
+    capture.flush()
+
+    submitted, searched = read_lines(capture.path)
+    body = submitted['body']
+    assert body['user_query'] == body['bot_response'] == body['user_id'] == body['message_id'] == REDACTED
+    assert body['user_comment'] == ''
+    assert body['feedback_type'] == 'positive' and body['rating_stars'] == 5
+    assert submitted['headers'] == {'Content-Type': 'application/json'}
+    assert searched['path'] == '/feedback/search?q=%5Bredacted%5D&limit=5'
+
+
+def test_keep_fields_opt_back_in(tmp_path):
+    capture = TrafficCapture(str(tmp_path / 'requests.jsonl'), keep_fields=['user_query', 'q'])
+    record(capture, body={'user_query': 'opening hours', 'user_id': 'device-1'})
+    record(capture, path='/api/feedback/search?q=hours', body=None)
+    capture.flush()
+
+    submitted, searched = read_lines(capture.path)
+    assert submitted['body'] == {'user_query': 'opening hours', 'user_id': REDACTED}
+    assert searched['path'] == '/feedback/search?q=hours'
+
+
+def test_client_fingerprint_is_stable_per_capture_and_keyed(tmp_path):
+    first = TrafficCapture(str(tmp_path / 'first.jsonl'))
+    second = TrafficCapture(str(tmp_path / 'second.jsonl'))
+    for capture in (first, second):
+        record(capture, client='203.0.113.7')
+        record(capture, client='203.0.113.7')
+        record(capture, client='198.51.100.1')
+        capture.flush()
+
+    a, b, other = [line['client'] for line in read_lines(first.path)]
+    assert a == b != other and len(a) == 16
+    assert read_lines(second.path)[0]['client'] != a
+
+
+def test_rotation_keeps_the_configured_backups(tmp_path):
+    capture = TrafficCapture(str(tmp_path / 'requests.jsonl'), max_bytes=400, backups=2)
+    for _ in range(4):
+        for _ in range(3):
+            record(capture, body={'feedback_type': 'positive'})
+        capture.flush()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['requests.jsonl', 'requests.jsonl.1', 'requests.jsonl.2']
+    assert len(replay_traffic.load_capture([capture.path])) == 9
+
+
+def test_rotated_files_named_explicitly_are_loaded_once(tmp_path):
+    capture = TrafficCapture(str(tmp_path / 'requests.jsonl'), max_bytes=400, backups=2)
+    for _ in range(3):
+        for _ in range(3):
+            record(capture, body={'feedback_type': 'positive'})
+        capture.flush()
+
+    paths = [capture.path + '.2', capture.path + '.1', capture.path]
+    assert len(replay_traffic.load_capture(paths)) == len(replay_traffic.load_capture([capture.path])) == 9
+
+def test_replay_exits_cleanly_without_requests(tmp_path, capsys):
+    missing = str(tmp_path / 'missing.jsonl')
+    assert replay_traffic.main([missing]) == 1
+    assert 'Cannot read capture' in capsys.readouterr().err
+
+    capture = TrafficCapture(str(tmp_path / 'requests.jsonl'))
+    record(capture)
+    capture.flush()
+    assert replay_traffic.main([capture.path, '--limit', '0']) == 1
+    assert 'No requests to replay' in capsys.readouterr().err
@@ -0,0 +1,201 @@
+"""
+Opt-in capture of incoming API requests to rotating JSONL files
+
+Each line records one request: wall-clock time, offset from the start of the
+capture, method, endpoint, path (relative to /api), an allow-listed subset of
+headers, the decoded body and query string with free-text and identifier fields
+redacted, a keyed client pseudonym, plus the response status and server time for
+later comparison. Lines are buffered in memory
+and written in batches by a background thread, so request threads never wait
+on disk. Files rotate like logging.handlers.RotatingFileHandler.
+
+replay_traffic.py re-issues captured requests against another build.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import secrets
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Headers that shape a response and are safe to keep; credentials never are
+DEFAULT_HEADERS = ('Accept', 'Accept-Encoding', 'Content-Type', 'User-Agent', 'X-Tenant')
+# Free text and identifiers, in bodies and query strings; operators opt fields back in
+DEFAULT_REDACT_FIELDS = ('user_query', 'bot_response', 'user_comment', 'user_id', 'message_id', 'q')
+REDACTED = '[redacted]'
+
+
+def client_fingerprint(value: str, key: bytes) -> str:
+    """Pseudonym for a client key or address, stable within one capture; without the
+    capture's random key it cannot be reversed by hashing candidate keys or addresses"""
+    return hmac.new(key, value.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+
+def redact(body: Any, fields: Iterable[str]) -> Any:
+    """Copy of a JSON body with the given top-level fields replaced when set"""
+    if not isinstance(body, dict):
+        return body
+    redacted = dict(body)
+    for field in fields:
+        if redacted.get(field) not in (None, ''):
+            redacted[field] = REDACTED
+    return redacted
+
+
+def redact_query(path: str, fields: Iterable[str]) -> str:
+    """Path with the given query parameters replaced when set"""
+    parts = urlsplit(path)
+    if not parts.query:
+        return path
+    fields = set(fields)
+    params = [(name, REDACTED if name in fields and value else value)
+              for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return f"{parts.path}?{urlencode(params)}"
+
+
+class TrafficCapture:
+    def __init__(self, path: str = 'captures/requests.jsonl', max_bytes: int = 50 * 1024 * 1024,
+                 backups: int = 5, buffer_size: int = 256, flush_interval: float = 1.0,
+                 sample_rate: float = 1.0, headers: Iterable[str] = DEFAULT_HEADERS,
+                 redact_fields: Iterable[str] = DEFAULT_REDACT_FIELDS, keep_fields: Iterable[str] = ()):
+        """
+        Buffered, rotating JSONL request capture
+
+        Args:
+            path: Capture file; rotated copies get .1, .2, ... suffixes
+            max_bytes: Size at which the file is rotated
+            backups: Rotated files kept
+            buffer_size: Buffered lines that trigger an immediate flush
+            flush_interval: Seconds between background flushes
+            sample_rate: Share of requests captured
+            headers: Request headers kept in the capture
+            redact_fields: Body fields and query parameters replaced with a placeholder
+            keep_fields: Fields captured as sent even though redact_fields lists them
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self.headers = tuple(headers)
+        keep = set(keep_fields)
+        self.redact_fields = tuple(field for field in redact_fields if field not in keep)
+        # Fresh per capture, so fingerprints cannot be joined across captures
+        self._fingerprint_key = secrets.token_bytes(32)
+        self.started_at = time.monotonic()
+        self.captured = 0
+        self.dropped = 0
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='traffic-capture', daemon=True)
+            self._thread.start()
+            logger.info(f"Capturing traffic to {self.path} (sample rate {self.sample_rate})")
+
+    def stop(self):
+        """Stop the flusher and write what is still buffered"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def offset(self) -> float:
+        """Seconds since the capture started"""
+        return time.monotonic() - self.started_at
+
+    def record(self, arrived_at: float, offset: float, method: str, route: Optional[str], path: str,
+               headers: Dict[str, str], body: Any, client: Optional[str], status: int,
+               duration_ms: float):
+        """Queue one request for writing; `arrived_at` is wall-clock time, `offset` from offset()"""
+        if path.startswith('/api/'):
+            path = path[len('/api'):]
+        entry = {
+            'ts': round(arrived_at, 6),
+            'offset': round(offset, 6),
+            'method': method,
+            'route': route,
+            'path': redact_query(path, self.redact_fields),
+            'headers': {name: headers[name] for name in self.headers if name in headers},
+            'body': redact(body, self.redact_fields),
+            'client': client_fingerprint(client, self._fingerprint_key) if client else None,
+            'status': status,
+            'duration_ms': round(duration_ms, 3)
+        }
+        try:
+            line = json.dumps(entry, separators=(',', ':'), default=str)
+        except (TypeError, ValueError):
+            self.dropped += 1
+            return
+        with self._lock:
+            # A stalled disk must not grow memory without bound
+            if len(self._buffer) >= self.buffer_size * 16:
+                self.dropped += 1
+                return
+            self._buffer.append(line)
+            self.captured += 1
+            full = len(self._buffer) >= self.buffer_size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Traffic capture write failed: {e}")
+
+    def flush(self):
+        """Write buffered lines, rotating first if the file would outgrow max_bytes"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+        with self._write_lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                size = 0
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as handle:
+                handle.write(data)
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'path': self.path, 'captured': self.captured, 'dropped': self.dropped,
+                'buffered': len(self._buffer), 'sample_rate': self.sample_rate}